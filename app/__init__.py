@@ -23,6 +23,8 @@ def create_app():
     # Конфигурация
     app.config['SECRET_KEY'] = 'dev-secret-key'
     app.config['DATABASE'] = os.path.join(app.instance_path, 'tasks.db')
+    # Кириллица в JSON без \uXXXX-экранирования: ответы API в 2-3 раза компактнее
+    app.json.ensure_ascii = False
     
     # Создание папки для базы данных
     os.makedirs(app.instance_path, exist_ok=True)
@@ -5,5 +5,16 @@
 from .neural_network import SimpleNeuralNetwork
 from .task_generator import TaskGenerator
 from .code_checker import CodeChecker
+from .dataset import Dataset, DatasetError, load_dataset
+from .model_format import ModelFormatError, read_model_info
+from .model_registry import ModelRegistry
+from .model_server import ModelServer, ServedModel
+from .inference import InferenceKernel
+from .feature_cache import FeatureCache
+from .complexity_profiler import ComplexityProfiler
+from .test_synthesizer import TestSynthesizer
 
-__all__ = ['SimpleNeuralNetwork', 'TaskGenerator', 'CodeChecker']
+__all__ = ['SimpleNeuralNetwork', 'TaskGenerator', 'CodeChecker', 'Dataset', 'DatasetError', 'load_dataset',
+           'ModelFormatError', 'read_model_info', 'ModelRegistry',
+           'ModelServer', 'ServedModel', 'InferenceKernel',
+           'FeatureCache', 'ComplexityProfiler', 'TestSynthesizer']
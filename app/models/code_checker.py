@@ -3,16 +3,40 @@
 """
 
 import ast
-import subprocess
-import tempfile
-import os
-import sys
+import hashlib
+import json
+import math
 import time
 import re
-from typing import Dict, List, Tuple, Any, Optional
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Tuple, Any, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
+from .code_metrics import CodeMetricsVisitor
+from .feature_cache import FeatureCache, structure_key
+from .sandbox import SandboxLimits, SandboxPool, SandboxTimeout, SandboxCrash, run_once
+from .sandbox_worker import SKIP_BUDGET, SKIP_FAIL_FAST
+
+
+# Сообщения об ошибках, не зависящих от самого кода (нагрузка, сбой песочницы)
+TIMEOUT_ERROR = "Превышено время выполнения"
+EXECUTION_ERROR_PREFIX = "Ошибка выполнения:"
+
+# Вывод, который test_solution считает ошибкой теста
+ERROR_OUTPUT_PREFIXES = ("Error: ", "Ошибка: ")
+
+# Сообщения о пропущенных тестах по причине пропуска
+SKIP_MESSAGES = {
+    SKIP_BUDGET: "Тест пропущен: исчерпано время на проверку решения",
+    SKIP_FAIL_FAST: "Тест пропущен: предыдущий тест не пройден"
+}
+
+# Меньшие пакеты быстрее обработать в текущем процессе, чем передавать в пул
+MIN_PARALLEL_BATCH = 32
+
 
 class CheckResult(Enum):
     """Результаты проверки кода"""
@@ -33,6 +57,17 @@ class TestResult:
     expected_output: str
     execution_time: float
     error_message: str = ""
+    skipped: bool = False  # Тест не выполнялся (общее время исчерпано или режим fail-fast)
+    skip_reason: str = ""  # SKIP_BUDGET или SKIP_FAIL_FAST
+    cpu_time: float = 0.0  # Процессорное время вызова (секунды)
+    peak_memory: int = 0  # Пиковый RSS процесса-песочницы во время вызова (КБ)
+    
+    @property
+    def transient(self) -> bool:
+        """Результат мог зависеть от нагрузки: таймаут, сбой песочницы или пропуск по времени"""
+        return (self.error_message == TIMEOUT_ERROR or
+                self.error_message.startswith(EXECUTION_ERROR_PREFIX) or
+                self.skip_reason == SKIP_BUDGET)
 
 
 @dataclass
@@ -51,17 +86,92 @@ class CodeAnalysis:
     suggestions: List[str]
 
 
+@dataclass
+class ParsedSubmission:
+    """
+    Разобранный код решения
+    
+    Код разбирается один раз на запрос, после чего все этапы проверки
+    (синтаксис, безопасность, тестирование, анализ, признаки для сети)
+    работают с готовым AST-деревом и списком строк.
+    """
+    source: str
+    tree: Optional[ast.AST]
+    lines: List[str]
+    syntax_error: str = ""
+    analysis: Optional[CodeAnalysis] = None  # Результат analyze_code (вычисляется один раз)
+    
+    @classmethod
+    def parse(cls, code: str) -> 'ParsedSubmission':
+        """
+        Разбор исходного кода
+        
+        Args:
+            code: Исходный код
+            
+        Returns:
+            Объект с исходным текстом, AST (None при ошибке) и строками кода
+        """
+        lines = code.splitlines() if isinstance(code, str) else []
+        try:
+            return cls(source=code, tree=ast.parse(code), lines=lines)
+        except SyntaxError as e:
+            error = f"Синтаксическая ошибка: {e.msg} в строке {e.lineno}"
+        except Exception as e:
+            error = f"Ошибка анализа: {str(e)}"
+        return cls(source=code, tree=None, lines=lines, syntax_error=error)
+    
+    @property
+    def syntax_valid(self) -> bool:
+        """Код успешно разобран"""
+        return self.tree is not None
+
+
+# Код в виде строки или уже разобранный
+Submission = Union[str, ParsedSubmission]
+
+
 class CodeChecker:
     """Система проверки кода Python"""
     
-    def __init__(self, timeout: int = 5):
+    def __init__(self, timeout: int = 5, pool_size: int = 0, max_jobs_per_worker: int = 50,
+                 feature_workers: int = 0, feature_cache: Optional[FeatureCache] = None,
+                 submission_budget: Optional[float] = None, fail_fast: bool = False,
+                 memory_limit_mb: int = 512, cpu_time_limit: Optional[int] = None):
         """
         Инициализация проверщика кода
         
         Args:
             timeout: Таймаут выполнения кода в секундах
+            pool_size: Количество прогретых процессов-песочниц (0 - новый процесс на каждый запуск)
+            max_jobs_per_worker: Число запусков, после которого процесс песочницы пересоздаётся
+            feature_workers: Количество процессов для пакетного извлечения признаков
+                             (0 - в текущем процессе)
+            feature_cache: Кэш признаков и метрик кода (None - без кэша)
+            submission_budget: Время на все тесты одного решения в секундах
+                               (None - ограничен только каждый тест отдельно)
+            fail_fast: Останавливать тестирование после первого непройденного теста
+            memory_limit_mb: Ограничение памяти процесса-песочницы в МБ (0 - без ограничения)
+            cpu_time_limit: Процессорное время на загрузку кода и на каждый тест в секундах
+                            (None - по таймауту, 0 - без ограничения)
         """
+        if submission_budget is not None and submission_budget <= 0:
+            raise ValueError("submission_budget должно быть положительным")
+        
         self.timeout = timeout
+        self.submission_budget = submission_budget
+        self.fail_fast = fail_fast
+        self.limits = SandboxLimits(
+            memory_mb=memory_limit_mb,
+            cpu_seconds=math.ceil(timeout) if cpu_time_limit is None else cpu_time_limit
+        )
+        self.pool_size = pool_size
+        self.max_jobs_per_worker = max_jobs_per_worker
+        self.feature_workers = feature_workers
+        self.feature_cache = feature_cache
+        self._pool = None
+        self._pool_lock = threading.Lock()
+        self._feature_executor = None
         self.forbidden_imports = [
             'os', 'sys', 'subprocess', 'eval', 'exec', 'compile',
             'open', 'file', 'input', 'raw_input', '__import__'
@@ -70,72 +180,103 @@ class CodeChecker:
             'eval', 'exec', 'compile', 'open', 'file'
         ]
     
-    def check_syntax(self, code: str) -> Tuple[bool, str]:
+    def fingerprint(self, **extra: Any) -> str:
+        """
+        Отпечаток настроек, от которых зависят результаты тестов
+        
+        Таймаут, общее время решения, режим fail-fast и ограничения
+        ресурсов песочницы; входит в ключ кэша результатов проверки
+        (см. app/utils/result_cache.py), поэтому после изменения настроек
+        сохранённые результаты не используются.
+        
+        Args:
+            extra: Дополнительные настройки вызывающей стороны, влияющие на результат
+            
+        Returns:
+            Шестнадцатеричный SHA-256
+        """
+        config = dict(extra, timeout=self.timeout, submission_budget=self.submission_budget,
+                      fail_fast=self.fail_fast, memory_mb=self.limits.memory_mb,
+                      cpu_seconds=self.limits.cpu_seconds)
+        return hashlib.sha256(json.dumps(config, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def parse(self, code: Submission) -> ParsedSubmission:
+        """
+        Разбор кода решения (один раз на запрос)
+        
+        Args:
+            code: Код решения или уже разобранный код
+            
+        Returns:
+            Разобранный код, принимаемый всеми методами проверки
+        """
+        if isinstance(code, ParsedSubmission):
+            return code
+        return ParsedSubmission.parse(code)
+    
+    def check_syntax(self, code: Submission) -> Tuple[bool, str]:
         """
         Проверка синтаксиса кода
         
         Args:
-            code: Код для проверки
+            code: Код для проверки (строка или ParsedSubmission)
             
         Returns:
             Кортеж (валидность, сообщение об ошибке)
         """
-        try:
-            ast.parse(code)
-            return True, ""
-        except SyntaxError as e:
-            return False, f"Синтаксическая ошибка: {e.msg} в строке {e.lineno}"
-        except Exception as e:
-            return False, f"Ошибка анализа: {str(e)}"
+        submission = self.parse(code)
+        return submission.syntax_valid, submission.syntax_error
     
-    def check_security(self, code: str) -> Tuple[bool, List[str]]:
+    def check_security(self, code: Submission) -> Tuple[bool, List[str]]:
         """
         Проверка безопасности кода
         
         Args:
-            code: Код для проверки
+            code: Код для проверки (строка или ParsedSubmission)
             
         Returns:
             Кортеж (безопасность, список нарушений)
         """
-        violations = []
+        submission = self.parse(code)
         
-        try:
-            tree = ast.parse(code)
-        except:
+        if submission.tree is None:
             # Если код не парсится, проверяем простым способом
-            if 'exec(' in code or 'eval(' in code:
+            violations = []
+            source = submission.source or ''
+            if 'exec(' in source or 'eval(' in source:
                 violations.append("Использование exec() или eval() запрещено")
             return len(violations) == 0, violations
         
-        # Проверка на запрещенные импорты через AST
-        for node in ast.walk(tree):
+        import_violations = []
+        call_violations = []
+        
+        # Один обход дерева: запрещенные импорты и функции
+        for node in ast.walk(submission.tree):
             if isinstance(node, ast.Import):
                 for alias in node.names:
                     if alias.name in self.forbidden_imports:
-                        violations.append(f"Запрещенный импорт: {alias.name}")
+                        import_violations.append(f"Запрещенный импорт: {alias.name}")
             elif isinstance(node, ast.ImportFrom):
                 if node.module in self.forbidden_imports:
-                    violations.append(f"Запрещенный импорт: {node.module}")
+                    import_violations.append(f"Запрещенный импорт: {node.module}")
                 for alias in node.names:
                     if alias.name in self.forbidden_imports:
-                        violations.append(f"Запрещенный импорт: {alias.name}")
-        
-        # Проверка на запрещенные функции через AST
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
+                        import_violations.append(f"Запрещенный импорт: {alias.name}")
+            elif isinstance(node, ast.Call):
                 if isinstance(node.func, ast.Name):
                     if node.func.id in self.forbidden_functions:
-                        violations.append(f"Запрещенная функция: {node.func.id}")
+                        call_violations.append(f"Запрещенная функция: {node.func.id}")
                 elif isinstance(node.func, ast.Attribute):
                     # Проверка для случаев типа os.system()
                     if isinstance(node.func.value, ast.Name):
                         if node.func.value.id in ['os', 'sys', 'subprocess']:
-                            violations.append(f"Запрещенное использование: {node.func.value.id}.{node.func.attr}")
+                            call_violations.append(f"Запрещенное использование: {node.func.value.id}.{node.func.attr}")
         
+        violations = import_violations + call_violations
         return len(violations) == 0, violations
     
-    def run_code(self, code: str, input_data: str = "", skip_security_check: bool = False) -> Tuple[bool, str, float, str]:
+    def run_code(self, code: str, input_data: str = "", skip_security_check: bool = False,
+                 timeout: Optional[float] = None) -> Tuple[bool, str, float, str]:
         """
         Безопасное выполнение кода
         
@@ -143,9 +284,11 @@ class CodeChecker:
             code: Код для выполнения
             input_data: Входные данные
             skip_security_check: Пропустить проверку безопасности (для внутреннего использования)
+            timeout: Таймаут в секундах (None - self.timeout)
             
         Returns:
-            Кортеж (успех, результат, время выполнения, ошибка)
+            Кортеж (успех, результат, время выполнения, ошибка); время
+            измеряется внутри песочницы и не включает запуск процесса
         """
         # Проверка безопасности (если не пропущена)
         if not skip_security_check:
@@ -153,61 +296,71 @@ class CodeChecker:
             if not is_safe:
                 return False, "", 0.0, f"Нарушения безопасности: {', '.join(violations)}"
         
-        # Создание временного файла с UTF-8 кодировкой
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.py', delete=False, encoding='utf-8') as f:
-            # Добавляем объявление кодировки в начало файла
-            f.write('# -*- coding: utf-8 -*-\n')
-            f.write(code)
-            temp_file = f.name
+        run = self._run_script(code, input_data, timeout if timeout is not None else self.timeout)
+        return run['ok'], run['stdout'], run['time'], run['error']
+    
+    def _run_script(self, code: str, input_data: str, timeout: float) -> Dict[str, Any]:
+        """
+        Выполнение кода как отдельного скрипта в процессе-песочнице
         
-        try:
-            # Подготовка команды
-            cmd = [sys.executable, temp_file]
-            
-            # Запуск с таймаутом
-            start_time = time.time()
-            result = subprocess.run(
-                cmd,
-                input=input_data,
-                capture_output=True,
-                text=True,
-                timeout=self.timeout
-            )
-            execution_time = time.time() - start_time
+        Используется прогретый процесс пула, если пул включён, иначе
+        одноразовый процесс.
+        
+        Args:
+            code: Код для выполнения
+            input_data: Входные данные
+            timeout: Таймаут в секундах
             
-            if result.returncode == 0:
-                return True, result.stdout.strip(), execution_time, ""
-            else:
-                return False, "", execution_time, result.stderr.strip()
-                
-        except subprocess.TimeoutExpired:
-            return False, "", self.timeout, "Превышено время выполнения"
+        Returns:
+            Ответ песочницы: ok, stdout, error, time, cpu_time, peak_memory
+        """
+        job = {'type': 'run', 'code': code, 'input': input_data}
+        pool = self._get_pool()
+        start_time = time.perf_counter()
+        try:
+            if pool is not None:
+                return pool.execute(job, timeout)
+            return run_once(job, timeout, limits=self.limits)
+        except SandboxTimeout:
+            return {'ok': False, 'stdout': "", 'error': TIMEOUT_ERROR, 'time': timeout,
+                    'cpu_time': 0.0, 'peak_memory': 0}
+        except SandboxCrash as e:
+            return {'ok': False, 'stdout': "", 'error': f"{EXECUTION_ERROR_PREFIX} {e.args[0]}",
+                    'time': time.perf_counter() - start_time, 'cpu_time': 0.0, 'peak_memory': 0}
         except Exception as e:
-            return False, "", 0.0, f"Ошибка выполнения: {str(e)}"
-        finally:
-            # Удаление временного файла
-            try:
-                os.unlink(temp_file)
-            except:
-                pass
+            return {'ok': False, 'stdout': "", 'error': f"{EXECUTION_ERROR_PREFIX} {str(e)}",
+                    'time': 0.0, 'cpu_time': 0.0, 'peak_memory': 0}
+    
+    def _get_pool(self) -> Optional[SandboxPool]:
+        """
+        Получение пула песочниц (создаётся при первом запуске кода)
+        
+        Returns:
+            Пул процессов или None, если пул отключён
+        """
+        if self.pool_size <= 0:
+            return None
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = SandboxPool(self.pool_size, self.max_jobs_per_worker, self.limits)
+        return self._pool
     
-    def _extract_function_name(self, code: str) -> Optional[str]:
+    def _extract_function_name(self, code: Submission) -> Optional[str]:
         """
         Извлечение имени функции из кода
         
         Args:
-            code: Код для анализа
+            code: Код для анализа (строка или ParsedSubmission)
             
         Returns:
             Имя функции или None
         """
-        try:
-            tree = ast.parse(code)
-            for node in ast.walk(tree):
+        submission = self.parse(code)
+        if submission.tree is not None:
+            for node in ast.walk(submission.tree):
                 if isinstance(node, ast.FunctionDef):
                     return node.name
-        except:
-            pass
         return None
     
     def _safe_eval_input(self, input_str: str) -> Any:
@@ -227,17 +380,212 @@ class CodeChecker:
             # Если не получается, возвращаем как строку без кавычек
             return input_str.strip('"\'')
     
-    def test_solution(self, code: str, test_cases: List[Dict[str, Any]]) -> List[TestResult]:
+    def _build_call(self, code: str, function_name: Optional[str], input_value: Any) -> Optional[str]:
         """
-        Тестирование решения
+        Построение выражения вызова функции студента для одного теста
+        
+        Args:
+            code: Код решения
+            function_name: Имя функции, найденное в коде (или None)
+            input_value: Распарсенные входные данные теста
+            
+        Returns:
+            Выражение вызова или None, если функцию вызвать нельзя
+        """
+        if function_name:
+            # Если нашли функцию, вызываем её напрямую
+            return f"{function_name}({repr(input_value)})"
+        
+        # Если функция не найдена, используем fallback логику
+        # Пробуем найти функцию по известным именам
+        known_functions = ['find_max', 'count_words', 'sort_list', 'fibonacci', 'filter_even']
+        for func_name in known_functions:
+            if func_name in code:
+                return f"{func_name}({repr(input_value)})"
+        
+        return None
+    
+    def _run_batch(self, code: str, calls: List[str], expected: Optional[List[str]] = None,
+                   budget: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Выполнение всех тестов решения в одном процессе-песочнице
+        
+        Код студента компилируется один раз, каждый тест выполняет модуль
+        заново в чистом пространстве имён и вызывается с собственным ограничением времени и в пределах общего времени
+        budget. Если процесс не ответил за отведённое на все тесты время,
+        он завершается: тест без результата считается превысившим время,
+        а следующие за ним при заданном budget - пропущенными.
+        
+        В режиме fail-fast вывод каждого теста сравнивается с ожидаемым
+        здесь, а процессу отправляется только решение продолжать или
+        остановиться: ожидаемый вывод не попадает в процесс с кодом студента.
         
         Args:
             code: Код решения
+            calls: Выражения вызова функции для каждого теста
+            expected: Ожидаемый вывод тестов для режима fail-fast (None - выполнять все)
+            budget: Время на все тесты в секундах (None - ограничен только каждый тест)
+            
+        Returns:
+            Результаты тестов в порядке calls (поля ok, stdout, error, timeout, time,
+            cpu_time, peak_memory и skipped у пропущенных тестов)
+        """
+        job = {'type': 'batch', 'code': code, 'calls': calls, 'case_timeout': self.timeout}
+        # Загрузка модуля и каждый тест ограничены self.timeout
+        deadline = self.timeout * (len(calls) + 1) + 1
+        if budget is not None:
+            job['budget'] = budget
+            deadline = min(deadline, budget + 1)
+        on_message = None
+        if expected is not None:
+            job['stepwise'] = True
+            
+            def on_message(case: Dict[str, Any]) -> Dict[str, Any]:
+                return {'continue': _case_passed(case, expected[case['index']])}
+        
+        pool = self._get_pool()
+        try:
+            if pool is not None:
+                response = pool.execute(job, deadline, on_message)
+            else:
+                response = run_once(job, deadline, on_message, self.limits)
+            received = response['messages']
+            crash_error = ""
+        except SandboxTimeout as e:
+            received = e.messages
+            crash_error = None
+        except SandboxCrash as e:
+            received = e.messages
+            crash_error = f"{EXECUTION_ERROR_PREFIX} {e.args[0]}"
+        
+        cases = {message['index']: message for message in received}
+        results = []
+        timed_out = False
+        for index in range(len(calls)):
+            if index in cases:
+                results.append(cases[index])
+            elif crash_error is None:
+                if timed_out and budget is not None:
+                    # Процесс завершён на предыдущем тесте: до этого теста дело не дошло
+                    results.append({'ok': False, 'stdout': "", 'error': "", 'timeout': False,
+                                    'time': 0.0, 'cpu_time': 0.0, 'peak_memory': 0, 'skipped': SKIP_BUDGET})
+                    continue
+                timed_out = True
+                results.append({'ok': False, 'stdout': "", 'error': "", 'timeout': True, 'time': self.timeout,
+                                'cpu_time': 0.0, 'peak_memory': 0})
+            else:
+                results.append({'ok': False, 'stdout': "", 'error': crash_error, 'timeout': False, 'time': 0.0,
+                                'cpu_time': 0.0, 'peak_memory': 0})
+        return results
+    
+    def profile_function(self, code: str, function_name: str, inputs: List[str],
+                         budget: float, call_limit: float) -> Tuple[List[Optional[float]], str]:
+        """
+        Время вызова функции на входах возрастающего размера (в песочнице)
+        
+        Args:
+            code: Код с функцией (проверка безопасности - на вызывающей стороне)
+            function_name: Имя функции
+            inputs: Литералы аргумента по возрастанию размера
+            budget: Время на все измерения в секундах
+            call_limit: Вызов дольше этого времени завершает измерение
+            
+        Returns:
+            Кортеж (минимальное время вызова для каждого входа или None, если
+            размер не измерен; ошибка выполнения или пустая строка)
+        """
+        job = {'type': 'profile', 'code': code, 'function': function_name, 'inputs': inputs,
+               'budget': budget, 'call_limit': call_limit}
+        pool = self._get_pool()
+        error = ""
+        try:
+            if pool is not None:
+                response = pool.execute(job, budget + 1)
+            else:
+                response = run_once(job, budget + 1, limits=self.limits)
+            received = response['messages']
+            error = response.get('error', "")
+        except SandboxTimeout as e:
+            received = e.messages
+        except SandboxCrash as e:
+            received = e.messages
+            error = f"{EXECUTION_ERROR_PREFIX} {e.args[0]}"
+        
+        times: List[Optional[float]] = [None] * len(inputs)
+        for point in received:
+            if not point.get('stopped'):
+                times[point['index']] = point['time']
+        return times, error
+
+    def run_reference(self, code: str, inputs: List[str], budget: float) -> List[TestResult]:
+        """
+        Выполнение эталонного решения на входах (оракул синтезированных тестов)
+
+        Все входы выполняются в одном процессе-песочнице, как тесты
+        решения, но без проверки безопасности (код шаблона доверенный),
+        без fail-fast и с собственным общим временем.
+
+        Args:
+            code: Эталонное решение
+            inputs: Литералы аргумента функции
+            budget: Время на все входы в секундах
+
+        Returns:
+            Результаты в порядке inputs: actual_output - вывод эталона,
+            passed - вызов завершился без ошибки
+
+        Raises:
+            ValueError: В решении нет функции, которую можно вызвать
+        """
+        function_name = self._extract_function_name(code)
+        calls = [self._build_call(code, function_name, self._safe_eval_input(value)) for value in inputs]
+        if not calls or None in calls:
+            raise ValueError("В эталонном решении не найдена функция")
+
+        results = []
+        for value, case in zip(inputs, self._run_batch(code, calls, budget=budget)):
+            output = case['stdout'].strip() if case['ok'] else ""
+            error = case['error']
+            if case.get('skipped'):
+                error = SKIP_MESSAGES[case['skipped']]
+            elif case['timeout']:
+                error = TIMEOUT_ERROR
+            elif output.startswith(ERROR_OUTPUT_PREFIXES):
+                error, output = output, ""
+            results.append(TestResult(
+                test_case={'input': value},
+                passed=not error,
+                actual_output=output,
+                expected_output="",
+                execution_time=case['time'],
+                error_message=error,
+                skipped=bool(case.get('skipped')),
+                skip_reason=case.get('skipped', "")
+            ))
+        return results
+
+    def test_solution(self, code: Submission, test_cases: List[Dict[str, Any]]) -> List[TestResult]:
+        """
+        Тестирование решения
+        
+        Все тесты выполняются в одном процессе-песочнице: код решения
+        компилируется один раз, каждый тест выполняет модуль заново и
+        вызывает функцию студента с
+        отдельным ограничением времени и изоляцией исключений. Общее
+        время всех тестов ограничено submission_budget, в режиме fail_fast
+        тестирование останавливается на первом непройденном тесте;
+        невыполненные тесты возвращаются с skipped=True и причиной в
+        skip_reason.
+        
+        Args:
+            code: Код решения (строка или ParsedSubmission)
             test_cases: Список тестовых случаев
             
         Returns:
             Список результатов тестирования
         """
+        submission = self.parse(code)
+        code = submission.source
         results = []
         
         # Проверка: код не должен быть пустым
@@ -256,11 +604,11 @@ class CodeChecker:
             return results
         
         # Извлекаем имя функции из кода студента
-        function_name = self._extract_function_name(code)
+        function_name = self._extract_function_name(submission)
         
+        calls = []
         for test_case in test_cases:
             input_data_str = str(test_case.get('input', ''))
-            expected = str(test_case.get('expected', ''))
             
             # Безопасно распарсим входные данные
             try:
@@ -268,87 +616,48 @@ class CodeChecker:
             except:
                 input_data_value = input_data_str.strip('"\'')
             
-            # Создаем тестовый код без exec()
-            if function_name:
-                # Если нашли функцию, вызываем её напрямую
-                if isinstance(input_data_value, str):
-                    # Для строковых аргументов
-                    test_code = f"""# -*- coding: utf-8 -*-
-{code}
-
-# Testing
-try:
-    result = {function_name}({repr(input_data_value)})
-    print(result)
-except Exception as e:
-    print(f"Error: {{e}}")
-"""
-                else:
-                    # Для числовых/списковых аргументов
-                    test_code = f"""# -*- coding: utf-8 -*-
-{code}
-
-# Testing
-try:
-    result = {function_name}({repr(input_data_value)})
-    print(result)
-except Exception as e:
-    print(f"Error: {{e}}")
-"""
-            else:
-                # Если функция не найдена, используем fallback логику
-                # Пробуем найти функцию по известным именам
-                known_functions = ['find_max', 'count_words', 'sort_list', 'fibonacci', 'filter_even']
-                function_call = None
-                
-                for func_name in known_functions:
-                    if func_name in code:
-                        if isinstance(input_data_value, str):
-                            function_call = f"{func_name}({repr(input_data_value)})"
-                        else:
-                            function_call = f"{func_name}({repr(input_data_value)})"
-                        break
-                
-                if function_call:
-                    test_code = f"""# -*- coding: utf-8 -*-
-{code}
-
-# Testing
-try:
-    result = {function_call}
-    print(result)
-except Exception as e:
-    print(f"Error: {{e}}")
-"""
-                else:
-                    # Если не нашли функцию, просто выполняем код и проверяем вывод
-                    test_code = f"# -*- coding: utf-8 -*-\n{code}"
-                    # Если ожидается вывод, проверяем наличие print
-                    if 'print(' not in code:
-                        test_code = f"""# -*- coding: utf-8 -*-
-{code}
-print(result)
-"""
-            
-            # Проверка безопасности только для кода студента
-            student_code_safe, violations = self.check_security(code)
-            if not student_code_safe:
-                # Если код студента небезопасен, пропускаем выполнение
-                success = False
-                output = ""
-                execution_time = 0.0
-                error = f"Нарушения безопасности: {', '.join(violations)}"
-            else:
-                # Если код студента безопасен, выполняем тестовый код
-                # Пропускаем повторную проверку безопасности, так как код студента уже проверен
-                # и тестовая обертка безопасна (не содержит exec/eval/import)
-                success, output, execution_time, error = self.run_code(test_code, skip_security_check=True)
+            calls.append(self._build_call(code, function_name, input_data_value))
+        
+        # Проверка безопасности только для кода студента (один раз на решение)
+        student_code_safe, violations = self.check_security(submission)
+        # Тест, прерванный общим временем решения, выполнялся не дольше него
+        time_limit = min(self.timeout, self.submission_budget or self.timeout)
+        
+        # Результаты выполнения в формате ответа песочницы
+        if not student_code_safe:
+            # Если код студента небезопасен, пропускаем выполнение
+            error = f"Нарушения безопасности: {', '.join(violations)}"
+            runs = [{'ok': False, 'stdout': "", 'error': error, 'time': 0.0}] * len(test_cases)
+        elif calls and all(call is not None for call in calls):
+            # Все тесты в одном процессе: код студента компилируется один раз
+            expected = [str(test_case.get('expected', '')) for test_case in test_cases] if self.fail_fast else None
+            runs = []
+            for case in self._run_batch(code, calls, expected, self.submission_budget):
+                if case.get('skipped'):
+                    case = dict(case, error=SKIP_MESSAGES[case['skipped']])
+                elif case['timeout']:
+                    case = dict(case, error=TIMEOUT_ERROR, time=time_limit)
+                runs.append(case)
+        else:
+            # Функцию вызвать нельзя: код одинаков для всех тестов, выполняем его один раз
+            test_code = code
+            # Если ожидается вывод, проверяем наличие print
+            if 'print(' not in code:
+                test_code = f"{code}\nprint(result)\n"
+            # Тестовая обертка безопасна (не содержит exec/eval/import),
+            # код студента уже проверен
+            run = self._run_script(test_code, "", time_limit) if test_cases else None
+            runs = [run] * len(test_cases)
+        
+        for test_case, run in zip(test_cases, runs):
+            expected = str(test_case.get('expected', ''))
+            success, output, error = run['ok'], run['stdout'], run['error']
             
             # Очистка вывода
             if success:
                 output = output.strip()
                 # Убираем "Error: " если есть (англ. версия для совместимости)
-                if output.startswith("Error: ") or output.startswith("Ошибка: "):
+                if output.startswith(ERROR_OUTPUT_PREFIXES):
                     success = False
                     error = output
                     output = ""
@@ -361,31 +670,56 @@ print(result)
                 passed=passed,
                 actual_output=output,
                 expected_output=expected,
-                execution_time=execution_time,
-                error_message=error if not success else ""
+                execution_time=run['time'],
+                error_message=error if not success else "",
+                skipped=bool(run.get('skipped')),
+                skip_reason=run.get('skipped', ""),
+                cpu_time=run.get('cpu_time', 0.0),
+                peak_memory=run.get('peak_memory', 0)
             )
             
             results.append(result)
         
         return results
     
-    def analyze_code(self, code: str) -> CodeAnalysis:
+    def analyze_code(self, code: Submission) -> CodeAnalysis:
         """
         Анализ качества кода
         
+        Результат сохраняется в ParsedSubmission, поэтому повторный
+        вызов (например, из get_code_features) не обходит дерево заново.
+        
         Args:
-            code: Код для анализа
+            code: Код для анализа (строка или ParsedSubmission)
             
         Returns:
             Объект анализа кода
         """
-        try:
-            tree = ast.parse(code)
-        except:
+        submission = self.parse(code)
+        if submission.analysis is None:
+            submission.analysis = self._analyze_submission(submission)
+        return submission.analysis
+    
+    def _analyze_submission(self, submission: ParsedSubmission) -> CodeAnalysis:
+        """
+        Вычисление метрик анализа для разобранного кода
+        
+        Все метрики дерева и рекомендации собираются за один обход
+        (см. CodeMetricsVisitor). С кэшем признаков обход выполняется
+        один раз для каждой структуры кода (см. feature_cache.structure_key).
+        
+        Args:
+            submission: Разобранный код
+            
+        Returns:
+            Объект анализа кода
+        """
+        tree = submission.tree
+        if tree is None:
             return CodeAnalysis(
                 syntax_valid=False,
                 complexity_score=0.0,
-                lines_of_code=len(code.splitlines()),
+                lines_of_code=len(submission.lines),
                 functions_count=0,
                 classes_count=0,
                 imports_count=0,
@@ -396,161 +730,65 @@ print(result)
                 suggestions=[]
             )
         
-        # Подсчет различных элементов
-        lines_of_code = len(code.splitlines())
-        functions_count = len([node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)])
-        classes_count = len([node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)])
-        imports_count = len([node for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))])
+        key = structure_key(submission.source) if self.feature_cache is not None else None
+        structure = self.feature_cache.get_structure(key) if key is not None else None
+        if structure is None:
+            metrics = CodeMetricsVisitor()
+            metrics.visit(tree)
+            structure = {
+                'complexity_score': metrics.complexity_score,
+                'functions_count': metrics.functions_count,
+                'classes_count': metrics.classes_count,
+                'imports_count': metrics.imports_count,
+                'variable_names_length': metrics.variable_names_length,
+                'nested_levels': metrics.nested_levels,
+                'error_handling': metrics.error_handling,
+                'suggestions': metrics.suggestions()
+            }
+            if key is not None:
+                self.feature_cache.put_structure(key, structure)
         
         # Подсчет комментариев
-        comment_lines = len([line for line in code.splitlines() if line.strip().startswith('#')])
+        lines_of_code = len(submission.lines)
+        comment_lines = len([line for line in submission.lines if line.strip().startswith('#')])
         comments_ratio = comment_lines / lines_of_code if lines_of_code > 0 else 0.0
         
-        # Анализ имен переменных
-        variable_names = [node.id for node in ast.walk(tree) if isinstance(node, ast.Name)]
-        variable_names_length = sum(len(name) for name in variable_names) / len(variable_names) if variable_names else 0.0
-        
-        # Анализ вложенности
-        max_nested_level = self._calculate_nesting_level(tree)
-        
-        # Проверка обработки ошибок
-        error_handling = any(isinstance(node, (ast.Try, ast.ExceptHandler)) for node in ast.walk(tree))
-        
-        # Расчет сложности
-        complexity_score = self._calculate_complexity(tree)
-        
-        # Генерация предложений
-        suggestions = self._generate_suggestions(code, tree)
-        
         return CodeAnalysis(
             syntax_valid=True,
-            complexity_score=complexity_score,
             lines_of_code=lines_of_code,
-            functions_count=functions_count,
-            classes_count=classes_count,
-            imports_count=imports_count,
             comments_ratio=comments_ratio,
-            variable_names_length=variable_names_length,
-            nested_levels=max_nested_level,
-            error_handling=error_handling,
-            suggestions=suggestions
+            **structure
         )
     
-    def _calculate_nesting_level(self, tree: ast.AST) -> int:
-        """
-        Расчет максимального уровня вложенности конструкций кода
-        
-        Функция рекурсивно обходит AST-дерево и подсчитывает максимальную
-        глубину вложенности управляющих конструкций (if, for, while, try, with).
-        
-        Args:
-            tree: AST-дерево для анализа
-            
-        Returns:
-            Максимальный уровень вложенности
-        """
-        def get_nesting_level(node, current_level=0):
-            """
-            Вспомогательная рекурсивная функция для обхода дерева
-            
-            Args:
-                node: Текущий узел AST
-                current_level: Текущий уровень вложенности
-                
-            Returns:
-                Максимальный уровень вложенности в поддереве
-            """
-            max_level = current_level
-            for child in ast.iter_child_nodes(node):
-                if isinstance(child, (ast.If, ast.For, ast.While, ast.Try, ast.With)):
-                    max_level = max(max_level, get_nesting_level(child, current_level + 1))
-                else:
-                    max_level = max(max_level, get_nesting_level(child, current_level))
-            return max_level
-        
-        return get_nesting_level(tree)
-    
-    def _calculate_complexity(self, tree: ast.AST) -> float:
-        """
-        Расчет циклометрической сложности кода
-        
-        Вычисляет циклометрическую сложность кода по формуле Маккейба.
-        Сложность увеличивается на 1 за каждую управляющую конструкцию
-        (if, for, while, except) и логический оператор (and, or).
-        Результат нормализуется на количество строк кода.
-        
-        Args:
-            tree: AST-дерево для анализа
-            
-        Returns:
-            Нормализованная циклометрическая сложность
-        """
-        complexity = 0
-        
-        # Циклометрическая сложность
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.ExceptHandler)):
-                complexity += 1
-            elif isinstance(node, (ast.And, ast.Or)):
-                complexity += 1
-        
-        # Нормализация на количество строк
-        lines = len([node for node in ast.walk(tree) if hasattr(node, 'lineno')])
-        return complexity / max(lines, 1) if lines > 0 else 0
-    
-    def _generate_suggestions(self, code: str, tree: ast.AST) -> List[str]:
-        """
-        Генерация предложений по улучшению качества кода
-        
-        Анализирует код и генерирует список рекомендаций по улучшению:
-        - Разбиение длинных функций
-        - Улучшение именования переменных
-        - Добавление комментариев для сложного кода
-        - Добавление обработки ошибок
-        
-        Args:
-            code: Исходный код в виде строки
-            tree: AST-дерево кода
-            
-        Returns:
-            Список строк с рекомендациями
-        """
-        suggestions = []
-        
-        # Проверка длины функций
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                if len(node.body) > 20:
-                    suggestions.append(f"Функция '{node.name}' слишком длинная. Рассмотрите разбиение на более мелкие функции.")
-        
-        # Проверка имен переменных
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
-                if len(node.id) < 3:
-                    suggestions.append(f"Переменная '{node.id}' имеет слишком короткое имя.")
-        
-        # Проверка комментариев
-        if self._calculate_complexity(tree) > 0.5:
-            suggestions.append("Код имеет высокую сложность. Добавьте комментарии для улучшения читаемости.")
-        
-        # Проверка обработки ошибок
-        if not any(isinstance(node, (ast.Try, ast.ExceptHandler)) for node in ast.walk(tree)):
-            suggestions.append("Рассмотрите добавление обработки ошибок.")
-        
-        return suggestions
-    
-    def get_code_features(self, code: str) -> Dict[str, float]:
+    def get_code_features(self, code: Submission) -> Dict[str, float]:
         """
         Извлечение признаков кода для нейронной сети
         
+        С кэшем признаков уже обработанный текст не разбирается и не
+        анализируется повторно.
+        
         Args:
-            code: Код для анализа
+            code: Код для анализа (строка или ParsedSubmission)
             
         Returns:
             Словарь с признаками
         """
-        analysis = self.analyze_code(code)
+        source = code.source if isinstance(code, ParsedSubmission) else code
+        cacheable = self.feature_cache is not None and isinstance(source, str)
+        if cacheable:
+            cached = self.feature_cache.get_features(source)
+            if cached is not None:
+                return cached[1]
         
+        analysis = self.analyze_code(code)
+        features = self._analysis_features(analysis)
+        if cacheable:
+            self.feature_cache.put_features(source, analysis.syntax_valid, features)
+        return features
+    
+    @staticmethod
+    def _analysis_features(analysis: CodeAnalysis) -> Dict[str, float]:
+        """Признаки для нейронной сети из результата анализа"""
         return {
             'lines_of_code': float(analysis.lines_of_code),
             'functions_count': float(analysis.functions_count),
@@ -563,3 +801,92 @@ print(result)
             'error_handling': 1.0 if analysis.error_handling else 0.0,
             'test_coverage': 0.0  # Пока не реализовано
         }
+    
+    def get_code_features_batch(self, codes: List[str]) -> List[Tuple[bool, Dict[str, float]]]:
+        """
+        Извлечение признаков для нескольких фрагментов кода
+        
+        Разбор и анализ - чистый Python, поэтому при feature_workers > 0
+        большие пакеты распределяются по пулу процессов (создаётся при
+        первом вызове и переиспользуется). С кэшем признаков обрабатываются
+        только фрагменты, которых нет в кэше (повторы внутри пакета - один раз).
+        
+        Args:
+            codes: Список фрагментов кода
+            
+        Returns:
+            Список кортежей (синтаксис корректен, признаки) в порядке codes
+        """
+        if self.feature_cache is None:
+            return self._extract_features_batch(codes)
+        
+        results: List[Optional[Tuple[bool, Dict[str, float]]]] = [None] * len(codes)
+        missing: Dict[str, List[int]] = {}
+        for index, code in enumerate(codes):
+            if code in missing:
+                missing[code].append(index)
+                continue
+            results[index] = self.feature_cache.get_features(code)
+            if results[index] is None:
+                missing[code] = [index]
+        
+        extracted = self._extract_features_batch(list(missing))
+        for (code, indices), (syntax_valid, features) in zip(missing.items(), extracted):
+            self.feature_cache.put_features(code, syntax_valid, features)
+            results[indices[0]] = (syntax_valid, features)
+            for index in indices[1:]:
+                results[index] = (syntax_valid, dict(features))
+        return results
+    
+    def _extract_features_batch(self, codes: List[str]) -> List[Tuple[bool, Dict[str, float]]]:
+        """Признаки фрагментов кода без обращения к кэшу признаков по тексту"""
+        executor = self._get_feature_executor() if len(codes) >= MIN_PARALLEL_BATCH else None
+        if executor is None:
+            # В текущем процессе используются метрики из кэша по структуре
+            analyses = [self.analyze_code(code) for code in codes]
+            return [(analysis.syntax_valid, self._analysis_features(analysis)) for analysis in analyses]
+        
+        chunksize = max(1, len(codes) // (self.feature_workers * 4))
+        return list(executor.map(_code_features, codes, chunksize=chunksize))
+    
+    def _get_feature_executor(self) -> Optional[ProcessPoolExecutor]:
+        """
+        Получение пула процессов для извлечения признаков
+        
+        Returns:
+            Пул процессов или None, если пул отключён
+        """
+        if self.feature_workers <= 0:
+            return None
+        if self._feature_executor is None:
+            with self._pool_lock:
+                if self._feature_executor is None:
+                    # spawn: дочерние процессы не наследуют потоки сервера и пула песочниц
+                    self._feature_executor = ProcessPoolExecutor(
+                        max_workers=self.feature_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._feature_executor
+
+
+def _case_passed(case: Dict[str, Any], expected: str) -> bool:
+    """Тест пакета пройден (то же сравнение, что в CodeChecker.test_solution)"""
+    if case.get('skipped') or not case['ok']:
+        return False
+    output = case['stdout'].strip()
+    return not output.startswith(ERROR_OUTPUT_PREFIXES) and output == expected
+
+
+def _code_features(code: str) -> Tuple[bool, Dict[str, float]]:
+    """
+    Признаки одного фрагмента кода (выполняется в процессах пула)
+    
+    Args:
+        code: Фрагмент кода
+        
+    Returns:
+        Кортеж (синтаксис корректен, признаки)
+    """
+    checker = CodeChecker()
+    submission = checker.parse(code)
+    return submission.syntax_valid, checker.get_code_features(submission)
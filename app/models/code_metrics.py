@@ -0,0 +1,170 @@
+"""
+Вычисление метрик кода за один обход AST-дерева
+
+Все метрики CodeAnalysis (количество функций, классов, импортов, длина
+имён, вложенность, обработка ошибок, циклометрическая сложность) и
+рекомендации собираются одним посетителем вместо отдельного ast.walk
+для каждой метрики.
+
+Обход выполняется в ширину с явной очередью (в том же порядке, что и
+ast.walk), поэтому глубоко вложенный код не упирается в предел рекурсии,
+а порядок рекомендаций совпадает с прежней реализацией.
+"""
+
+import ast
+from collections import deque
+from typing import List
+
+
+# Конструкции, увеличивающие уровень вложенности
+NESTING_NODES = (ast.If, ast.For, ast.While, ast.Try, ast.With)
+
+# Порог длины тела функции для рекомендации о разбиении
+MAX_FUNCTION_BODY = 20
+
+# Минимальная длина имени переменной
+MIN_VARIABLE_NAME = 3
+
+# Порог сложности для рекомендации добавить комментарии
+HIGH_COMPLEXITY = 0.5
+
+
+class CodeMetricsVisitor(ast.NodeVisitor):
+    """
+    Посетитель AST, собирающий метрики качества кода за один обход
+
+    Пример:
+        visitor = CodeMetricsVisitor()
+        visitor.visit(tree)
+        visitor.complexity_score, visitor.nested_levels, visitor.suggestions()
+    """
+
+    def __init__(self):
+        """Инициализация счётчиков"""
+        self.functions_count = 0
+        self.classes_count = 0
+        self.imports_count = 0
+        self.names_count = 0
+        self.names_total_length = 0
+        self.nested_levels = 0
+        self.error_handling = False
+        self.branches = 0          # if/for/while/except и логические операторы
+        self.located_nodes = 0     # Узлы с номером строки (нормировка сложности)
+        self.long_functions: List[str] = []
+        self.short_names: List[str] = []
+
+    def visit(self, node: ast.AST):
+        """
+        Итеративный обход дерева в ширину
+
+        Для каждого узла вызывается обработчик visit_<Тип>, если он
+        определён. Дочерние узлы обработчики не посещают - это делает
+        очередь обхода, поэтому глубина дерева не ограничена стеком.
+
+        Args:
+            node: Корень AST-дерева
+        """
+        handlers = {}
+        queue = deque([(node, 0)])
+
+        while queue:
+            node, level = queue.popleft()
+
+            node_type = type(node)
+            if node_type not in handlers:
+                handlers[node_type] = getattr(self, 'visit_' + node_type.__name__, None)
+            handler = handlers[node_type]
+            if handler is not None:
+                handler(node)
+
+            if hasattr(node, 'lineno'):
+                self.located_nodes += 1
+            if level > self.nested_levels:
+                self.nested_levels = level
+
+            for child in ast.iter_child_nodes(node):
+                queue.append((child, level + 1 if isinstance(child, NESTING_NODES) else level))
+
+    def visit_FunctionDef(self, node: ast.FunctionDef):
+        """Функция: счётчик и проверка длины тела"""
+        self.functions_count += 1
+        if len(node.body) > MAX_FUNCTION_BODY:
+            self.long_functions.append(node.name)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        """Класс"""
+        self.classes_count += 1
+
+    def visit_Import(self, node: ast.Import):
+        """Импорт"""
+        self.imports_count += 1
+
+    visit_ImportFrom = visit_Import
+
+    def visit_Name(self, node: ast.Name):
+        """Имя переменной: длина и проверка коротких имён при присваивании"""
+        self.names_count += 1
+        self.names_total_length += len(node.id)
+        if isinstance(node.ctx, ast.Store) and len(node.id) < MIN_VARIABLE_NAME:
+            self.short_names.append(node.id)
+
+    def visit_If(self, node: ast.AST):
+        """Ветвление или цикл (увеличивает циклометрическую сложность)"""
+        self.branches += 1
+
+    visit_For = visit_If
+    visit_While = visit_If
+    visit_And = visit_If
+    visit_Or = visit_If
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler):
+        """Обработчик исключения: ветвление и признак обработки ошибок"""
+        self.branches += 1
+        self.error_handling = True
+
+    def visit_Try(self, node: ast.Try):
+        """Блок try"""
+        self.error_handling = True
+
+    @property
+    def variable_names_length(self) -> float:
+        """Средняя длина имён переменных"""
+        return self.names_total_length / self.names_count if self.names_count else 0.0
+
+    @property
+    def complexity_score(self) -> float:
+        """
+        Циклометрическая сложность, нормализованная на количество узлов со строкой
+
+        Сложность увеличивается на 1 за каждую управляющую конструкцию
+        (if, for, while, except) и логический оператор (and, or).
+        """
+        lines = self.located_nodes
+        return self.branches / max(lines, 1) if lines > 0 else 0
+
+    def suggestions(self) -> List[str]:
+        """
+        Рекомендации по улучшению качества кода
+
+        Returns:
+            Список строк с рекомендациями
+        """
+        suggestions = []
+
+        # Проверка длины функций
+        for name in self.long_functions:
+            suggestions.append(f"Функция '{name}' слишком длинная. Рассмотрите разбиение на более мелкие функции.")
+
+        # Проверка имен переменных
+        for name in self.short_names:
+            suggestions.append(f"Переменная '{name}' имеет слишком короткое имя.")
+
+        # Проверка комментариев
+        if self.complexity_score > HIGH_COMPLEXITY:
+            suggestions.append("Код имеет высокую сложность. Добавьте комментарии для улучшения читаемости.")
+
+        # Проверка обработки ошибок
+        if not self.error_handling:
+            suggestions.append("Рассмотрите добавление обработки ошибок.")
+
+        return suggestions
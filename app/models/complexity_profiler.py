@@ -0,0 +1,361 @@
+"""
+Эмпирическая оценка сложности решения
+
+Выход efficiency нейронной сети угадывается по статическим признакам
+(вложенность, цикломатическая сложность) и не знает, как быстро код
+работает на самом деле. ComplexityProfiler измеряет это напрямую:
+
+1. По входам тестов задания определяется тип аргумента (число, список,
+   строка) и строится лестница входов возрастающего размера
+   (make_inputs; входы детерминированы, поэтому решение и эталон
+   получают одинаковые данные).
+2. Функция студента и эталонное решение задания (solution_template из
+   шаблонов TaskGenerator) вызываются на лестнице в песочнице
+   (CodeChecker.profile_function). Измерение останавливается, когда
+   вызов становится слишком долгим, поэтому экспоненциальное решение не
+   тратит больше отведённого времени.
+3. По точкам (размер, время) подбирается класс роста fit_growth:
+   O(1), O(n), O(n log n), O(n^2) или O(2^n).
+4. Время решения сравнивается со временем эталона на наибольшем
+   размере, измеренном у обоих (time_ratio), и вычисляется измеренная
+   эффективность measured_efficiency в [0, 1].
+
+Результаты сохраняются как дополнительные признаки решения
+(profile_features, PROFILE_FEATURES): текущая сеть использует только
+FEATURE_SCALES и их не видит, а дообучение берёт measured_efficiency как
+целевое значение efficiency (retraining.solution_target).
+
+Например, для шаблона fibonacci наивная рекурсия получает O(2^n), а
+итеративное решение - O(n).
+"""
+
+import ast
+import math
+import random
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .code_checker import CodeChecker, Submission
+from .feature_cache import source_key
+
+
+# Классы роста в порядке возрастания (индекс - growth_order)
+GROWTH_CLASSES = ('O(1)', 'O(n)', 'O(n log n)', 'O(n^2)', 'O(2^n)')
+
+# Лестницы размеров: число - значение аргумента (в начале шаг линейный,
+# чтобы различить экспоненциальный рост), список и строка - длина
+INT_SIZES = (4, 8, 12, 16, 20, 24, 28, 32, 64, 128, 256, 512, 1024)
+SEQUENCE_SIZES = tuple(2 ** power for power in range(4, 15))
+
+# Минимальное число измеренных размеров для подбора класса роста
+MIN_POINTS = 4
+
+# Верхние границы наклона log t по log n для полиномиальных классов
+# (n log n на этих размерах даёт наклон около 1.1-1.4 из-за кэшей процессора)
+GROWTH_SLOPES = (('O(1)', 0.3), ('O(n)', 1.3), ('O(n log n)', 1.7))
+
+# Время вызова, ниже которого оно определяется накладными расходами (секунды)
+MEASURE_FLOOR = 1e-5
+
+# Наименьшая разница наклонов, при которой более высокий класс роста снижает оценку
+MIN_SLOPE_EXCESS = 0.4
+
+# Экспоненциальный рост: время растёт не меньше чем в 1.2 раза на единицу размера
+MIN_EXPONENTIAL_BASE = 1.2
+
+# Эталон не делает допустимым рост выше O(n^2) (наивная рекурсия в шаблоне)
+MAX_REFERENCE_ORDER = GROWTH_CLASSES.index('O(n^2)')
+
+# Доля бюджета профилирования, после которой вызов считается слишком долгим
+CALL_LIMIT_SHARE = 8
+
+PROFILE_SEED = 0
+
+# Дополнительные признаки решения (profile_features)
+PROFILE_FEATURES = ('growth_order', 'time_ratio', 'measured_efficiency')
+
+
+def input_kind(test_cases: List[Dict[str, Any]]) -> Optional[str]:
+    """
+    Тип аргумента функции по входам тестов
+
+    Args:
+        test_cases: Тесты задания
+
+    Returns:
+        'int', 'list' (список чисел), 'str' или None, если тип не
+        определяется или различается между тестами
+    """
+    kinds = set()
+    for test_case in test_cases:
+        try:
+            value = ast.literal_eval(str(test_case.get('input', '')))
+        except (ValueError, SyntaxError, TypeError, MemoryError, RecursionError):
+            return None
+        if isinstance(value, bool):
+            return None
+        if isinstance(value, int):
+            kinds.add('int')
+        elif isinstance(value, str):
+            kinds.add('str')
+        elif isinstance(value, list) and all(isinstance(item, (int, float)) and not isinstance(item, bool)
+                                             for item in value):
+            kinds.add('list')
+        else:
+            return None
+    return kinds.pop() if len(kinds) == 1 else None
+
+
+def make_inputs(kind: str) -> Tuple[List[int], List[str]]:
+    """
+    Лестница входов возрастающего размера
+
+    Args:
+        kind: Тип аргумента (см. input_kind)
+
+    Returns:
+        Кортеж (размеры, литералы аргумента)
+    """
+    rng = random.Random(PROFILE_SEED)
+    if kind == 'int':
+        return list(INT_SIZES), [str(size) for size in INT_SIZES]
+    literals = []
+    for size in SEQUENCE_SIZES:
+        if kind == 'list':
+            literals.append(repr([rng.randint(-1000, 1000) for _ in range(size)]))
+        else:
+            literals.append(repr(' '.join(f"w{rng.randint(0, 999)}" for _ in range(size))))
+    return list(SEQUENCE_SIZES), literals
+
+
+def _fit_line(x: np.ndarray, y: np.ndarray) -> Tuple[float, float]:
+    """Наклон прямой y = a + k*x и среднеквадратичное отклонение от неё"""
+    slope, intercept = np.polyfit(x, y, 1)
+    return float(slope), float(np.sqrt(np.mean((intercept + slope * x - y) ** 2)))
+
+
+def fit_growth(sizes: List[int], times: List[float]) -> Optional[Tuple[str, float]]:
+    """
+    Класс роста времени выполнения
+
+    Экспоненциальный рост - log t лучше ложится на прямую по n, чем по
+    log n, и время растёт не меньше чем в MIN_EXPONENTIAL_BASE раз на
+    единицу размера. Иначе класс определяется по наклону k прямой
+    log t = a + k*log n (GROWTH_SLOPES). Наклон считается по точкам не
+    быстрее MEASURE_FLOOR: на малых размерах время определяется накладными
+    расходами вызова, а не алгоритмом.
+
+    Args:
+        sizes: Размеры входа
+        times: Время вызова для каждого размера (секунды)
+
+    Returns:
+        Кортеж (элемент GROWTH_CLASSES, наклон k) или None, если точек
+        меньше MIN_POINTS
+    """
+    if len(sizes) < MIN_POINTS:
+        return None
+    n = np.asarray(sizes, dtype=np.float64)
+    log_t = np.log(np.maximum(np.asarray(times, dtype=np.float64), 1e-9))
+
+    base_slope, exponential_error = _fit_line(n, log_t)
+    slope, power_error = _fit_line(np.log(n), log_t)
+    if math.exp(base_slope) >= MIN_EXPONENTIAL_BASE and exponential_error < power_error:
+        return 'O(2^n)', slope
+
+    above_floor = log_t >= math.log(MEASURE_FLOOR)
+    if above_floor.sum() >= 3:
+        slope, _ = _fit_line(np.log(n[above_floor]), log_t[above_floor])
+    elif log_t[-1] - log_t[0] < math.log(2):
+        # Всё время - накладные расходы вызова, и оно почти не растёт
+        return 'O(1)', 0.0
+
+    for growth, max_slope in GROWTH_SLOPES:
+        if slope < max_slope:
+            return growth, slope
+    return 'O(n^2)', slope
+
+
+def measured_efficiency(measured: Dict[str, Any], reference: Optional[Dict[str, Any]],
+                        time_ratio: Optional[float]) -> float:
+    """
+    Измеренная эффективность решения в [0, 1]
+
+    Каждый класс роста выше эталонного (эталон не делает допустимым рост
+    выше O(n^2)) уменьшает оценку вдвое. Полиномиальный класс выше
+    эталонного не учитывается, если наклон больше эталонного меньше чем на
+    MIN_SLOPE_EXCESS: O(n) и O(n log n) на этих размерах различаются
+    слабо. Решение медленнее эталона в r раз получает множитель r^(-1/4)
+    (в 16 раз медленнее - 0.5).
+
+    Args:
+        measured: Профиль решения (growth, slope)
+        reference: Профиль эталона (None - эталона нет, допустим O(n))
+        time_ratio: Время решения / время эталона (None - не сравнивалось)
+
+    Returns:
+        Оценка эффективности
+    """
+    reference_growth, reference_slope = (reference['growth'], reference['slope']) if reference else ('O(n)', 1.0)
+    excess = GROWTH_CLASSES.index(measured['growth']) - min(GROWTH_CLASSES.index(reference_growth),
+                                                           MAX_REFERENCE_ORDER)
+    if measured['growth'] != 'O(2^n)' and measured['slope'] - reference_slope < MIN_SLOPE_EXCESS:
+        excess = 0
+    score = 0.5 ** max(excess, 0)
+    if time_ratio is not None and time_ratio > 1:
+        score *= time_ratio ** -0.25
+    return round(score, 4)
+
+
+def profile_features(profile: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    Дополнительные признаки решения по результату профилирования
+
+    Args:
+        profile: Результат ComplexityProfiler.profile (None - не профилировалось)
+
+    Returns:
+        Словарь PROFILE_FEATURES (пустой, если профиля нет)
+    """
+    if not profile:
+        return {}
+    return {
+        'growth_order': float(GROWTH_CLASSES.index(profile['growth'])),
+        'time_ratio': float(profile['time_ratio']) if profile['time_ratio'] is not None else 1.0,
+        'measured_efficiency': profile['efficiency']
+    }
+
+
+class ComplexityProfiler:
+    """Профилирование решения на входах возрастающего размера"""
+
+    def __init__(self, code_checker: CodeChecker, budget: float = 1.0, max_references: int = 256):
+        """
+        Инициализация профилировщика
+
+        Args:
+            code_checker: Проверщик кода (песочница и разбор кода)
+            budget: Время на профилирование одной функции в секундах
+            max_references: Сколько профилей эталонных решений хранить в памяти
+        """
+        if budget <= 0:
+            raise ValueError("budget должно быть положительным")
+
+        self.code_checker = code_checker
+        self.budget = budget
+        self.max_references = max_references
+        self._references: 'OrderedDict[Tuple[str, str], Optional[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'profiled': 0, 'unsupported': 0, 'failed': 0, 'reference_runs': 0}
+
+    def profile(self, code: Submission, test_cases: List[Dict[str, Any]],
+                reference_code: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Профилирование решения
+
+        Args:
+            code: Код решения (строка или ParsedSubmission), выполняющийся на тестах без ошибок
+            test_cases: Тесты задания (по ним определяется тип входа)
+            reference_code: Эталонное решение задания (None - без сравнения)
+
+        Returns:
+            Словарь growth, slope, sizes, times, reference_growth,
+            time_ratio, efficiency или None, если решение профилировать нельзя (тип
+            входа не определён, функция не найдена, измерено меньше
+            MIN_POINTS размеров)
+        """
+        submission = self.code_checker.parse(code)
+        kind = input_kind(test_cases)
+        function_name = _function_name(submission)
+        if kind is None or function_name is None or not self.code_checker.check_security(submission)[0]:
+            self._count('unsupported')
+            return None
+
+        measured = self._measure(submission.source, function_name, kind)
+        if measured is None:
+            self._count('failed')
+            return None
+
+        reference = self._reference(reference_code, kind) if reference_code else None
+        time_ratio = None
+        if reference is not None:
+            common = min(len(measured['times']), len(reference['times'])) - 1
+            time_ratio = float(f"{measured['times'][common] / max(reference['times'][common], 1e-9):.4g}")
+
+        self._count('profiled')
+        return {
+            'growth': measured['growth'],
+            'slope': measured['slope'],
+            'sizes': measured['sizes'],
+            'times': measured['times'],
+            'reference_growth': reference['growth'] if reference is not None else None,
+            'time_ratio': time_ratio,
+            'efficiency': measured_efficiency(measured, reference, time_ratio)
+        }
+
+    def _measure(self, code: str, function_name: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Измерение функции на лестнице входов и подбор класса роста"""
+        sizes, inputs = make_inputs(kind)
+        times, error = self.code_checker.profile_function(code, function_name, inputs, self.budget,
+                                                          self.budget / CALL_LIMIT_SHARE)
+        # Точки до первого неизмеренного размера
+        points = []
+        for size, elapsed in zip(sizes, times):
+            if elapsed is None:
+                break
+            points.append((size, elapsed))
+        if error or len(points) < MIN_POINTS:
+            return None
+        measured_sizes = [size for size, _ in points]
+        measured_times = [round(elapsed, 9) for _, elapsed in points]
+        growth, slope = fit_growth(measured_sizes, measured_times)
+        return {'sizes': measured_sizes, 'times': measured_times, 'growth': growth, 'slope': round(slope, 3)}
+
+    def _reference(self, reference_code: str, kind: str) -> Optional[Dict[str, Any]]:
+        """Профиль эталонного решения (измеряется один раз на код и тип входа)"""
+        key = (source_key(reference_code), kind)
+        with self._lock:
+            if key in self._references:
+                self._references.move_to_end(key)
+                return self._references[key]
+
+        submission = self.code_checker.parse(reference_code)
+        function_name = _function_name(submission)
+        reference = self._measure(reference_code, function_name, kind) if function_name else None
+        self._count('reference_runs')
+
+        with self._lock:
+            self._references[key] = reference
+            while len(self._references) > self.max_references:
+                self._references.popitem(last=False)
+        return reference
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Статистика профилировщика
+
+        Returns:
+            Счётчики профилирований и размер кэша эталонов
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['references'] = len(self._references)
+        stats['budget'] = self.budget
+        return stats
+
+
+def _function_name(submission) -> Optional[str]:
+    """Имя первой функции верхнего уровня"""
+    if submission.tree is None:
+        return None
+    for node in submission.tree.body:
+        if isinstance(node, ast.FunctionDef):
+            return node.name
+    return None
@@ -0,0 +1,338 @@
+"""
+Загрузка обучающих данных нейронной сети
+
+Все точки входа обучения (train_final_model.py, train_neural_network.py,
+скрипты experiments/ и фоновые задания /api/train-model) получают данные
+отсюда, поэтому признаки нормализуются одинаково - так же, как при
+инференсе (normalize_features, FEATURE_SCALES).
+
+Формат training_data.json - массив (или JSON Lines) примеров:
+
+    {"code": "...", "features": {"lines_of_code": 3.0, ...}, "target": [1.0, 0.9, 0.95]}
+
+Каждый пример проверяется: все признаки FEATURE_SCALES присутствуют и
+являются конечными числами, target - TARGET_SIZE чисел.
+
+Файл разбирается потоково (по блокам, без json.load всего файла), а
+результат сохраняется рядом в .cache/ как пара файлов .npy float32,
+ключ - SHA-256 содержимого JSON. Повторная загрузка отображает кэш в
+память (np.load(mmap_mode='r')) без разбора JSON.
+"""
+
+import glob
+import hashlib
+import json
+import math
+import os
+import shutil
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .neural_network import FEATURE_SCALES, normalize_features
+
+
+# Путь к обучающим данным по умолчанию
+TRAINING_DATA_PATH = 'data/training_data/training_data.json'
+
+# Имя каталога кэша (создаётся рядом с JSON-файлом)
+CACHE_DIR_NAME = '.cache'
+
+# Версия формата кэша: увеличивается при изменении разбора или нормализации
+CACHE_FORMAT_VERSION = 1
+
+# Размер выходного вектора (correctness, efficiency, readability)
+TARGET_SIZE = 3
+
+# Тип элементов матриц (little-endian float32)
+DTYPE = np.dtype('<f4')
+
+FEATURE_NAMES = tuple(name for name, _ in FEATURE_SCALES)
+
+
+class DatasetError(ValueError):
+    """Ошибка формата обучающих данных"""
+
+
+@dataclass
+class Dataset:
+    """
+    Обучающая выборка в виде непрерывных матриц float32
+
+    Attributes:
+        X: Матрица признаков N×10 (нормализованных)
+        y: Матрица целевых значений N×3
+        source: Путь к исходному JSON-файлу
+        digest: SHA-256 исходного файла (ключ кэша)
+        cached: Данные прочитаны из кэша .npy
+    """
+    X: np.ndarray
+    y: np.ndarray
+    source: str
+    digest: str
+    cached: bool = False
+
+    def __len__(self) -> int:
+        return self.X.shape[0]
+
+    def pairs(self) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Примеры в прежнем формате SimpleNeuralNetwork.train
+
+        Returns:
+            Список кортежей (x ∈ ℝ¹ˣ¹⁰, y ∈ ℝ¹ˣ³)
+        """
+        return [(self.X[i:i + 1], self.y[i:i + 1]) for i in range(len(self))]
+
+    def chunks(self, chunk_size: int = 4096) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+        """
+        Последовательные блоки (X, y) по chunk_size примеров
+
+        Для данных из кэша блоки - срезы отображённых в память файлов,
+        в оперативную память читается только текущий блок.
+        """
+        for start in range(0, len(self), chunk_size):
+            yield self.X[start:start + chunk_size], self.y[start:start + chunk_size]
+
+
+def validate_example(example: Any, index: int):
+    """
+    Проверка схемы одного примера
+
+    Args:
+        example: Разобранный JSON-объект
+        index: Номер примера (для сообщения об ошибке)
+
+    Raises:
+        DatasetError: Если пример не соответствует схеме
+    """
+    if not isinstance(example, dict):
+        raise DatasetError(f"Пример {index}: ожидается объект, получено {type(example).__name__}")
+
+    features = example.get('features')
+    if not isinstance(features, dict):
+        raise DatasetError(f"Пример {index}: отсутствует объект 'features'")
+    for name in FEATURE_NAMES:
+        value = features.get(name)
+        if not _is_number(value):
+            raise DatasetError(f"Пример {index}: признак '{name}' должен быть конечным числом, получено {value!r}")
+
+    target = example.get('target')
+    if (not isinstance(target, list) or len(target) != TARGET_SIZE
+            or not all(_is_number(value) for value in target)):
+        raise DatasetError(f"Пример {index}: 'target' должен быть списком из {TARGET_SIZE} чисел")
+
+
+def _is_number(value: Any) -> bool:
+    """Конечное число (bool допускается как 0/1)"""
+    return isinstance(value, (int, float)) and math.isfinite(value)
+
+
+def iter_examples(path: str = TRAINING_DATA_PATH, block_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """
+    Потоковый разбор примеров из JSON-массива или JSON Lines
+
+    Файл читается блоками по block_size символов, в памяти хранится
+    только текущий блок и ещё не разобранный хвост.
+
+    Args:
+        path: Путь к файлу
+        block_size: Размер блока чтения
+
+    Yields:
+        Словари примеров (без проверки схемы)
+
+    Raises:
+        DatasetError: Если файл не является корректным JSON
+    """
+    decoder = json.JSONDecoder()
+    with open(path, 'r', encoding='utf-8') as f:
+        buffer, pos, eof = '', 0, False
+        in_array = None
+
+        while True:
+            # Пропуск пробелов и разделителей, дочитывание следующего блока
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                if eof:
+                    break
+                block = f.read(block_size)
+                buffer, pos, eof = block, 0, not block
+                continue
+
+            char = buffer[pos]
+            if in_array is None:
+                in_array = char == '['
+                if in_array:
+                    pos += 1
+                    continue
+            if in_array and char == ']':
+                return
+
+            try:
+                example, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError as e:
+                if eof:
+                    raise DatasetError(f"Некорректный JSON в {path}: {e}")
+                # Объект не поместился в блок - дочитываем
+                block = f.read(block_size)
+                buffer, pos, eof = buffer[pos:] + block, 0, not block
+                continue
+
+            yield example
+            pos = end
+
+    if in_array:
+        raise DatasetError(f"Некорректный JSON в {path}: массив не закрыт")
+
+
+def iter_chunks(path: str = TRAINING_DATA_PATH, chunk_size: int = 4096) -> Iterator[Tuple[np.ndarray, np.ndarray]]:
+    """
+    Потоковое чтение выборки блоками нормализованных матриц
+
+    Подходит для файлов, которые не помещаются в память целиком.
+
+    Args:
+        path: Путь к JSON-файлу
+        chunk_size: Количество примеров в блоке
+
+    Yields:
+        Кортежи (X float32 k×10, y float32 k×3), k <= chunk_size
+
+    Raises:
+        DatasetError: Если пример не соответствует схеме
+    """
+    features, targets = [], []
+    for index, example in enumerate(iter_examples(path)):
+        validate_example(example, index)
+        features.append(example['features'])
+        targets.append(example['target'])
+        if len(features) == chunk_size:
+            yield _to_arrays(features, targets)
+            features, targets = [], []
+    if features:
+        yield _to_arrays(features, targets)
+
+
+def _to_arrays(features: List[Dict[str, float]], targets: List[List[float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Нормализованные матрицы блока примеров"""
+    X = normalize_features(features, dtype=np.float32).astype(DTYPE, copy=False)
+    y = np.array(targets, dtype=DTYPE).reshape(-1, TARGET_SIZE)
+    return X, y
+
+
+def file_digest(path: str) -> str:
+    """
+    Ключ кэша: SHA-256 содержимого файла, версии формата и масштабов признаков
+
+    Args:
+        path: Путь к JSON-файлу
+
+    Returns:
+        Шестнадцатеричный SHA-256
+    """
+    digest = hashlib.sha256()
+    digest.update(f"v{CACHE_FORMAT_VERSION}:{FEATURE_SCALES!r}\0".encode('utf-8'))
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def load_dataset(path: str = TRAINING_DATA_PATH, cache_dir: Optional[str] = None,
+                 use_cache: bool = True, mmap: bool = True) -> Dataset:
+    """
+    Загрузка обучающей выборки
+
+    Args:
+        path: Путь к JSON-файлу
+        cache_dir: Каталог кэша (по умолчанию .cache рядом с файлом)
+        use_cache: Читать и сохранять кэш .npy
+        mmap: Отображать кэш в память вместо чтения целиком
+
+    Returns:
+        Dataset с матрицами X (N×10) и y (N×3) float32
+
+    Raises:
+        FileNotFoundError: Если файл не найден
+        DatasetError: Если данные не соответствуют схеме или пусты
+    """
+    digest = file_digest(path)
+    if cache_dir is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIR_NAME)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    x_path = os.path.join(cache_dir, f"{stem}-{digest[:16]}.X.npy")
+    y_path = os.path.join(cache_dir, f"{stem}-{digest[:16]}.y.npy")
+    mmap_mode = 'r' if mmap else None
+
+    if use_cache and os.path.exists(x_path) and os.path.exists(y_path):
+        return Dataset(np.load(x_path, mmap_mode=mmap_mode), np.load(y_path, mmap_mode=mmap_mode),
+                       path, digest, cached=True)
+
+    if use_cache:
+        try:
+            os.makedirs(cache_dir, exist_ok=True)
+            rows = _build_cache(path, x_path, y_path)
+        except OSError as e:
+            print(f"⚠️  Кэш обучающих данных недоступен ({e}), данные загружаются без кэша")
+        else:
+            if rows == 0:
+                raise DatasetError(f"В {path} нет обучающих примеров")
+            _remove_stale_cache(cache_dir, stem, digest)
+            return Dataset(np.load(x_path, mmap_mode=mmap_mode), np.load(y_path, mmap_mode=mmap_mode),
+                           path, digest)
+
+    chunks = list(iter_chunks(path))
+    if not chunks:
+        raise DatasetError(f"В {path} нет обучающих примеров")
+    X = np.ascontiguousarray(np.concatenate([X for X, _ in chunks]))
+    y = np.ascontiguousarray(np.concatenate([y for _, y in chunks]))
+    return Dataset(X, y, path, digest)
+
+
+def _build_cache(path: str, x_path: str, y_path: str) -> int:
+    """
+    Потоковая запись кэша .npy (блоки сначала пишутся во временные файлы,
+    заголовок с итоговой формой - после подсчёта строк)
+
+    Returns:
+        Количество примеров
+    """
+    rows = 0
+    with tempfile.TemporaryFile() as x_raw, tempfile.TemporaryFile() as y_raw:
+        for X, y in iter_chunks(path):
+            x_raw.write(X.tobytes())
+            y_raw.write(y.tobytes())
+            rows += X.shape[0]
+        if rows:
+            _write_npy(x_path, x_raw, (rows, len(FEATURE_NAMES)))
+            _write_npy(y_path, y_raw, (rows, TARGET_SIZE))
+    return rows
+
+
+def _write_npy(path: str, raw, shape: Tuple[int, int]):
+    """Атомарная запись файла .npy из сырых байтов float32"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as out:
+        np.lib.format.write_array_header_1_0(out, {
+            'descr': np.lib.format.dtype_to_descr(DTYPE),
+            'fortran_order': False,
+            'shape': shape
+        })
+        raw.seek(0)
+        shutil.copyfileobj(raw, out)
+    os.replace(temp_path, path)
+
+
+def _remove_stale_cache(cache_dir: str, stem: str, digest: str):
+    """Удаление кэша прежних версий файла"""
+    current = f"{stem}-{digest[:16]}."
+    for cached_path in glob.glob(os.path.join(cache_dir, f"{stem}-*.npy")):
+        if not os.path.basename(cached_path).startswith(current):
+            try:
+                os.remove(cached_path)
+            except OSError:
+                pass
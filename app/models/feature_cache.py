@@ -0,0 +1,171 @@
+"""
+Кэш признаков кода для нейронной сети
+
+Признаки кода (CodeChecker.get_code_features) - детерминированная функция
+исходного текста, но без кэша они вычисляются заново при каждой отправке
+решения и каждой пакетной переоценке. FeatureCache - ограниченный LRU-кэш
+с двумя уровнями ключей:
+
+- исходный текст (source_key): признаки целиком и корректность
+  синтаксиса; при попадании код не разбирается;
+- структура кода (structure_key): метрики AST-дерева и рекомендации
+  (CodeAnalysis без lines_of_code и comments_ratio). Ключ не меняется
+  при правке пустых строк, строк-комментариев и пробелов в конце строк -
+  как и само дерево, поэтому такие правки используют готовые метрики, а
+  количество строк и доля комментариев пересчитываются по тексту.
+
+Ключ структуры вычисляется по нормализованному тексту, а не по
+ast.dump(): сериализация дерева дороже обхода метрик, который она должна
+заменить. Нормализация затрагивает и строки внутри многострочных
+литералов, но метрики не зависят от значений констант. Структурные
+записи используются только для кода, разобранного без ошибок.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+
+def source_key(code: str) -> str:
+    """
+    Ключ исходного текста
+
+    Args:
+        code: Исходный код
+
+    Returns:
+        Шестнадцатеричный SHA-256 текста
+    """
+    return hashlib.sha256(code.encode('utf-8', 'surrogatepass')).hexdigest()
+
+
+def structure_key(code: str) -> str:
+    """
+    Ключ структуры кода: без пустых строк, строк-комментариев и пробелов
+    в конце строк
+
+    Args:
+        code: Исходный код
+
+    Returns:
+        Шестнадцатеричный SHA-256 нормализованного текста
+    """
+    lines = (line.rstrip() for line in code.splitlines())
+    significant = [line for line in lines if line and not line.lstrip().startswith('#')]
+    return source_key('\n'.join(significant))
+
+
+class FeatureCache:
+    """LRU-кэш признаков кода по исходному тексту и по структуре"""
+
+    def __init__(self, max_entries: int = 4096):
+        """
+        Инициализация кэша
+
+        Args:
+            max_entries: Максимальное количество записей каждого уровня
+        """
+        if max_entries < 1:
+            raise ValueError("Размер кэша должен быть не меньше 1")
+
+        self.max_entries = max_entries
+        self._sources: 'OrderedDict[str, Tuple[bool, Dict[str, float]]]' = OrderedDict()
+        self._structures: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'structure_hits': 0, 'structure_misses': 0,
+                      'evictions': 0}
+
+    def get_features(self, code: str) -> Optional[Tuple[bool, Dict[str, float]]]:
+        """
+        Признаки ранее обработанного текста
+
+        Args:
+            code: Исходный код
+
+        Returns:
+            Кортеж (синтаксис корректен, копия признаков) или None
+        """
+        key = source_key(code)
+        with self._lock:
+            entry = self._sources.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self._sources.move_to_end(key)
+            self.stats['hits'] += 1
+        syntax_valid, features = entry
+        return syntax_valid, dict(features)
+
+    def put_features(self, code: str, syntax_valid: bool, features: Dict[str, float]):
+        """
+        Сохранение признаков текста
+
+        Args:
+            code: Исходный код
+            syntax_valid: Код разобран без ошибок
+            features: Признаки (копируются)
+        """
+        key = source_key(code)
+        with self._lock:
+            self._store(self._sources, key, (syntax_valid, dict(features)))
+
+    def get_structure(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Метрики дерева по ключу структуры
+
+        Args:
+            key: Ключ (см. structure_key)
+
+        Returns:
+            Копия метрик или None
+        """
+        with self._lock:
+            metrics = self._structures.get(key)
+            if metrics is None:
+                self.stats['structure_misses'] += 1
+                return None
+            self._structures.move_to_end(key)
+            self.stats['structure_hits'] += 1
+        return dict(metrics, suggestions=list(metrics['suggestions']))
+
+    def put_structure(self, key: str, metrics: Dict[str, Any]):
+        """
+        Сохранение метрик дерева
+
+        Args:
+            key: Ключ (см. structure_key)
+            metrics: Метрики CodeAnalysis, не зависящие от текста (копируются)
+        """
+        with self._lock:
+            self._store(self._structures, key, dict(metrics, suggestions=list(metrics['suggestions'])))
+
+    def _store(self, entries: OrderedDict, key: str, value: Any):
+        """Добавление записи с вытеснением самой старой (вызывается под блокировкой)"""
+        entries[key] = value
+        entries.move_to_end(key)
+        while len(entries) > self.max_entries:
+            entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        """Полная очистка кэша"""
+        with self._lock:
+            self._sources.clear()
+            self._structures.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Статистика кэша
+
+        Returns:
+            Счётчики попаданий и промахов обоих уровней, размеры и доля попаданий
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._sources)
+            stats['structures'] = len(self._structures)
+        stats['max_entries'] = self.max_entries
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / total, 4) if total else 0.0
+        return stats
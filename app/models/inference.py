@@ -0,0 +1,132 @@
+"""
+Ядро инференса нейронной сети для оценки одного фрагмента кода
+
+SimpleNeuralNetwork.evaluate_code_quality проходит через forward(): на
+каждом слое создаются новые массивы, возвращаются выходы всех слоёв,
+проверяются ветки dropout. Для сети из ~100 параметров время вызова
+определяется накладными расходами NumPy, а не арифметикой.
+
+InferenceKernel при создании копирует веса в непрерывные массивы и
+выполняет прямой проход в заранее выделенных буферах (отдельных для
+каждого потока) операциями с out=. Порядок операций совпадает с
+forward(), поэтому результат совпадает с predict() (сравнение и замер
+задержки - benchmarks/bench_inference.py).
+
+Ядро не отслеживает изменения весов сети: после обучения или загрузки
+другой модели его нужно создать заново (ModelServer создаёт ядро для
+каждой загруженной версии).
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from .neural_network import FEATURE_SCALES, SimpleNeuralNetwork, heuristic_quality
+
+
+# Имена выходов сети
+OUTPUT_NAMES = ('correctness', 'efficiency', 'readability')
+
+
+class InferenceKernel:
+    """Прямой проход без выделения памяти (только инференс)"""
+
+    def __init__(self, network: SimpleNeuralNetwork):
+        """
+        Подготовка весов сети
+
+        Args:
+            network: Обученная сеть (веса копируются, сеть не изменяется)
+        """
+        if network.use_two_hidden_layers:
+            weights = [network.weights_input_hidden1, network.weights_hidden1_hidden2,
+                       network.weights_hidden2_output]
+            biases = [network.bias_hidden1, network.bias_hidden2, network.bias_output]
+        else:
+            weights = [network.weights_input_hidden, network.weights_hidden_output]
+            biases = [network.bias_hidden, network.bias_output]
+
+        # Скрытые слои - функция активации сети, выходной слой - всегда sigmoid
+        activations = [network.activation] * (len(weights) - 1) + ['sigmoid']
+        self.layers: List[Tuple[np.ndarray, np.ndarray, str]] = [
+            (np.ascontiguousarray(weight, dtype=np.float64),
+             np.ascontiguousarray(bias, dtype=np.float64).reshape(-1),
+             activation)
+            for weight, bias, activation in zip(weights, biases, activations)
+        ]
+        self.feature_names = tuple(name for name, _ in FEATURE_SCALES)
+        self.scales = np.array([scale for _, scale in FEATURE_SCALES], dtype=np.float64)
+        self.input_size = self.layers[0][0].shape[0]
+        self._local = threading.local()
+
+    def _buffers(self) -> List[np.ndarray]:
+        """Буферы входа и выходов слоёв текущего потока"""
+        buffers = getattr(self._local, 'buffers', None)
+        if buffers is None:
+            buffers = [np.empty(self.input_size)] + [np.empty(weight.shape[1]) for weight, _, _ in self.layers]
+            self._local.buffers = buffers
+        return buffers
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        """
+        Прямой проход для одного нормализованного вектора признаков
+
+        Args:
+            x: Вектор x ∈ ℝ¹⁰ (или матрица 1×10)
+
+        Returns:
+            Буфер выхода ŷ ∈ ℝ³ текущего потока - перезаписывается
+            следующим вызовом, при необходимости его нужно скопировать
+        """
+        buffers = self._buffers()
+        buffers[0][:] = x.reshape(-1)
+        return self._forward(buffers)
+
+    def predict_features(self, code_features: Dict[str, float]) -> List[float]:
+        """
+        Оценки для словаря признаков кода (нормализация FEATURE_SCALES)
+
+        Args:
+            code_features: Словарь с признаками кода
+
+        Returns:
+            Список [correctness, efficiency, readability]
+        """
+        buffers = self._buffers()
+        x = buffers[0]
+        x[:] = [code_features.get(name, 0) for name in self.feature_names]
+        np.divide(x, self.scales, out=x)
+        return self._forward(buffers).tolist()
+
+    def evaluate_code_quality(self, code_features: Dict[str, float]) -> Dict[str, float]:
+        """
+        Оценка качества кода (как SimpleNeuralNetwork.evaluate_code_quality)
+
+        Args:
+            code_features: Словарь с признаками кода
+
+        Returns:
+            Словарь с оценками качества
+        """
+        try:
+            return dict(zip(OUTPUT_NAMES, self.predict_features(code_features)))
+        except (TypeError, ValueError) as e:
+            print(f"⚠️ Ошибка оценки качества кода: {e}")
+            return heuristic_quality(code_features)
+
+    def _forward(self, buffers: List[np.ndarray]) -> np.ndarray:
+        """Слои сети в буферах buffers (buffers[0] - вход)"""
+        for (weight, bias, activation), inputs, outputs in zip(self.layers, buffers, buffers[1:]):
+            np.dot(inputs, weight, out=outputs)
+            outputs += bias
+            if activation == 'relu':
+                np.maximum(outputs, 0, out=outputs)
+            else:
+                # σ(z) = 1 / (1 + e⁻ᶻ), как SimpleNeuralNetwork.sigmoid
+                np.clip(outputs, -500, 500, out=outputs)
+                np.negative(outputs, out=outputs)
+                np.exp(outputs, out=outputs)
+                outputs += 1
+                np.reciprocal(outputs, out=outputs)
+        return buffers[-1]
@@ -0,0 +1,361 @@
+"""
+Двоичный формат моделей нейронной сети (.nnb)
+
+Структура файла (little-endian):
+
+    смещение  размер  содержимое
+    0         4       сигнатура b'NNB\\x00'
+    4         2       версия формата (uint16)
+    6         2       зарезервировано (0)
+    8         4       длина заголовка N (uint32)
+    12        N       заголовок JSON (UTF-8)
+    ...               массивы весов, каждый выровнен по ALIGNMENT байт
+
+Заголовок:
+
+    {"architecture": {"input_size": 10, "hidden_size": 8, ...},
+     "metadata": {"created_at": "...", "final_loss": 0.01, ...},
+     "arrays": {"weights_input_hidden": {"dtype": "<f8", "shape": [10, 8], "offset": 640}, ...}}
+
+read_header читает только первые 12 + N байт, поэтому список моделей
+строится без разбора весов. Массивы отображаются в память (np.memmap в
+режиме копирования при записи): файл на диске не меняется, даже если
+загруженная модель дообучается.
+
+Формат JSON (прежний формат save_model) поддерживается для импорта и
+экспорта; convert_model переводит модели между форматами (из командной
+строки - convert_models.py в корне проекта).
+"""
+
+import hashlib
+import json
+import os
+import struct
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+
+# Расширение файлов двоичного формата
+BINARY_MODEL_EXTENSION = '.nnb'
+
+# Сигнатура и версия формата
+MAGIC = b'NNB\x00'
+FORMAT_VERSION = 1
+
+# Префикс: сигнатура, версия, резерв, длина заголовка
+PREFIX = struct.Struct('<4sHHI')
+
+# Выравнивание массивов (байт)
+ALIGNMENT = 64
+
+# Тип элементов массивов (little-endian float64, как в SimpleNeuralNetwork)
+DTYPE = np.dtype('<f8')
+
+# Параметры архитектуры и значения по умолчанию (для моделей без поля)
+ARCHITECTURE_DEFAULTS = {
+    'input_size': 10,
+    'hidden_size': 8,
+    'hidden_size2': None,
+    'output_size': 3,
+    'learning_rate': 0.01,
+    'activation': 'sigmoid',
+    'dropout_rate': 0.0,
+    'use_two_hidden_layers': False
+}
+
+# Массивы весов для одного и двух скрытых слоёв
+ARRAY_NAMES = {
+    False: ('weights_input_hidden', 'weights_hidden_output', 'bias_hidden', 'bias_output'),
+    True: ('weights_input_hidden1', 'weights_hidden1_hidden2', 'weights_hidden2_output',
+           'bias_hidden1', 'bias_hidden2', 'bias_output')
+}
+
+
+class ModelFormatError(ValueError):
+    """Ошибка формата файла модели"""
+
+
+def is_binary_model(path: str) -> bool:
+    """
+    Проверка сигнатуры двоичного формата (расширение не учитывается)
+
+    Args:
+        path: Путь к файлу модели
+
+    Returns:
+        True для файла .nnb
+    """
+    with open(path, 'rb') as f:
+        return f.read(len(MAGIC)) == MAGIC
+
+
+def encode_model(architecture: Dict[str, Any], arrays: Dict[str, np.ndarray],
+                 metadata: Optional[Dict[str, Any]] = None) -> bytes:
+    """
+    Сериализация модели в двоичный формат
+
+    Args:
+        architecture: Параметры архитектуры (ARCHITECTURE_DEFAULTS)
+        arrays: Массивы весов по именам ARRAY_NAMES
+        metadata: Произвольные JSON-совместимые метаданные
+
+    Returns:
+        Содержимое файла .nnb
+    """
+    metadata = dict(metadata or {})
+    metadata.setdefault('created_at', datetime.now().isoformat(timespec='seconds'))
+    arrays = {name: np.ascontiguousarray(array, dtype=DTYPE) for name, array in arrays.items()}
+
+    # Длина заголовка зависит от смещений, а смещения - от длины заголовка:
+    # смещения пересчитываются, пока начало данных не перестанет сдвигаться
+    data_start = 0
+    while True:
+        table, offset = {}, data_start
+        for name, array in arrays.items():
+            table[name] = {'dtype': DTYPE.str, 'shape': list(array.shape), 'offset': offset}
+            offset = _align(offset + array.nbytes)
+        header = json.dumps({
+            'architecture': {key: architecture.get(key, default)
+                             for key, default in ARCHITECTURE_DEFAULTS.items()},
+            'metadata': metadata,
+            'arrays': table
+        }, ensure_ascii=False).encode('utf-8')
+        required = _align(PREFIX.size + len(header))
+        if required == data_start:
+            break
+        data_start = required
+
+    parts = [PREFIX.pack(MAGIC, FORMAT_VERSION, 0, len(header)), header]
+    position = PREFIX.size + len(header)
+    for name, array in arrays.items():
+        parts.append(b'\0' * (table[name]['offset'] - position))
+        parts.append(array.tobytes())
+        position = table[name]['offset'] + array.nbytes
+    return b''.join(parts)
+
+
+def write_model(path: str, architecture: Dict[str, Any], arrays: Dict[str, np.ndarray],
+                metadata: Optional[Dict[str, Any]] = None):
+    """
+    Атомарная запись модели в файл .nnb
+
+    Файл пишется во временный и заменяется через os.replace, поэтому
+    процессы, отобразившие прежнюю версию в память, продолжают читать её.
+    """
+    data = encode_model(architecture, arrays, metadata)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'wb') as f:
+        f.write(data)
+    os.replace(temp_path, path)
+
+
+def read_header(path: str) -> Dict[str, Any]:
+    """
+    Чтение заголовка без загрузки весов
+
+    Args:
+        path: Путь к файлу .nnb
+
+    Returns:
+        Словарь с ключами version, architecture, metadata, arrays
+
+    Raises:
+        ModelFormatError: Если файл не в формате .nnb или версия не поддерживается
+    """
+    with open(path, 'rb') as f:
+        prefix = f.read(PREFIX.size)
+        if len(prefix) < PREFIX.size or prefix[:len(MAGIC)] != MAGIC:
+            raise ModelFormatError(f"{path}: не является файлом модели {BINARY_MODEL_EXTENSION}")
+        _, version, _, header_size = PREFIX.unpack(prefix)
+        if version > FORMAT_VERSION:
+            raise ModelFormatError(f"{path}: неподдерживаемая версия формата {version}")
+        raw = f.read(header_size)
+
+    try:
+        header = json.loads(raw.decode('utf-8'))
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ModelFormatError(f"{path}: повреждён заголовок ({e})")
+    header['version'] = version
+    return header
+
+
+def read_arrays(path: str, header: Optional[Dict[str, Any]] = None,
+                mmap: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Чтение массивов весов
+
+    Args:
+        path: Путь к файлу .nnb
+        header: Заголовок, если уже прочитан
+        mmap: Отображать массивы в память (иначе читаются в память целиком)
+
+    Returns:
+        Словарь имя -> массив
+
+    Raises:
+        ModelFormatError: Если массив выходит за пределы файла
+    """
+    if header is None:
+        header = read_header(path)
+    file_size = os.path.getsize(path)
+
+    arrays = {}
+    with open(path, 'rb') as f:
+        for name, spec in header['arrays'].items():
+            dtype = np.dtype(spec['dtype'])
+            shape = tuple(spec['shape'])
+            count = int(np.prod(shape))
+            if spec['offset'] + count * dtype.itemsize > file_size:
+                raise ModelFormatError(f"{path}: массив {name} выходит за пределы файла")
+            if mmap and count:
+                array = np.memmap(path, dtype=dtype, mode='c', offset=spec['offset'], shape=shape)
+                arrays[name] = array.view(np.ndarray)
+            else:
+                f.seek(spec['offset'])
+                arrays[name] = np.fromfile(f, dtype=dtype, count=count).reshape(shape)
+    return arrays
+
+
+def read_model_info(path: str) -> Dict[str, Any]:
+    """
+    Архитектура и метаданные модели любого формата
+
+    Для .nnb читается только заголовок; файл JSON разбирается целиком.
+
+    Args:
+        path: Путь к файлу модели
+
+    Returns:
+        Словарь с ключами format ('nnb' или 'json'), architecture, metadata
+
+    Raises:
+        ModelFormatError: Если файл не является моделью
+    """
+    if is_binary_model(path):
+        header = read_header(path)
+        return {'format': 'nnb', 'architecture': header['architecture'],
+                'metadata': header.get('metadata', {})}
+
+    architecture, _, metadata = read_json_model(path, with_arrays=False)
+    return {'format': 'json', 'architecture': architecture, 'metadata': metadata}
+
+
+def read_json_model(path: str, with_arrays: bool = True) -> Tuple[Dict[str, Any], Dict[str, np.ndarray],
+                                                                   Dict[str, Any]]:
+    """
+    Чтение модели в формате JSON
+
+    Returns:
+        Кортеж (architecture, arrays, metadata)
+
+    Raises:
+        ModelFormatError: Если файл не является моделью JSON
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            model_data = json.load(f)
+    except (UnicodeDecodeError, json.JSONDecodeError) as e:
+        raise ModelFormatError(f"{path}: неверный формат JSON ({e})")
+    if not isinstance(model_data, dict) or not all(
+            field in model_data for field in ('input_size', 'hidden_size', 'output_size')):
+        raise ModelFormatError(f"{path}: отсутствуют обязательные поля модели")
+
+    architecture = {key: model_data.get(key, default) for key, default in ARCHITECTURE_DEFAULTS.items()}
+    arrays = {}
+    if with_arrays:
+        for name in ARRAY_NAMES[bool(architecture['use_two_hidden_layers'])]:
+            if name not in model_data:
+                raise ModelFormatError(f"{path}: отсутствует массив {name}")
+            arrays[name] = np.array(model_data[name], dtype=DTYPE)
+    return architecture, arrays, model_data.get('metadata', {})
+
+
+def encode_json_model(architecture: Dict[str, Any], arrays: Dict[str, np.ndarray],
+                      metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Сериализация модели в прежний формат JSON (поля верхнего уровня)"""
+    model_data = {key: architecture.get(key, default) for key, default in ARCHITECTURE_DEFAULTS.items()}
+    model_data.update((name, np.asarray(array).tolist()) for name, array in arrays.items())
+    if metadata:
+        model_data['metadata'] = metadata
+    return json.dumps(model_data, ensure_ascii=False, indent=2)
+
+
+def read_model(path: str, mmap: bool = True) -> Tuple[Dict[str, Any], Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Чтение модели любого формата
+
+    Returns:
+        Кортеж (architecture, arrays, metadata)
+    """
+    if is_binary_model(path):
+        header = read_header(path)
+        architecture = header['architecture']
+        for name in ARRAY_NAMES[bool(architecture.get('use_two_hidden_layers'))]:
+            if name not in header['arrays']:
+                raise ModelFormatError(f"{path}: отсутствует массив {name}")
+        return architecture, read_arrays(path, header, mmap), header.get('metadata', {})
+    return read_json_model(path)
+
+
+def export_model(path: str, target_format: str) -> bytes:
+    """
+    Содержимое модели в заданном формате
+
+    Args:
+        path: Путь к файлу модели
+        target_format: 'nnb' или 'json'
+
+    Returns:
+        Сериализованная модель
+    """
+    architecture, arrays, metadata = read_model(path, mmap=False)
+    if target_format == 'nnb':
+        return encode_model(architecture, arrays, metadata)
+    if target_format == 'json':
+        return encode_json_model(architecture, arrays, metadata).encode('utf-8')
+    raise ModelFormatError(f"Неизвестный формат модели: {target_format}")
+
+
+def convert_model(source: str, destination: str, metadata: Optional[Dict[str, Any]] = None):
+    """
+    Перевод модели между форматами (по расширению destination)
+
+    Args:
+        source: Исходный файл (.json или .nnb)
+        destination: Файл назначения
+        metadata: Дополнительные метаданные (объединяются с исходными)
+    """
+    architecture, arrays, source_metadata = read_model(source, mmap=False)
+    metadata = dict(source_metadata, **(metadata or {}))
+    if destination.endswith(BINARY_MODEL_EXTENSION):
+        write_model(destination, architecture, arrays, metadata)
+    else:
+        temp_path = f"{destination}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(encode_json_model(architecture, arrays, metadata))
+        os.replace(temp_path, destination)
+
+
+def file_checksum(path: str) -> str:
+    """
+    SHA-256 содержимого файла модели
+
+    Args:
+        path: Путь к файлу
+
+    Returns:
+        Шестнадцатеричный SHA-256
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _align(offset: int) -> int:
+    """Округление смещения вверх до ALIGNMENT"""
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
@@ -0,0 +1,300 @@
+"""
+Реестр сохранённых моделей нейронной сети
+
+Маршруты управления моделями (/api/list-models, /api/compare-models,
+/api/load-model, /api/delete-model, /api/export-model) получают список
+моделей и их метаданные отсюда, а не обходят data/models и не разбирают
+файлы при каждом запросе.
+
+Реестр хранит в памяти таблицу записей ModelRecord: архитектура,
+метаданные, итоговая ошибка обучения, время создания, SHA-256 файла и
+путь к истории обучения. Обновление инкрементальное: файлы проверяются
+через os.stat, заново читаются только новые и изменённые (по mtime и
+размеру) модели и истории. Полная проверка выполняется не чаще, чем раз
+в refresh_interval секунд, либо сразу после invalidate() (её вызывают
+маршруты, изменяющие каталог моделей) или изменения mtime каталога.
+
+История обучения модели определяется по правилам (первое найденное):
+1. <имя>_history.json рядом с моделью;
+2. history_<x>.json для модели model_<x> (формат experiments/results);
+3. HISTORY_ALIASES для основных моделей data/models.
+Итоговая ошибка берётся из метаданных .nnb (final_loss), иначе - из
+последнего значения loss истории.
+"""
+
+import json
+import os
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .model_format import BINARY_MODEL_EXTENSION, ModelFormatError, file_checksum, read_model_info
+
+
+# Поддерживаемые форматы файлов моделей
+MODEL_EXTENSIONS = (BINARY_MODEL_EXTENSION, '.json')
+
+# Источники моделей: имя -> (каталог, префикс имени файла модели)
+DEFAULT_SOURCES = {
+    'models': ('data/models', ''),
+    'experiments': ('experiments/results', 'model_exp')
+}
+
+# Общие файлы истории основных моделей (имя модели без расширения -> файл)
+HISTORY_ALIASES = {
+    'neural_network': 'training_history.json',
+    'model_final': 'training_history_final.json'
+}
+
+
+@dataclass
+class ModelRecord:
+    """
+    Запись реестра о файле модели
+
+    Attributes:
+        name: Имя файла модели
+        source: Источник ('models' или 'experiments')
+        path: Путь к файлу
+        format: 'nnb' или 'json' (None - файл не является моделью)
+        size: Размер файла в байтах
+        mtime: Время изменения файла (Unix time)
+        checksum: SHA-256 содержимого файла
+        created_at: Время создания модели (из метаданных или mtime файла)
+        architecture: Параметры архитектуры (None - файл не является моделью)
+        metadata: Метаданные модели (.nnb)
+        history_path: Путь к истории обучения (None - история не найдена)
+        final_loss: Итоговая ошибка обучения (None - неизвестна)
+        error: Ошибка чтения файла
+    """
+    name: str
+    source: str
+    path: str
+    format: Optional[str]
+    size: int
+    mtime: float
+    checksum: str
+    created_at: str
+    architecture: Optional[Dict[str, Any]] = None
+    metadata: Dict[str, Any] = field(default_factory=dict)
+    history_path: Optional[str] = None
+    final_loss: Optional[float] = None
+    error: Optional[str] = None
+
+    @property
+    def stem(self) -> str:
+        """Имя файла без расширения"""
+        return os.path.splitext(self.name)[0]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Представление записи для JSON-ответов"""
+        return asdict(self)
+
+
+class ModelRegistry:
+    """Индекс моделей в памяти с инкрементальным обновлением по mtime"""
+
+    def __init__(self, sources: Optional[Dict[str, Tuple[str, str]]] = None,
+                 refresh_interval: float = 2.0):
+        """
+        Инициализация реестра
+
+        Args:
+            sources: Источники моделей: имя -> (каталог, префикс имени файла)
+            refresh_interval: Минимальный интервал полной проверки файлов (секунды)
+        """
+        self.sources = dict(sources or DEFAULT_SOURCES)
+        self.refresh_interval = refresh_interval
+        self._records: Dict[Tuple[str, str], ModelRecord] = {}
+        self._file_stats: Dict[str, Tuple[int, int]] = {}
+        self._histories: Dict[str, Tuple[Tuple[int, int], Optional[float]]] = {}
+        self._dir_mtimes: Dict[str, Optional[int]] = {}
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self.stats = {'refreshes': 0, 'indexed': 0}
+
+    def list(self, source: str = 'models') -> List[ModelRecord]:
+        """
+        Модели источника, новые первыми
+
+        Args:
+            source: Имя источника
+
+        Returns:
+            Список записей (включая файлы, которые не удалось прочитать)
+        """
+        self.refresh()
+        with self._lock:
+            records = [record for (record_source, _), record in self._records.items()
+                       if record_source == source]
+        return sorted(records, key=lambda record: record.mtime, reverse=True)
+
+    def get(self, name: str, source: str = 'models') -> Optional[ModelRecord]:
+        """
+        Запись модели по имени файла
+
+        Имена вне реестра (в том числе с путями вида ../x.json) не
+        находятся, поэтому маршруты не обращаются к произвольным файлам.
+
+        Args:
+            name: Имя файла модели
+            source: Имя источника
+
+        Returns:
+            ModelRecord или None
+        """
+        self.refresh()
+        with self._lock:
+            return self._records.get((source, name))
+
+    def invalidate(self):
+        """Принудительная проверка файлов при следующем обращении"""
+        with self._lock:
+            self._checked_at = None
+
+    def refresh(self, force: bool = False):
+        """
+        Инкрементальное обновление индекса
+
+        Args:
+            force: Проверить файлы независимо от refresh_interval
+        """
+        with self._lock:
+            now = time.monotonic()
+            due = (force or self._checked_at is None
+                   or now - self._checked_at >= self.refresh_interval
+                   or any(_stat_key(directory, mtime_only=True) != self._dir_mtimes.get(directory)
+                          for directory, _ in self.sources.values()))
+            if not due:
+                return
+
+            seen = set()
+            for source, (directory, prefix) in self.sources.items():
+                self._dir_mtimes[directory] = _stat_key(directory, mtime_only=True)
+                for name, path in _list_model_files(directory, prefix):
+                    key = (source, name)
+                    seen.add(key)
+                    self._index(key, path)
+
+            for key in set(self._records) - seen:
+                self._file_stats.pop(self._records.pop(key).path, None)
+            self._checked_at = now
+            self.stats['refreshes'] += 1
+
+    def _index(self, key: Tuple[str, str], path: str):
+        """Обновление записи, если файл модели или его история изменились"""
+        stat_key = _stat_key(path)
+        if stat_key is None:
+            return
+
+        record = self._records.get(key)
+        if record is None or self._file_stats.get(path) != stat_key:
+            try:
+                record = self._read_record(key, path)
+            except OSError:
+                # Файл удалён во время проверки
+                return
+            self._records[key] = record
+            self._file_stats[path] = stat_key
+            self.stats['indexed'] += 1
+
+        if record.architecture is not None:
+            history_path = self._find_history(record)
+            history_loss = self._history_loss(history_path) if history_path else None
+            record.history_path = history_path
+            metadata_loss = record.metadata.get('final_loss')
+            record.final_loss = metadata_loss if metadata_loss is not None else history_loss
+
+    def _read_record(self, key: Tuple[str, str], path: str) -> ModelRecord:
+        """Чтение архитектуры, метаданных и контрольной суммы файла"""
+        source, name = key
+        stat = os.stat(path)
+        record = ModelRecord(
+            name=name,
+            source=source,
+            path=path,
+            format=None,
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+            checksum=file_checksum(path),
+            created_at=datetime.fromtimestamp(stat.st_mtime).isoformat(timespec='seconds')
+        )
+        try:
+            info = read_model_info(path)
+        except (OSError, ModelFormatError) as e:
+            record.error = str(e)
+            return record
+
+        record.format = info['format']
+        record.architecture = info['architecture']
+        record.metadata = info['metadata']
+        record.created_at = info['metadata'].get('created_at', record.created_at)
+        return record
+
+    def _find_history(self, record: ModelRecord) -> Optional[str]:
+        """Путь к истории обучения модели по правилам модуля"""
+        directory = os.path.dirname(record.path)
+        candidates = [f"{record.stem}_history.json"]
+        if record.stem.startswith('model_'):
+            candidates.append('history_' + record.stem[len('model_'):] + '.json')
+        if record.source == 'models' and record.stem in HISTORY_ALIASES:
+            candidates.append(HISTORY_ALIASES[record.stem])
+
+        for candidate in candidates:
+            history_path = os.path.join(directory, candidate)
+            if os.path.exists(history_path):
+                return history_path
+        return None
+
+    def _history_loss(self, history_path: str) -> Optional[float]:
+        """Последнее значение loss истории (кэшируется по mtime файла)"""
+        stat_key = _stat_key(history_path)
+        cached = self._histories.get(history_path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+
+        final_loss = None
+        try:
+            with open(history_path, 'r', encoding='utf-8') as f:
+                history = json.load(f)
+            if isinstance(history, dict) and history.get('loss'):
+                final_loss = float(history['loss'][-1])
+        except (OSError, ValueError, TypeError):
+            pass
+        self._histories[history_path] = (stat_key, final_loss)
+        return final_loss
+
+
+def is_model_filename(filename: str, prefix: str = '') -> bool:
+    """
+    Имя файла модели (.nnb или .json), но не истории обучения
+
+    Args:
+        filename: Имя файла
+        prefix: Обязательный префикс имени
+    """
+    return (filename.startswith(prefix) and filename.endswith(MODEL_EXTENSIONS)
+            and not filename.startswith(('training_history', 'history_'))
+            and not filename.endswith('_history.json'))
+
+
+def _list_model_files(directory: str, prefix: str) -> List[Tuple[str, str]]:
+    """Пары (имя, путь) файлов моделей каталога"""
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return []
+    return [(entry.name, entry.path) for entry in entries
+            if entry.is_file() and is_model_filename(entry.name, prefix)]
+
+
+def _stat_key(path: str, mtime_only: bool = False):
+    """Ключ изменения файла: (mtime_ns, размер), для каталогов - mtime_ns"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns if mtime_only else (stat.st_mtime_ns, stat.st_size)
+
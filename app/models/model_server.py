@@ -0,0 +1,263 @@
+"""
+Обслуживание активной модели нейронной сети во всех рабочих процессах
+
+Каждый рабочий процесс gunicorn держит собственный экземпляр модели, а
+активная модель задаётся на диске - общим для всех процессов каталогом
+версий (по умолчанию data/models/served):
+
+    served/model-000001.nnb
+    served/model-000002.nnb   <- активная версия (наибольший номер)
+
+activate() записывает неизменяемый файл новой версии: модель пишется во
+временный файл, номер версии занимается os.link (завершается ошибкой,
+если файл уже существует), поэтому одновременные активации из разных
+процессов получают разные номера, а частично записанный файл никогда не
+становится активным. Старые версии удаляются, остаются keep_versions
+последних.
+
+current() сравнивает mtime каталога версий с последним проверенным и при
+изменении загружает новую версию (веса .nnb отображаются в память).
+Ссылка на ServedModel заменяется одним присваиванием: запросы, начатые до
+переключения, дорабатывают со своей версией, следующие получают новую -
+без перезапуска процессов и без смешения весов разных версий.
+
+Пока версий нет, используется модель по умолчанию (DEFAULT_MODELS в
+data/models), её версия - 0.
+"""
+
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .inference import InferenceKernel
+from .model_format import BINARY_MODEL_EXTENSION, ModelFormatError, file_checksum, read_header, write_model
+from .neural_network import SimpleNeuralNetwork
+
+
+# Имя каталога версий (внутри каталога моделей)
+SERVED_DIR_NAME = 'served'
+
+# Сколько последних версий хранится на диске
+KEEP_VERSIONS = 5
+
+# Модели по умолчанию в порядке приоритета (имя без расширения)
+DEFAULT_MODELS = ('model_final', 'neural_network')
+
+VERSION_FILE_PATTERN = re.compile(r'^model-(\d+)\.nnb$')
+
+# mtime каталога моложе этого интервала не считается окончательным: версия,
+# созданная в тот же такт часов файловой системы, не изменила бы его (нс)
+RACY_MTIME_WINDOW = 1_000_000_000
+
+
+@dataclass(frozen=True)
+class ServedModel:
+    """
+    Загруженная версия модели
+
+    Attributes:
+        network: Нейронная сеть (только для инференса)
+        kernel: Ядро инференса для оценки одного решения
+        version: Номер версии (0 - модель по умолчанию)
+        name: Имя исходного файла модели
+        checksum: SHA-256 исходного файла модели
+        fingerprint: Отпечаток весов (SimpleNeuralNetwork.fingerprint)
+        activated_at: Время активации версии
+    """
+    network: SimpleNeuralNetwork
+    kernel: InferenceKernel
+    version: int
+    name: Optional[str]
+    checksum: Optional[str]
+    fingerprint: str
+    activated_at: Optional[str]
+
+    def info(self) -> Dict[str, Any]:
+        """Описание версии для JSON-ответов"""
+        return {
+            'version': self.version,
+            'name': self.name,
+            'checksum': self.checksum,
+            'activated_at': self.activated_at
+        }
+
+
+class ModelServer:
+    """Активная модель, общая для рабочих процессов через каталог версий"""
+
+    def __init__(self, models_dir: str = 'data/models', served_dir: Optional[str] = None,
+                 keep_versions: int = KEEP_VERSIONS):
+        """
+        Инициализация и загрузка активной модели
+
+        Args:
+            models_dir: Каталог моделей (модели по умолчанию)
+            served_dir: Каталог версий (по умолчанию models_dir/served)
+            keep_versions: Сколько последних версий хранить
+        """
+        if keep_versions < 1:
+            raise ValueError("keep_versions должно быть не меньше 1")
+
+        self.models_dir = models_dir
+        self.served_dir = served_dir or os.path.join(models_dir, SERVED_DIR_NAME)
+        self.keep_versions = keep_versions
+        self._active: Optional[ServedModel] = None
+        self._checked_key = None
+        self._lock = threading.Lock()
+        self.stats = {'swaps': 0, 'failed_loads': 0}
+        self.current()
+
+    def current(self) -> ServedModel:
+        """
+        Активная версия модели
+
+        Стоимость проверки - один os.stat каталога версий.
+
+        Returns:
+            ServedModel; объект не меняется, поэтому его можно использовать
+            до конца запроса
+        """
+        key = _dir_key(self.served_dir)
+        if self._active is None or key != self._checked_key:
+            with self._lock:
+                if self._active is None or key != self._checked_key:
+                    self._sync(key)
+        return self._active
+
+    def activate(self, source_path: str, name: Optional[str] = None) -> ServedModel:
+        """
+        Активация модели во всех рабочих процессах
+
+        Args:
+            source_path: Файл модели (.nnb или .json)
+            name: Имя модели для отчётов (по умолчанию имя файла)
+
+        Returns:
+            Активная версия после переключения
+
+        Raises:
+            ModelFormatError: Если файл не является моделью
+        """
+        network = SimpleNeuralNetwork(load_pretrained=False)
+        network.load_model(source_path, mmap=False)
+        architecture, arrays = network.model_parts()
+        metadata = {
+            'source': name or os.path.basename(source_path),
+            'source_checksum': file_checksum(source_path),
+            'activated_at': datetime.now().isoformat(timespec='seconds')
+        }
+
+        os.makedirs(self.served_dir, exist_ok=True)
+        pending_path = os.path.join(self.served_dir,
+                                    f".pending-{os.getpid()}-{threading.get_ident()}{BINARY_MODEL_EXTENSION}")
+        write_model(pending_path, architecture, arrays, metadata)
+        try:
+            versions = self._versions()
+            version = versions[-1][0] + 1 if versions else 1
+            while True:
+                try:
+                    os.link(pending_path, self._version_path(version))
+                    break
+                except FileExistsError:
+                    version += 1
+        finally:
+            os.remove(pending_path)
+
+        self._remove_old_versions()
+        print(f"[MODEL] Активирована версия {version}: {metadata['source']}")
+        return self.current()
+
+    def _sync(self, key):
+        """Загрузка последней версии, если она отличается от активной"""
+        versions = self._versions()
+        if versions:
+            version, path = versions[-1]
+            if self._active is None or self._active.version != version:
+                try:
+                    self._active = self._load_version(version, path)
+                    self.stats['swaps'] += 1
+                except (OSError, ModelFormatError, KeyError) as e:
+                    # Активная модель остаётся прежней
+                    self.stats['failed_loads'] += 1
+                    print(f"⚠️ Не удалось загрузить версию модели {version}: {e}")
+        if self._active is None:
+            self._active = self._load_default()
+        if key is not None and time.time_ns() - key < RACY_MTIME_WINDOW:
+            key = -1  # каталог проверяется заново при следующем обращении
+        self._checked_key = key
+
+    def _load_version(self, version: int, path: str) -> ServedModel:
+        """Загрузка файла версии"""
+        metadata = read_header(path).get('metadata', {})
+        network = SimpleNeuralNetwork(load_pretrained=False)
+        network.load_model(path)
+        return ServedModel(
+            network=network,
+            kernel=InferenceKernel(network),
+            version=version,
+            name=metadata.get('source'),
+            checksum=metadata.get('source_checksum'),
+            fingerprint=network.fingerprint(),
+            activated_at=metadata.get('activated_at')
+        )
+
+    def _load_default(self) -> ServedModel:
+        """Модель по умолчанию (версия 0)"""
+        network = SimpleNeuralNetwork(load_pretrained=False)
+        for stem in DEFAULT_MODELS:
+            for extension in (BINARY_MODEL_EXTENSION, '.json'):
+                path = os.path.join(self.models_dir, stem + extension)
+                if not os.path.exists(path):
+                    continue
+                try:
+                    network.load_model(path)
+                except (OSError, ModelFormatError) as e:
+                    print(f"⚠️ Ошибка загрузки модели {path}: {e}")
+                    continue
+                print(f"✅ Загружена модель: {path}")
+                return ServedModel(network, InferenceKernel(network), 0, stem + extension,
+                                   file_checksum(path), network.fingerprint(), None)
+
+        print("⚠️ Обученная модель не найдена, используется случайная инициализация")
+        return ServedModel(network, InferenceKernel(network), 0, None, None, network.fingerprint(), None)
+
+    def _versions(self) -> List[Tuple[int, str]]:
+        """Файлы версий (номер, путь) по возрастанию номера"""
+        try:
+            names = os.listdir(self.served_dir)
+        except OSError:
+            return []
+        versions = []
+        for filename in names:
+            match = VERSION_FILE_PATTERN.match(filename)
+            if match:
+                versions.append((int(match.group(1)), os.path.join(self.served_dir, filename)))
+        return sorted(versions)
+
+    def _version_path(self, version: int) -> str:
+        return os.path.join(self.served_dir, f"model-{version:06d}{BINARY_MODEL_EXTENSION}")
+
+    def _remove_old_versions(self):
+        """
+        Удаление версий старше keep_versions последних
+
+        Процессы, отобразившие удалённый файл в память, продолжают работать
+        с ним до переключения на новую версию.
+        """
+        for _, path in self._versions()[:-self.keep_versions]:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+def _dir_key(path: str) -> Optional[int]:
+    """mtime каталога версий (None - каталога нет)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
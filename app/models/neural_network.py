@@ -40,9 +40,74 @@
 """
 
 import numpy as np
-import json
+import hashlib
 import os
-from typing import List, Tuple, Dict
+from typing import Any, Callable, List, Tuple, Dict, Optional, Union
+
+from .model_format import (ARRAY_NAMES, BINARY_MODEL_EXTENSION, encode_json_model,
+                           read_model, write_model)
+
+
+# Признаки кода и их ожидаемые максимумы (x_normalized = x_raw / x_max),
+# в порядке входов сети (см. SimpleNeuralNetwork._extract_features)
+FEATURE_SCALES = (
+    ('lines_of_code', 100.0),
+    ('functions_count', 10.0),
+    ('complexity', 10.0),
+    ('nested_levels', 5.0),
+    ('variable_names_length', 20.0),
+    ('comments_ratio', 1.0),
+    ('imports_count', 10.0),
+    ('class_count', 5.0),
+    ('error_handling', 1.0),
+    ('test_coverage', 1.0)
+)
+
+
+def normalize_features(features_list: List[Dict[str, float]], dtype=float) -> np.ndarray:
+    """
+    Нормализация признаков нескольких примеров в одну матрицу (FEATURE_SCALES)
+    
+    Единая нормализация для инференса (SimpleNeuralNetwork) и обучающих
+    данных (app.models.dataset).
+    
+    Args:
+        features_list: Список словарей с признаками кода
+        dtype: Тип элементов результата
+        
+    Returns:
+        Матрица X ∈ ℝᴺˣ¹⁰ (по строке на пример)
+    """
+    raw = np.array([[code_features.get(name, 0) for name, _ in FEATURE_SCALES]
+                    for code_features in features_list], dtype=dtype).reshape(-1, len(FEATURE_SCALES))
+    scales = np.array([scale for _, scale in FEATURE_SCALES], dtype=dtype)
+    return raw / scales
+
+
+def heuristic_quality(code_features: Dict[str, float]) -> Dict[str, float]:
+    """
+    Эвристическая оценка качества кода (если сеть не смогла оценить признаки)
+    
+    Args:
+        code_features: Словарь с признаками кода
+        
+    Returns:
+        Словарь с оценками качества
+    """
+    lines = code_features.get('lines_of_code', 1)
+    functions = code_features.get('functions_count', 0)
+    complexity = code_features.get('complexity', 0)
+    comments = code_features.get('comments_ratio', 0)
+    
+    correctness = max(0.3, min(1.0, 1.0 - complexity * 0.1))
+    efficiency = max(0.3, min(1.0, 1.0 - functions * 0.05))
+    readability = max(0.3, min(1.0, 0.5 + comments * 2 + (1.0 / lines) * 10))
+    
+    return {
+        'correctness': correctness,
+        'efficiency': efficiency,
+        'readability': readability
+    }
 
 
 class SimpleNeuralNetwork:
@@ -51,7 +116,8 @@ class SimpleNeuralNetwork:
     """
     
     def __init__(self, input_size: int = 10, hidden_size: int = 8, output_size: int = 3, 
-                 activation: str = 'sigmoid', hidden_size2: int = None, dropout_rate: float = 0.0):
+                 activation: str = 'sigmoid', hidden_size2: int = None, dropout_rate: float = 0.0,
+                 load_pretrained: bool = False):
         """
         Инициализация нейронной сети
         
@@ -62,6 +128,10 @@ class SimpleNeuralNetwork:
             activation: Функция активации ('sigmoid' или 'relu')
             hidden_size2: Размер второго скрытого слоя (опционально, для глубокой сети)
             dropout_rate: Вероятность dropout (0.0 = нет dropout, 0.3 = отключить 30% нейронов)
+            load_pretrained: Загрузить сохранённую модель (load_trained_model); её
+                             архитектура и веса заменяют заданные. По умолчанию -
+                             случайная инициализация с заданной архитектурой (обучение
+                             с нуля); True - только для оценки готовой модели
         """
         self.input_size = input_size
         self.hidden_size = hidden_size
@@ -144,7 +214,8 @@ class SimpleNeuralNetwork:
         self.learning_rate = 0.01
         
         # Пытаемся загрузить обученную модель
-        self.load_trained_model()
+        if load_pretrained:
+            self.load_trained_model()
         
     def sigmoid(self, x: np.ndarray) -> np.ndarray:
         """
@@ -359,7 +430,8 @@ class SimpleNeuralNetwork:
             W⁽²⁾ := W⁽²⁾ + α · ∂L/∂W⁽²⁾        # Обновление
             W⁽¹⁾ := W⁽¹⁾ + α · ∂L/∂W⁽¹⁾
             
-            где α = learning_rate
+            где α = learning_rate / N (градиент усредняется по батчу из N
+            примеров; при N = 1 это обычный шаг онлайн-обучения)
         
         ШАГ 4: Обновление смещений
             ∂L/∂b⁽²⁾ = δ⁽²⁾
@@ -381,6 +453,9 @@ class SimpleNeuralNetwork:
         
         См. также: docs/MATHEMATICAL_FOUNDATION.md, разделы 5 и 6
         """
+        # Шаг градиентного спуска с усреднением по батчу
+        step = self.learning_rate / inputs.shape[0]
+        
         if self.use_two_hidden_layers:
             # Распаковываем аргументы для двух скрытых слоёв
             hidden1_output, hidden2_output, output, target = args
@@ -398,14 +473,14 @@ class SimpleNeuralNetwork:
             hidden1_delta = hidden1_error * self.activate_derivative(hidden1_output)
             
             # Обновление весов
-            self.weights_hidden2_output += np.dot(hidden2_output.T, output_delta) * self.learning_rate
-            self.weights_hidden1_hidden2 += np.dot(hidden1_output.T, hidden2_delta) * self.learning_rate
-            self.weights_input_hidden1 += np.dot(inputs.T, hidden1_delta) * self.learning_rate
+            self.weights_hidden2_output += np.dot(hidden2_output.T, output_delta) * step
+            self.weights_hidden1_hidden2 += np.dot(hidden1_output.T, hidden2_delta) * step
+            self.weights_input_hidden1 += np.dot(inputs.T, hidden1_delta) * step
             
             # Обновление смещений
-            self.bias_output += np.sum(output_delta, axis=0, keepdims=True) * self.learning_rate
-            self.bias_hidden2 += np.sum(hidden2_delta, axis=0, keepdims=True) * self.learning_rate
-            self.bias_hidden1 += np.sum(hidden1_delta, axis=0, keepdims=True) * self.learning_rate
+            self.bias_output += np.sum(output_delta, axis=0, keepdims=True) * step
+            self.bias_hidden2 += np.sum(hidden2_delta, axis=0, keepdims=True) * step
+            self.bias_hidden1 += np.sum(hidden1_delta, axis=0, keepdims=True) * step
         else:
             # Распаковываем аргументы для одного скрытого слоя
             hidden_output, output, target = args
@@ -437,32 +512,36 @@ class SimpleNeuralNetwork:
             # ============================================================
             # Математика: W⁽²⁾ := W⁽²⁾ + α · (hᵀ · δ⁽²⁾)
             # где α = learning_rate, h = hidden_output
-            self.weights_hidden_output += np.dot(hidden_output.T, output_delta) * self.learning_rate
+            self.weights_hidden_output += np.dot(hidden_output.T, output_delta) * step
             
             # Математика: W⁽¹⁾ := W⁽¹⁾ + α · (xᵀ · δ⁽¹⁾)
             # где x = inputs
-            self.weights_input_hidden += np.dot(inputs.T, hidden_delta) * self.learning_rate
+            self.weights_input_hidden += np.dot(inputs.T, hidden_delta) * step
             
             # ============================================================
             # ШАГ 4: ОБНОВЛЕНИЕ СМЕЩЕНИЙ
             # ============================================================
             # Математика: b⁽²⁾ := b⁽²⁾ + α · δ⁽²⁾
             # Суммируем по батчу (axis=0), сохраняем размерность (keepdims=True)
-            self.bias_output += np.sum(output_delta, axis=0, keepdims=True) * self.learning_rate
+            self.bias_output += np.sum(output_delta, axis=0, keepdims=True) * step
             
             # Математика: b⁽¹⁾ := b⁽¹⁾ + α · δ⁽¹⁾
-            self.bias_hidden += np.sum(hidden_delta, axis=0, keepdims=True) * self.learning_rate
+            self.bias_hidden += np.sum(hidden_delta, axis=0, keepdims=True) * step
     
-    def train(self, training_data: List[Tuple[np.ndarray, np.ndarray]], epochs: int = 1000):
+    def train(self, training_data: List[Tuple[np.ndarray, np.ndarray]], epochs: int = 1000,
+              batch_size: Optional[int] = 1, shuffle: bool = False, seed: Optional[int] = None,
+              callback: Optional[Callable[[int, float], bool]] = None):
         """
         Обучение нейронной сети методом градиентного спуска
         
         АЛГОРИТМ:
             Для каждой эпохи t = 1..T:
-                Для каждого примера (x, y) в датасете:
-                    1. Forward pass: вычислить ŷ = f(x; W, b)
-                    2. Вычислить ошибку: L = ||y - ŷ||²
-                    3. Backward pass: вычислить градиенты ∂L/∂W, ∂L/∂b
+                (Если shuffle=True) перемешать порядок примеров
+                Для каждого батча (X, Y) из batch_size примеров:
+                    1. Forward pass: вычислить Ŷ = f(X; W, b) матричными операциями
+                    2. Вычислить ошибку: L = ||Y - Ŷ||²
+                    3. Backward pass: вычислить градиенты ∂L/∂W, ∂L/∂b,
+                       усреднённые по батчу
                     4. Обновить параметры:
                        W := W + α · ∂L/∂W
                        b := b + α · ∂L/∂b
@@ -474,12 +553,26 @@ class SimpleNeuralNetwork:
         
         ПАРАМЕТРЫ ОБУЧЕНИЯ:
             - Learning rate (α): по умолчанию 0.01
-            - Batch size: 1 (онлайн обучение, каждый пример отдельно)
+            - Batch size: по умолчанию 1 (онлайн обучение, каждый пример
+              отдельно); None - полный батч (весь датасет за один шаг)
             - Dropout: применяется только если dropout_rate > 0
         
+        Примеры заранее собираются в матрицы X ∈ ℝᴺˣ¹⁰ и Y ∈ ℝᴺˣ³, поэтому
+        при batch_size > 1 эпоха выполняется за N / batch_size матричных
+        шагов вместо N проходов по отдельным примерам. Градиент по батчу
+        усредняется, поэтому с ростом batch_size обычно нужен больший
+        learning rate или больше эпох.
+        
         Args:
-            training_data: Список кортежей (x ∈ ℝ¹⁰, y ∈ ℝ³)
+            training_data: Список кортежей (x ∈ ℝ¹⁰, y ∈ ℝ³) или Dataset
+                           (app.models.dataset.load_dataset)
             epochs: Количество эпох обучения (проходов по всему датасету)
+            batch_size: Размер мини-батча (None или 0 - полный батч)
+            shuffle: Перемешивать примеры перед каждой эпохой
+            seed: Зерно генератора для перемешивания (воспроизводимость)
+            callback: Функция callback(epoch, loss), вызываемая для каждой точки
+                      истории (каждые 10 эпох и в конце). Если она вернёт True,
+                      обучение останавливается после текущей эпохи.
             
         Returns:
             dict: История обучения с эпохами и ошибками
@@ -511,10 +604,35 @@ class SimpleNeuralNetwork:
             'architecture': architecture
         }
         
+        # Сборка датасета в матрицы X ∈ ℝᴺˣ¹⁰, Y ∈ ℝᴺˣ³
+        # (Dataset из app.models.dataset уже хранит их целиком)
+        if hasattr(training_data, 'X') and hasattr(training_data, 'y'):
+            X, Y = training_data.X, training_data.y
+        else:
+            X = np.vstack([inputs for inputs, _ in training_data])
+            Y = np.vstack([target for _, target in training_data])
+        n_samples = X.shape[0]
+        
+        if batch_size is not None and batch_size < 0:
+            raise ValueError("Размер батча должен быть положительным")
+        if not batch_size or batch_size > n_samples:
+            batch_size = n_samples
+        
+        rng = np.random.default_rng(seed)
+        
         for epoch in range(epochs):
             total_error = 0
             
-            for inputs, target in training_data:
+            if shuffle:
+                order = rng.permutation(n_samples)
+                X_epoch, Y_epoch = X[order], Y[order]
+            else:
+                X_epoch, Y_epoch = X, Y
+            
+            for start in range(0, n_samples, batch_size):
+                inputs = X_epoch[start:start + batch_size]
+                target = Y_epoch[start:start + batch_size]
+                
                 # Прямое распространение (с dropout если задан)
                 forward_outputs = self.forward(inputs, training=True)
                 output = forward_outputs[-1]  # Последний элемент всегда output
@@ -522,27 +640,31 @@ class SimpleNeuralNetwork:
                 # Обратное распространение
                 self.backward(inputs, *forward_outputs, target)
                 
-                # Расчет ошибки (MSE для одного примера)
-                # Математика: L = 1/3 Σⱼ (yⱼ - ŷⱼ)²
+                # Расчет ошибки (сумма MSE примеров батча)
+                # Математика: L = 1/3 Σⱼ (yⱼ - ŷⱼ)² для каждого примера
                 # где j = 1,2,3 соответствует correctness, efficiency, readability
-                error = np.mean(np.square(target - output))
-                total_error += error
+                total_error += np.mean(np.square(target - output), axis=1).sum()
             
-            avg_error = total_error / len(training_data)
+            avg_error = total_error / n_samples
+            
+            # Вывод прогресса каждые 100 эпох
+            if epoch % 100 == 0:
+                print(f"Эпоха {epoch}, Средняя ошибка: {avg_error:.4f}")
             
             # Сохраняем историю каждые 10 эпох
             if epoch % 10 == 0:
                 history['epochs'].append(epoch)
                 history['loss'].append(float(avg_error))
-            
-            # Вывод прогресса каждые 100 эпох
-            if epoch % 100 == 0:
-                print(f"Эпоха {epoch}, Средняя ошибка: {avg_error:.4f}")
+                if callback is not None and callback(epoch, float(avg_error)):
+                    print(f"Обучение остановлено на эпохе {epoch}")
+                    break
         
         # Сохраняем финальную эпоху, если она не была сохранена
-        if (epochs - 1) % 10 != 0:
-            history['epochs'].append(epochs - 1)
+        if history['epochs'][-1] != epoch:
+            history['epochs'].append(epoch)
             history['loss'].append(float(avg_error))
+            if callback is not None:
+                callback(epoch, float(avg_error))
         
         return history
     
@@ -560,6 +682,55 @@ class SimpleNeuralNetwork:
         output = forward_outputs[-1]  # Последний элемент всегда output
         return output
     
+    def predict_batch(self, inputs: Union[np.ndarray, List[Dict[str, float]]]) -> np.ndarray:
+        """
+        Предсказание для нескольких примеров за один прямой проход
+        
+        Args:
+            inputs: Нормализованная матрица признаков X ∈ ℝᴺˣ¹⁰ либо список
+                    словарей с признаками кода (нормализуются как в
+                    evaluate_code_quality)
+            
+        Returns:
+            Матрица предсказаний Ŷ ∈ ℝᴺˣ³
+        """
+        if isinstance(inputs, np.ndarray):
+            X = inputs.reshape(-1, self.input_size)
+        else:
+            X = self._extract_features_batch(list(inputs))
+        
+        if X.shape[0] == 0:
+            return np.empty((0, self.output_size))
+        return self.predict(X)
+    
+    def evaluate_code_quality_batch(self, features_list: List[Dict[str, float]]) -> List[Dict[str, float]]:
+        """
+        Оценка качества нескольких фрагментов кода
+        
+        Результат для каждого примера совпадает с evaluate_code_quality,
+        но все примеры проходят через сеть одним матричным умножением.
+        
+        Args:
+            features_list: Список словарей с признаками кода
+            
+        Returns:
+            Список словарей с оценками качества (в том же порядке)
+        """
+        try:
+            prediction = self.predict_batch(features_list)
+        except Exception as e:
+            print(f"⚠️ Ошибка пакетной оценки качества кода: {e}")
+            return [self.evaluate_code_quality(code_features) for code_features in features_list]
+        
+        return [
+            {
+                'correctness': float(row[0]),
+                'efficiency': float(row[1]),
+                'readability': float(row[2])
+            }
+            for row in prediction
+        ]
+    
     def evaluate_code_quality(self, code_features: Dict[str, float]) -> Dict[str, float]:
         """
         Оценка качества кода
@@ -586,30 +757,19 @@ class SimpleNeuralNetwork:
         except Exception as e:
             print(f"⚠️ Ошибка оценки качества кода: {e}")
             # Fallback на эвристическую оценку
-            lines = code_features.get('lines_of_code', 1)
-            functions = code_features.get('functions_count', 0)
-            complexity = code_features.get('complexity', 0)
-            comments = code_features.get('comments_ratio', 0)
-            
-            correctness = max(0.3, min(1.0, 1.0 - complexity * 0.1))
-            efficiency = max(0.3, min(1.0, 1.0 - functions * 0.05))
-            readability = max(0.3, min(1.0, 0.5 + comments * 2 + (1.0 / lines) * 10))
-            
-            return {
-                'correctness': correctness,
-                'efficiency': efficiency,
-                'readability': readability
-            }
+            return heuristic_quality(code_features)
     
     def load_trained_model(self):
         """
         Загрузка обученной модели при инициализации
         
         Приоритет загрузки:
-        1. model_final.json - финальная оптимизированная модель (lr=0.05, ReLU)
-        2. neural_network.json - основная модель
+        1. model_final - финальная оптимизированная модель (lr=0.05, ReLU)
+        2. neural_network - основная модель
         3. Поиск в альтернативных путях
         
+        Для каждого имени файл .nnb предпочтительнее .json.
+        
         Финальная модель была обучена с параметрами:
         - Learning rate: 0.05 (лучший результат в экспериментах)
         - Activation: ReLU
@@ -618,17 +778,19 @@ class SimpleNeuralNetwork:
         """
         try:
             # Приоритетный порядок загрузки моделей
-            model_paths = [
+            model_names = [
                 # Финальная оптимизированная модель (приоритет)
-                'data/models/model_final.json',
+                'data/models/model_final',
                 # Основная модель
-                'data/models/neural_network.json',
+                'data/models/neural_network',
                 # Альтернативные пути
-                'app/data/models/model_final.json',
-                'app/data/models/neural_network.json',
-                '../data/models/model_final.json',
-                '../data/models/neural_network.json'
+                'app/data/models/model_final',
+                'app/data/models/neural_network',
+                '../data/models/model_final',
+                '../data/models/neural_network'
             ]
+            model_paths = [name + extension for name in model_names
+                           for extension in (BINARY_MODEL_EXTENSION, '.json')]
             
             for path in model_paths:
                 if os.path.exists(path):
@@ -679,26 +841,29 @@ class SimpleNeuralNetwork:
         
         См. также: docs/MATHEMATICAL_FOUNDATION.md, раздел 1.2
         """
-        # Нормализация признаков к диапазону [0, 1]
-        features = np.array([
-            code_features.get('lines_of_code', 0) / 100.0,  # x₁
-            code_features.get('functions_count', 0) / 10.0,  # x₂
-            code_features.get('complexity', 0) / 10.0,      # x₃
-            code_features.get('nested_levels', 0) / 5.0,    # x₄
-            code_features.get('variable_names_length', 0) / 20.0,  # x₅
-            code_features.get('comments_ratio', 0),         # x₆
-            code_features.get('imports_count', 0) / 10.0,   # x₇
-            code_features.get('class_count', 0) / 5.0,      # x₈
-            code_features.get('error_handling', 0),         # x₉
-            code_features.get('test_coverage', 0)           # x₁₀
-        ])
-        
-        # Преобразуем в матрицу 1×10 для совместимости с np.dot()
-        return features.reshape(1, -1)
+        # Нормализация признаков к диапазону [0, 1] (FEATURE_SCALES)
+        return self._extract_features_batch([code_features])
     
-    def save_model(self, filepath: str):
-        """Сохранение модели"""
-        model_data = {
+    def _extract_features_batch(self, features_list: List[Dict[str, float]]) -> np.ndarray:
+        """
+        Нормализация признаков нескольких примеров в одну матрицу
+        
+        Args:
+            features_list: Список словарей с признаками кода
+            
+        Returns:
+            Матрица X ∈ ℝᴺˣ¹⁰ (по строке на пример)
+        """
+        return normalize_features(features_list)
+    
+    def model_parts(self) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+        """
+        Архитектура и массивы весов модели (см. app/models/model_format.py)
+        
+        Returns:
+            Кортеж (architecture, arrays)
+        """
+        architecture = {
             'input_size': self.input_size,
             'hidden_size': self.hidden_size,
             'hidden_size2': self.hidden_size2,
@@ -708,54 +873,80 @@ class SimpleNeuralNetwork:
             'dropout_rate': self.dropout_rate,
             'use_two_hidden_layers': self.use_two_hidden_layers
         }
+        arrays = {name: getattr(self, name) for name in ARRAY_NAMES[self.use_two_hidden_layers]}
+        return architecture, arrays
+    
+    def save_model(self, filepath: str, metadata: Optional[Dict[str, Any]] = None):
+        """
+        Сохранение модели
         
-        if self.use_two_hidden_layers:
-            model_data.update({
-                'weights_input_hidden1': self.weights_input_hidden1.tolist(),
-                'weights_hidden1_hidden2': self.weights_hidden1_hidden2.tolist(),
-                'weights_hidden2_output': self.weights_hidden2_output.tolist(),
-                'bias_hidden1': self.bias_hidden1.tolist(),
-                'bias_hidden2': self.bias_hidden2.tolist(),
-                'bias_output': self.bias_output.tolist()
-            })
-        else:
-            model_data.update({
-                'weights_input_hidden': self.weights_input_hidden.tolist(),
-                'weights_hidden_output': self.weights_hidden_output.tolist(),
-                'bias_hidden': self.bias_hidden.tolist(),
-                'bias_output': self.bias_output.tolist()
-            })
+        Формат выбирается по расширению: .nnb - двоичный формат
+        (app/models/model_format.py), иначе JSON.
+        
+        Args:
+            filepath: Путь к файлу модели
+            metadata: Метаданные (время обучения, итоговая ошибка и т.п.)
+        """
+        architecture, arrays = self.model_parts()
+        if filepath.endswith(BINARY_MODEL_EXTENSION):
+            write_model(filepath, architecture, arrays, metadata)
+            return
         
         with open(filepath, 'w', encoding='utf-8') as f:
-            json.dump(model_data, f, ensure_ascii=False, indent=2)
+            f.write(encode_json_model(architecture, arrays, metadata))
     
-    def load_model(self, filepath: str):
-        """Загрузка модели"""
+    def load_model(self, filepath: str, mmap: bool = True):
+        """
+        Загрузка модели
+        
+        Формат определяется по сигнатуре файла. Веса модели .nnb
+        отображаются в память (mmap=True) и читаются с диска по мере
+        обращения.
+        
+        Args:
+            filepath: Путь к файлу модели (.nnb или JSON)
+            mmap: Отображать веса .nnb в память
+        """
         if not os.path.exists(filepath):
             print(f"Файл модели {filepath} не найден")
             return
         
-        with open(filepath, 'r', encoding='utf-8') as f:
-            model_data = json.load(f)
+        architecture, arrays, _ = read_model(filepath, mmap=mmap)
         
-        self.input_size = model_data['input_size']
-        self.hidden_size = model_data['hidden_size']
-        self.hidden_size2 = model_data.get('hidden_size2', None)
-        self.output_size = model_data['output_size']
-        self.learning_rate = model_data['learning_rate']
-        self.activation = model_data.get('activation', 'sigmoid')
-        self.dropout_rate = model_data.get('dropout_rate', 0.0)
-        self.use_two_hidden_layers = model_data.get('use_two_hidden_layers', False)
+        self.input_size = architecture['input_size']
+        self.hidden_size = architecture['hidden_size']
+        self.hidden_size2 = architecture.get('hidden_size2', None)
+        self.output_size = architecture['output_size']
+        self.learning_rate = architecture['learning_rate']
+        self.activation = architecture.get('activation', 'sigmoid')
+        self.dropout_rate = architecture.get('dropout_rate', 0.0)
+        self.use_two_hidden_layers = bool(architecture.get('use_two_hidden_layers', False))
         
+        for name in ARRAY_NAMES[self.use_two_hidden_layers]:
+            setattr(self, name, arrays[name])
+    
+    def fingerprint(self) -> str:
+        """
+        Отпечаток модели: хеш архитектуры и текущих весов
+        
+        Меняется при загрузке другой модели или изменении весов, поэтому
+        используется для проверки актуальности сохранённых оценок
+        (см. app/utils/result_cache.py).
+        
+        Returns:
+            Шестнадцатеричный SHA-256
+        """
         if self.use_two_hidden_layers:
-            self.weights_input_hidden1 = np.array(model_data['weights_input_hidden1'])
-            self.weights_hidden1_hidden2 = np.array(model_data['weights_hidden1_hidden2'])
-            self.weights_hidden2_output = np.array(model_data['weights_hidden2_output'])
-            self.bias_hidden1 = np.array(model_data['bias_hidden1'])
-            self.bias_hidden2 = np.array(model_data['bias_hidden2'])
-            self.bias_output = np.array(model_data['bias_output'])
+            parameters = [self.weights_input_hidden1, self.weights_hidden1_hidden2,
+                          self.weights_hidden2_output, self.bias_hidden1,
+                          self.bias_hidden2, self.bias_output]
         else:
-            self.weights_input_hidden = np.array(model_data['weights_input_hidden'])
-            self.weights_hidden_output = np.array(model_data['weights_hidden_output'])
-            self.bias_hidden = np.array(model_data['bias_hidden'])
-            self.bias_output = np.array(model_data['bias_output'])
+            parameters = [self.weights_input_hidden, self.weights_hidden_output,
+                          self.bias_hidden, self.bias_output]
+        
+        digest = hashlib.sha256(f"{self.activation}:{self.use_two_hidden_layers}".encode('utf-8'))
+        for parameter in parameters:
+            array = np.ascontiguousarray(parameter, dtype=np.float64)
+            digest.update(str(array.shape).encode('utf-8'))
+            digest.update(array.tobytes())
+        return digest.hexdigest()
@@ -0,0 +1,426 @@
+"""
+Дообучение нейронной сети на решениях из базы данных
+
+Основное обучение использует только data/training_data/training_data.json
+и не учитывает решения, которые проверяет система. Конвейер дообучения
+берёт примеры из таблицы solutions:
+
+1. Новые решения (id больше последнего обработанного) читаются из SQLite.
+   Признаки кода берутся сохранёнными (solutions.features); для решений
+   без них признаки извлекаются пакетно в пуле процессов
+   (CodeChecker.get_code_features_batch) и сохраняются в базу.
+2. Примеры дописываются в хранилище TrainingStore - отдельный файл на
+   каждое поле (нормализованные признаки, целевые значения, ID решений)
+   и манифест store.json с количеством строк. Файлы только дописываются,
+   манифест заменяется атомарно, поэтому прерванная запись не портит
+   хранилище: лишний хвост файлов отбрасывается при следующей записи.
+3. Сеть инициализируется весами активной модели (ModelServer) и
+   обучается ограниченное число эпох мини-батчами на примерах, ещё не
+   участвовавших в дообучении, и случайной выборке прежних (replay),
+   поэтому модель не обучается заново на всей истории и не забывает
+   прежние примеры.
+
+Дообучение выполняется как фоновое задание обучения (mode='retrain',
+см. training_jobs.run_job): прогресс, отмена и сохранение модели - как
+у заданий /api/train-model.
+
+Целевые значения примера (solution_target):
+- correctness - доля пройденных тестов;
+- efficiency - измеренная эффективность (признак measured_efficiency,
+  см. complexity_profiler), если решение профилировалось;
+- efficiency (без профиля), readability - независимой оценки в базе нет,
+  поэтому используется оценка, сохранённая при проверке решения
+  (analysis_results.quality_scores), иначе heuristic_quality. Дообучение
+  уточняет правильность по результатам тестов и эффективность по
+  измерениям, не смещая остальные выходы.
+"""
+
+import hashlib
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .code_checker import CodeChecker
+from .dataset import DTYPE, FEATURE_NAMES, TARGET_SIZE, Dataset, DatasetError
+from .model_server import ModelServer
+from .neural_network import FEATURE_SCALES, SimpleNeuralNetwork, heuristic_quality, normalize_features
+
+
+# Каталог хранилища примеров дообучения
+STORE_DIR = 'data/training_data/production'
+
+# Версия формата хранилища: при несовпадении хранилище собирается заново
+STORE_FORMAT_VERSION = 1
+
+# Поля хранилища: имя -> (тип элементов, количество столбцов)
+STORE_FIELDS = {
+    'X': (DTYPE, len(FEATURE_NAMES)),
+    'y': (DTYPE, TARGET_SIZE),
+    'solution_id': (np.dtype('<i8'), 1)
+}
+
+# Количество решений, читаемых из базы за один запрос
+SYNC_BATCH_SIZE = 1000
+
+# Блокировка старше этого времени без живого процесса считается оставленной (секунды)
+STALE_LOCK_AGE = 60
+
+
+def validate_retrain_params(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Проверка и нормализация параметров дообучения
+
+    Args:
+        data: Параметры из запроса
+
+    Returns:
+        Кортеж (параметры, текст ошибки); при ошибке параметры равны None
+    """
+    params = {
+        'mode': 'retrain',
+        'epochs': data.get('epochs', 50),
+        'learning_rate': data.get('learning_rate', 0.05),
+        'batch_size': data.get('batch_size', 32),
+        'replay_ratio': data.get('replay_ratio', 4),
+        'min_new_examples': data.get('min_new_examples', 1),
+        'activate': bool(data.get('activate', False)),
+        'shuffle': True,
+        'seed': data.get('seed')
+    }
+
+    if not isinstance(params['epochs'], int) or not (1 <= params['epochs'] <= 500):
+        return None, 'Количество эпох дообучения должно быть от 1 до 500'
+
+    if not isinstance(params['batch_size'], int) or params['batch_size'] < 1:
+        return None, 'Размер батча должен быть целым числом не меньше 1'
+
+    if not isinstance(params['learning_rate'], (int, float)) or not (0.001 <= params['learning_rate'] <= 1.0):
+        return None, 'Learning rate должен быть от 0.001 до 1.0'
+
+    if not isinstance(params['replay_ratio'], (int, float)) or not (0 <= params['replay_ratio'] <= 20):
+        return None, 'replay_ratio должен быть от 0 до 20'
+
+    if not isinstance(params['min_new_examples'], int) or params['min_new_examples'] < 1:
+        return None, 'min_new_examples должно быть целым числом не меньше 1'
+
+    if params['seed'] is not None and not isinstance(params['seed'], int):
+        return None, 'seed должен быть целым числом'
+
+    return params, ""
+
+
+def solution_target(solution: Dict[str, Any]) -> Optional[List[float]]:
+    """
+    Целевые значения [correctness, efficiency, readability] решения
+
+    Args:
+        solution: Решение с полями features, test_results и analysis_results
+
+    Returns:
+        Список из TARGET_SIZE чисел в [0, 1] или None, если у решения нет
+        результатов тестов
+    """
+    test_results = solution.get('test_results') or []
+    if not test_results:
+        return None
+
+    correctness = sum(1 for result in test_results if result.get('passed')) / len(test_results)
+    features = solution['features']
+    scores = (solution.get('analysis_results') or {}).get('quality_scores')
+    if not scores:
+        scores = heuristic_quality(dict(features, lines_of_code=max(features.get('lines_of_code', 1), 1)))
+    if 'measured_efficiency' in features:
+        scores = dict(scores, efficiency=features['measured_efficiency'])
+
+    return [correctness] + [min(max(float(scores[name]), 0.0), 1.0) for name in ('efficiency', 'readability')]
+
+
+class TrainingStore:
+    """Дописываемое хранилище примеров дообучения (файл на каждое поле)"""
+
+    def __init__(self, path: str = STORE_DIR):
+        """
+        Открытие хранилища (каталог создаётся при первой записи)
+
+        Args:
+            path: Каталог хранилища
+        """
+        self.path = path
+        self.manifest = self._read_manifest()
+
+    @property
+    def rows(self) -> int:
+        """Количество примеров"""
+        return self.manifest['rows']
+
+    @property
+    def last_solution_id(self) -> int:
+        """ID последнего обработанного решения"""
+        return self.manifest['last_solution_id']
+
+    @property
+    def trained_rows(self) -> int:
+        """Количество первых примеров, уже участвовавших в дообучении"""
+        return self.manifest['trained_rows']
+
+    def sync(self, db, code_checker: CodeChecker, batch_size: int = SYNC_BATCH_SIZE) -> Dict[str, int]:
+        """
+        Добавление новых решений из базы
+
+        Args:
+            db: DatabaseManager
+            code_checker: CodeChecker для извлечения недостающих признаков
+            batch_size: Количество решений в одном запросе к базе и в одном
+                        пакете извлечения признаков
+
+        Returns:
+            Словарь added (добавлено примеров), skipped (решения без тестов),
+            extracted (решения, признаки которых извлечены заново)
+        """
+        stats = {'added': 0, 'skipped': 0, 'extracted': 0}
+        with self._locked():
+            self.manifest = self._read_manifest()
+            stats['extracted'] = db.backfill_solution_features(
+                lambda codes: [features for _, features in code_checker.get_code_features_batch(codes)],
+                batch_size=batch_size
+            )
+
+            while True:
+                solutions = db.get_solution_features(after_id=self.last_solution_id, limit=batch_size,
+                                                     include_results=True)
+                if not solutions:
+                    return stats
+
+                ids, features, targets = [], [], []
+                for solution in solutions:
+                    target = solution_target(solution)
+                    if target is None:
+                        stats['skipped'] += 1
+                        continue
+                    ids.append(solution['id'])
+                    features.append(solution['features'])
+                    targets.append(target)
+
+                if ids:
+                    self._append({
+                        'X': normalize_features(features, dtype=np.float32),
+                        'y': np.array(targets),
+                        'solution_id': np.array(ids)
+                    })
+                    stats['added'] += len(ids)
+                self.manifest['last_solution_id'] = solutions[-1]['id']
+                self._write_manifest()
+
+    def mark_trained(self, rows: int):
+        """
+        Отметка первых rows примеров как участвовавших в дообучении
+
+        Args:
+            rows: Количество примеров на момент подготовки дообучения
+        """
+        with self._locked():
+            self.manifest = self._read_manifest()
+            self.manifest['trained_rows'] = max(self.trained_rows, min(rows, self.rows))
+            self._write_manifest()
+
+    def arrays(self) -> Dict[str, np.ndarray]:
+        """
+        Поля хранилища, отображённые в память (только чтение)
+
+        Returns:
+            Словарь имя поля -> массив rows×столбцы
+        """
+        arrays = {}
+        for name, (dtype, columns) in STORE_FIELDS.items():
+            if self.rows == 0:
+                arrays[name] = np.empty((0, columns), dtype=dtype)
+            else:
+                arrays[name] = np.memmap(self._field_path(name), dtype=dtype, mode='r',
+                                         shape=(self.rows, columns))
+        return arrays
+
+    def dataset(self, indices: np.ndarray) -> Dataset:
+        """
+        Выборка примеров в виде Dataset
+
+        Args:
+            indices: Номера строк хранилища
+
+        Returns:
+            Dataset с копиями выбранных строк X и y
+        """
+        arrays = self.arrays()
+        digest = hashlib.sha256(json.dumps(self.manifest, sort_keys=True).encode('utf-8'))
+        digest.update(np.asarray(indices, dtype=np.int64).tobytes())
+        return Dataset(np.ascontiguousarray(arrays['X'][indices]), np.ascontiguousarray(arrays['y'][indices]),
+                       self.path, digest.hexdigest())
+
+    def _append(self, arrays: Dict[str, np.ndarray]):
+        """Дописывание строк во все поля (вызывается под блокировкой, манифест обновляет вызывающий)"""
+        rows = self.rows
+        count = len(arrays['solution_id'])
+        for name, (dtype, columns) in STORE_FIELDS.items():
+            data = np.ascontiguousarray(arrays[name], dtype=dtype).reshape(count, columns)
+            path = self._field_path(name)
+            expected = rows * columns * dtype.itemsize
+            if rows and os.path.getsize(path) < expected:
+                raise DatasetError(f"Файл хранилища {path} короче, чем указано в манифесте")
+            with open(path, 'ab') as f:
+                # Хвост прерванной записи (после последнего манифеста) отбрасывается
+                f.truncate(expected)
+                f.write(data.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        self.manifest['rows'] = rows + count
+
+    def _field_path(self, name: str) -> str:
+        dtype, _ = STORE_FIELDS[name]
+        return os.path.join(self.path, f"{name}.{dtype.kind}{dtype.itemsize * 8}")
+
+    def _read_manifest(self) -> Dict[str, Any]:
+        """Манифест хранилища (пустой, если хранилища нет или изменилась нормализация)"""
+        feature_scales = [[name, scale] for name, scale in FEATURE_SCALES]
+        try:
+            with open(os.path.join(self.path, 'store.json'), 'r', encoding='utf-8') as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            manifest = None
+
+        if (manifest is None or manifest.get('version') != STORE_FORMAT_VERSION
+                or manifest.get('feature_scales') != feature_scales):
+            # Признаки решений хранятся в базе, поэтому хранилище собирается заново
+            return {'version': STORE_FORMAT_VERSION, 'feature_scales': feature_scales,
+                    'rows': 0, 'last_solution_id': 0, 'trained_rows': 0, 'updated_at': None}
+        return manifest
+
+    def _write_manifest(self):
+        """Атомарная запись манифеста"""
+        self.manifest['updated_at'] = datetime.now().isoformat(timespec='seconds')
+        path = os.path.join(self.path, 'store.json')
+        temp_path = f"{path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, ensure_ascii=False, indent=2)
+        os.replace(temp_path, path)
+
+    @contextmanager
+    def _locked(self):
+        """
+        Монопольный доступ к хранилищу (файл блокировки с PID владельца)
+
+        Raises:
+            RuntimeError: Хранилище изменяет другой процесс
+        """
+        os.makedirs(self.path, exist_ok=True)
+        lock_path = os.path.join(self.path, 'store.lock')
+        for _ in range(2):
+            try:
+                fd = os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+                break
+            except FileExistsError:
+                if not _lock_abandoned(lock_path):
+                    raise RuntimeError("Хранилище примеров дообучения изменяет другой процесс")
+                try:
+                    os.remove(lock_path)
+                except FileNotFoundError:
+                    pass
+        else:
+            raise RuntimeError("Не удалось заблокировать хранилище примеров дообучения")
+
+        try:
+            os.write(fd, str(os.getpid()).encode('ascii'))
+            os.close(fd)
+            yield
+        finally:
+            os.remove(lock_path)
+
+
+def _lock_abandoned(lock_path: str) -> bool:
+    """Файл блокировки оставлен завершившимся процессом"""
+    try:
+        with open(lock_path, 'r', encoding='ascii') as f:
+            pid = int(f.read() or 0)
+        age = time.time() - os.path.getmtime(lock_path)
+    except (OSError, ValueError):
+        return False
+    if not pid:
+        # PID ещё не записан (или запись прервана)
+        return age > STALE_LOCK_AGE
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return True
+    except PermissionError:
+        return False
+    return False
+
+
+def prepare_retraining(params: Dict[str, Any]) -> Tuple[Optional[Dataset], SimpleNeuralNetwork, Dict[str, Any]]:
+    """
+    Подготовка дообучения: новые решения, выборка примеров и исходная сеть
+
+    Args:
+        params: Параметры задания (validate_retrain_params, а также db_path,
+                models_dir и необязательный store_dir)
+
+    Returns:
+        Кортеж (выборка или None, если новых примеров меньше
+        min_new_examples; сеть с весами активной модели; сведения о
+        дообучении для результата задания)
+    """
+    from app.utils.database import DatabaseManager
+
+    cpu_count = os.cpu_count() or 1
+    code_checker = CodeChecker(feature_workers=min(cpu_count, 4) if cpu_count > 1 else 0)
+    store = TrainingStore(params.get('store_dir', STORE_DIR))
+    sync = store.sync(DatabaseManager(params['db_path']), code_checker)
+    print(f"📥 Новых примеров: {sync['added']}, решений без тестов: {sync['skipped']}, "
+          f"признаки извлечены для {sync['extracted']} решений")
+
+    served = ModelServer(models_dir=params['models_dir']).current()
+    new_rows = store.rows - store.trained_rows
+    info = {
+        'base_version': served.version,
+        'base_model': served.name,
+        'new_solutions': sync['added'],
+        'new_examples': new_rows,
+        'replay_examples': 0,
+        'store_rows': store.rows
+    }
+    if new_rows < params['min_new_examples']:
+        return None, served.network, info
+
+    rng = np.random.default_rng(params.get('seed'))
+    replay = min(store.trained_rows, int(round(new_rows * params['replay_ratio'])))
+    indices = np.concatenate([
+        np.arange(store.trained_rows, store.rows),
+        np.sort(rng.choice(store.trained_rows, size=replay, replace=False))
+    ]).astype(np.int64)
+    info['replay_examples'] = replay
+    print(f"🔁 Дообучение модели версии {served.version}: {new_rows} новых + {replay} прежних примеров")
+    return store.dataset(indices), served.network, info
+
+
+def complete_retraining(params: Dict[str, Any], info: Dict[str, Any], model_path: str,
+                        job_id: str) -> Dict[str, Any]:
+    """
+    Завершение дообучения: отметка примеров и (по запросу) активация модели
+
+    Args:
+        params: Параметры задания
+        info: Сведения из prepare_retraining
+        model_path: Файл дообученной модели
+        job_id: ID задания
+
+    Returns:
+        Дополнительные поля результата задания (model_version при активации)
+    """
+    TrainingStore(params.get('store_dir', STORE_DIR)).mark_trained(info['store_rows'])
+    if not params.get('activate'):
+        return {}
+    served = ModelServer(models_dir=params['models_dir']).activate(model_path, name=f"retrain-{job_id}")
+    return {'model_version': served.version}
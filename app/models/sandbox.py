@@ -0,0 +1,376 @@
+"""
+Пул заранее запущенных процессов-песочниц для выполнения кода студентов
+
+Запуск нового интерпретатора на каждый тестовый случай стоит 30-60 мс,
+поэтому CodeChecker может держать несколько прогретых процессов
+(см. sandbox_worker.py) и передавать им код через канал stdin/stdout.
+
+Процесс пересоздаётся:
+- после max_jobs_per_worker выполненных заданий (изоляция состояния);
+- после задания, изменившего модули интерпретатора или оставившего
+  работающие потоки и дочерние процессы (ответ с "recycle", см.
+  sandbox_worker.py);
+- при превышении таймаута (процесс принудительно завершается);
+- при аварийном завершении процесса.
+
+Если новый процесс не удалось запустить (например, EAGAIN или ENOMEM при
+исчерпании ресурсов), место в пуле не теряется: вместо процесса в очередь
+возвращается None, и запуск повторяется, когда место понадобится заданию.
+
+Процессы запускаются с ограничениями ресурсов (SandboxLimits): память
+(RLIMIT_AS) и процессорное время на один запуск кода (RLIMIT_CPU). Каждый
+процесс - лидер собственной группы процессов, и при замене завершается
+вся группа, включая процессы, созданные кодом студента.
+"""
+
+import atexit
+import json
+import os
+import queue
+import signal
+import subprocess
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+
+WORKER_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sandbox_worker.py')
+
+
+# Группы процессов (kill всей группы) есть только в POSIX
+HAS_PROCESS_GROUPS = hasattr(os, 'killpg')
+
+# Типы сообщений, завершающих ответ на задание
+FINAL_MESSAGES = ('result', 'done')
+
+
+@dataclass(frozen=True)
+class SandboxLimits:
+    """
+    Ограничения ресурсов процесса-песочницы
+
+    Attributes:
+        memory_mb: Адресное пространство процесса в МБ (0 - без ограничения)
+        cpu_seconds: Процессорное время на загрузку кода и на каждый тест
+                     в секундах (0 - без ограничения)
+    """
+    memory_mb: int = 0
+    cpu_seconds: int = 0
+
+    def args(self) -> List[str]:
+        """Аргументы командной строки процесса-исполнителя"""
+        return [str(self.memory_mb), str(self.cpu_seconds)]
+
+
+class SandboxError(Exception):
+    """Задание не было выполнено до конца"""
+
+    @property
+    def messages(self) -> List[Dict[str, Any]]:
+        """Промежуточные сообщения, полученные до сбоя"""
+        return self.args[-1] if self.args and isinstance(self.args[-1], list) else []
+
+
+class SandboxTimeout(SandboxError):
+    """Задание не уложилось в отведённое время"""
+
+
+class SandboxCrash(SandboxError):
+    """Процесс-песочница завершился, не вернув результат"""
+
+
+class SandboxWorker:
+    """Один процесс-песочница и канал обмена с ним"""
+
+    def __init__(self, limits: Optional[SandboxLimits] = None):
+        """
+        Запуск процесса-исполнителя
+
+        Args:
+            limits: Ограничения ресурсов (None - без ограничений)
+        """
+        self.process = subprocess.Popen(
+            [sys.executable, WORKER_SCRIPT] + (limits or SandboxLimits()).args(),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            text=True,
+            encoding='utf-8',
+            bufsize=1,
+            # Своя группа процессов: kill завершает и процессы, созданные кодом студента
+            start_new_session=HAS_PROCESS_GROUPS
+        )
+        self.jobs_done = 0
+        # Задание изменило состояние интерпретатора: процесс больше не используется
+        self.tainted = False
+
+        # Чтение ответов в отдельном потоке позволяет ждать с таймаутом
+        # одинаково на всех платформах (select не работает с pipe в Windows)
+        self._responses = queue.Queue()
+        self._reader = threading.Thread(target=self._read_responses, daemon=True)
+        try:
+            self._reader.start()
+        except RuntimeError:
+            self.kill()
+            raise
+
+    def _read_responses(self):
+        """Перенос строк из stdout процесса в очередь ответов"""
+        try:
+            for line in self.process.stdout:
+                self._responses.put(line)
+        except (OSError, ValueError):
+            pass
+        # None - признак того, что процесс закрыл канал
+        self._responses.put(None)
+
+    def is_alive(self) -> bool:
+        """Процесс работает и готов принимать задания"""
+        return self.process.poll() is None
+
+    def request(self, job: Dict[str, Any], timeout: float,
+                on_message: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Отправка задания и ожидание ответа
+        
+        Промежуточные сообщения (результаты отдельных тестов пакетного
+        задания) передаются в on_message по мере поступления и
+        накапливаются в поле 'messages' итогового ответа. Словарь,
+        возвращённый on_message, отправляется процессу как ответ на
+        сообщение (режим stepwise пакетного задания).
+
+        Args:
+            job: Задание (сериализуется в JSON)
+            timeout: Максимальное время ожидания итогового ответа в секундах
+            on_message: Обработчик промежуточных сообщений (возвращает ответ или None)
+
+        Returns:
+            Итоговый ответ процесса-исполнителя
+
+        Raises:
+            SandboxTimeout: Итоговый ответ не получен за timeout секунд
+            SandboxCrash: Процесс завершился до ответа
+        """
+        self._send(job)
+
+        deadline = time.monotonic() + timeout
+        messages = []
+        while True:
+            try:
+                line = self._responses.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                raise SandboxTimeout(messages)
+
+            if line is None:
+                raise SandboxCrash(self._exit_reason(), messages)
+
+            message = json.loads(line)
+            if message.get('type') in FINAL_MESSAGES:
+                break
+            messages.append(message)
+            if on_message is not None:
+                reply = on_message(message)
+                if reply is not None:
+                    self._send(reply, messages)
+
+        self.jobs_done += 1
+        self.tainted = self.tainted or bool(message.pop('recycle', False))
+        message['messages'] = messages
+        return message
+
+    def _send(self, message: Dict[str, Any], received: Optional[List[Dict[str, Any]]] = None):
+        """Запись строки JSON в stdin процесса"""
+        try:
+            self.process.stdin.write(json.dumps(message) + '\n')
+            self.process.stdin.flush()
+        except (OSError, ValueError) as e:
+            raise SandboxCrash(str(e), received or [])
+
+    def _exit_reason(self) -> str:
+        """Описание завершения процесса для сообщения об ошибке"""
+        try:
+            returncode = self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            returncode = None
+        if hasattr(signal, 'SIGXCPU') and returncode == -signal.SIGXCPU:
+            return "превышено процессорное время"
+        return "процесс песочницы завершился"
+
+    def kill(self):
+        """Принудительное завершение процесса и его группы"""
+        try:
+            if HAS_PROCESS_GROUPS:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            else:
+                self.process.kill()
+        except OSError:
+            pass
+        try:
+            self.process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            pass
+        for stream in (self.process.stdin, self.process.stdout):
+            try:
+                stream.close()
+            except (OSError, ValueError):
+                pass
+
+    def close(self):
+        """Штатное завершение: закрытие stdin приводит к выходу из цикла"""
+        if self.tainted:
+            # Задание оставило потоки или дочерние процессы
+            self.kill()
+            return
+        try:
+            self.process.stdin.close()
+            self.process.wait(timeout=1)
+        except (OSError, ValueError, subprocess.TimeoutExpired):
+            self.kill()
+
+
+class SandboxPool:
+    """Пул прогретых процессов-песочниц"""
+
+    def __init__(self, size: int = 2, max_jobs_per_worker: int = 50,
+                 limits: Optional[SandboxLimits] = None):
+        """
+        Инициализация пула
+
+        Args:
+            size: Количество одновременно запущенных процессов
+            max_jobs_per_worker: Число заданий, после которого процесс пересоздаётся
+            limits: Ограничения ресурсов процессов (None - без ограничений)
+        """
+        if size < 1:
+            raise ValueError("Размер пула должен быть не меньше 1")
+
+        self.size = size
+        self.max_jobs_per_worker = max(1, max_jobs_per_worker)
+        self.limits = limits
+        self._idle = queue.Queue()
+        self._lock = threading.Lock()
+        self._closed = False
+        self.stats = {'jobs': 0, 'timeouts': 0, 'crashes': 0, 'recycled': 0, 'spawn_failures': 0}
+
+        # Свободные места пула: процесс или None (процесс будет запущен при выдаче места)
+        for _ in range(size):
+            self._idle.put(self._spawn())
+
+        atexit.register(self.shutdown)
+
+    def execute(self, job: Dict[str, Any], timeout: float,
+                on_message: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Выполнение задания в свободном процессе пула
+
+        Вызов блокируется, пока не освободится один из процессов.
+        Время ожидания свободного процесса в таймаут не входит.
+
+        Args:
+            job: Задание для процесса-исполнителя
+            timeout: Таймаут выполнения в секундах
+            on_message: Обработчик промежуточных сообщений (см. SandboxWorker.request)
+
+        Returns:
+            Ответ процесса-исполнителя
+
+        Raises:
+            SandboxTimeout: Превышено время выполнения
+            SandboxCrash: Процесс завершился аварийно
+        """
+        if self._closed:
+            raise RuntimeError("Пул песочниц остановлен")
+
+        worker = self._idle.get()
+        if worker is None or not worker.is_alive():
+            worker = self._replace(worker)
+            if worker is None:
+                self._idle.put(None)
+                raise SandboxCrash("не удалось запустить процесс песочницы", [])
+
+        keep_worker = False
+        try:
+            response = worker.request(job, timeout, on_message)
+            keep_worker = True
+            return response
+        except SandboxTimeout:
+            self._count('timeouts')
+            raise
+        except SandboxCrash:
+            self._count('crashes')
+            raise
+        finally:
+            self._count('jobs')
+            if not keep_worker or worker.tainted or worker.jobs_done >= self.max_jobs_per_worker:
+                worker = self._replace(worker)
+            self._idle.put(worker)
+
+    def _replace(self, worker: Optional[SandboxWorker]) -> Optional[SandboxWorker]:
+        """Завершение процесса и запуск нового на его месте (None - запуск не удался)"""
+        if worker is not None:
+            worker.kill()
+            self._count('recycled')
+        return self._spawn()
+
+    def _spawn(self) -> Optional[SandboxWorker]:
+        """
+        Запуск процесса-исполнителя
+
+        Returns:
+            Процесс или None, если система не смогла его запустить
+        """
+        try:
+            return SandboxWorker(self.limits)
+        except (OSError, RuntimeError) as e:
+            self._count('spawn_failures')
+            print(f"⚠️ Не удалось запустить процесс песочницы: {e}")
+            return None
+
+    def _count(self, key: str):
+        """Потокобезопасное увеличение счётчика статистики"""
+        with self._lock:
+            self.stats[key] += 1
+
+    def shutdown(self):
+        """Остановка всех процессов пула"""
+        if self._closed:
+            return
+        self._closed = True
+        while True:
+            try:
+                worker = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            if worker is not None:
+                worker.close()
+
+
+
+def run_once(job: Dict[str, Any], timeout: float,
+             on_message: Optional[Callable[[Dict[str, Any]], None]] = None,
+             limits: Optional[SandboxLimits] = None) -> Dict[str, Any]:
+    """
+    Выполнение задания в одноразовом процессе-песочнице
+
+    Используется, когда пул отключён: протокол тот же, но процесс
+    запускается под одно задание и сразу завершается.
+
+    Args:
+        job: Задание для процесса-исполнителя
+        timeout: Таймаут выполнения в секундах
+        on_message: Обработчик промежуточных сообщений
+        limits: Ограничения ресурсов процесса (None - без ограничений)
+
+    Returns:
+        Ответ процесса-исполнителя
+    """
+    worker = SandboxWorker(limits)
+    try:
+        return worker.request(job, timeout, on_message)
+    except SandboxError:
+        worker.kill()
+        raise
+    finally:
+        worker.close()
@@ -0,0 +1,658 @@
+"""
+Процесс-исполнитель песочницы для проверки кода Python
+
+Запускается как отдельный интерпретатор (python sandbox_worker.py) и
+обслуживает задания, поступающие построчно через stdin в формате JSON.
+Ответы записываются в stdout, по одной строке JSON на сообщение.
+
+Модуль намеренно не импортирует пакет app: процесс стартует заранее,
+держит прогретыми часто используемые модули стандартной библиотеки и
+выполняет каждый код студента в чистом пространстве имён.
+
+Задания разных студентов не должны влиять друг на друга, поэтому каждое
+получает собственную копию встроенных имён, а после задания состояние
+интерпретатора возвращается к снятому при запуске (_capture_state,
+_restore_state): импортированные заданием модули выгружаются, изменённые
+атрибуты загруженных модулей и их классов восстанавливаются. Если задание
+что-то изменило или оставило работающие потоки и дочерние процессы
+(_has_leftovers), итоговое сообщение приходит с полем "recycle": true и
+пул заменяет процесс вместе с его группой процессов - изменения, которые
+нельзя обнаружить (например, состояние внутри объектов модулей или
+изменения, которые поток сделает позже), не доживают до следующего задания.
+
+ЗАПУСК:
+    python sandbox_worker.py [memory_mb] [cpu_seconds]
+
+    memory_mb - ограничение адресного пространства процесса (RLIMIT_AS),
+    cpu_seconds - процессорное время на загрузку кода и на каждый тест
+    (RLIMIT_CPU, при превышении процесс завершается); 0 или отсутствие
+    аргумента - без ограничения.
+
+ПРОТОКОЛ:
+    Запуск скрипта:
+        запрос:  {"type": "run", "code": "...", "input": "..."}
+        ответ:   {"type": "result", "ok": true/false, "stdout": "...", "error": "...",
+                  "time": 0.0001, "cpu_time": 0.0001, "peak_memory": 9216}
+
+    Пакетное тестирование (все тесты в одном процессе, код компилируется один раз):
+        запрос:  {"type": "batch", "code": "...", "calls": ["f([1, 2])", ...],
+                  "case_timeout": 5, "budget": 10, "stepwise": true}
+        ответы:  {"type": "case", "index": 0, "ok": ..., "stdout": "...",
+                  "error": "...", "timeout": false, "time": 0.0001,
+                  "cpu_time": 0.0001, "peak_memory": 9216}
+                 ... (по одному сообщению на каждый тест, по мере выполнения)
+                 {"type": "done"}
+
+        budget (необязательно) - время на загрузку кода и все тесты вместе;
+        stepwise (необязательно) - режим fail-fast: после каждого сообщения
+        "case" процесс ждёт строку {"continue": true/false} от родителя,
+        который сам сравнивает вывод с ожидаемым (ожидаемый вывод не
+        передаётся в процесс с кодом студента); после false остальные
+        тесты не выполняются. Невыполненные тесты возвращаются с полем
+        "skipped": "budget" или "fail_fast".
+
+    Профилирование функции (время на лестнице размеров входа):
+        запрос:  {"type": "profile", "code": "...", "function": "f",
+                  "inputs": ["[3, 1, 2]", ...], "budget": 2, "call_limit": 0.25}
+        ответы:  {"type": "point", "index": 0, "time": 0.00001, "calls": 50}
+                 ... (по одному сообщению на каждый измеренный размер)
+                 {"type": "done", "error": ""}
+
+        inputs - литералы аргумента по возрастанию размера. Измерение
+        останавливается, когда один вызов дольше call_limit (следующий
+        размер займёт ещё больше), исчерпан budget или вызов завершился
+        исключением - тогда последняя точка приходит с полем "stopped":
+        "timeout" или "error" и не считается измеренной.
+
+    Итоговое сообщение ("result" или "done") содержит "recycle": true,
+    если задание изменило модули интерпретатора или оставило работающие
+    потоки и дочерние процессы: процесс нужно заменить.
+
+    time (perf_counter), cpu_time (process_time) и peak_memory (пиковый
+    RSS процесса в КБ) измеряются только вокруг выполнения кода студента:
+    exec для скрипта, eval вызова для теста.
+"""
+
+import ast
+import builtins
+import copy
+import io
+import json
+import os
+import signal
+import sys
+import threading
+import time
+import traceback
+from typing import Optional
+
+# Предварительный импорт модулей, которые часто используют решения студентов
+import collections  # noqa: F401
+import functools  # noqa: F401
+import itertools  # noqa: F401
+import math  # noqa: F401
+import random  # noqa: F401
+import re  # noqa: F401
+import string  # noqa: F401
+
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Ограничение времени внутри процесса доступно только там, где есть SIGALRM
+HAS_ALARM = hasattr(signal, 'SIGALRM')
+
+# Пиковый RSS процесса сбрасывается записью "5" в clear_refs (Linux 4.0+)
+CLEAR_REFS_PATH = '/proc/self/clear_refs'
+STATUS_PATH = '/proc/self/status'
+
+# Потоки процесса (Linux) и проверка дочерних процессов без ожидания (POSIX)
+TASKS_PATH = '/proc/self/task'
+HAS_WAITPID = hasattr(os, 'WNOHANG')
+
+# Ограничение процессорного времени (секунды), задаётся при запуске
+_cpu_limit = 0
+
+# Профилирование: минимальное суммарное время и наибольшее число вызовов на один размер
+PROFILE_MIN_TIME = 0.005
+PROFILE_MAX_CALLS = 50
+
+# Причины пропуска теста
+SKIP_BUDGET = 'budget'
+SKIP_FAIL_FAST = 'fail_fast'
+
+# Встроенные имена в начале работы процесса (копия выдаётся каждому заданию)
+_BUILTINS = dict(vars(builtins))
+
+
+class CaseTimeout(BaseException):
+    """Превышено время выполнения одного теста"""
+
+
+def _on_alarm(signum, frame):
+    """Обработчик SIGALRM: прерывает выполнение кода студента"""
+    raise CaseTimeout()
+
+
+def _set_alarm(seconds: float):
+    """Установка (seconds > 0) или снятие (seconds = 0) таймера"""
+    if HAS_ALARM:
+        signal.setitimer(signal.ITIMER_REAL, seconds)
+
+
+def apply_limits(memory_mb: int = 0, cpu_seconds: int = 0):
+    """
+    Ограничения ресурсов процесса
+
+    Адресное пространство ограничивается сразу для всего процесса:
+    выделение памяти сверх него завершается MemoryError в коде студента.
+    Процессорное время ограничивается перед каждым запуском кода
+    (см. _limit_cpu): процесс обслуживает много заданий, и RLIMIT_CPU
+    отсчитывается от уже израсходованного времени.
+
+    Args:
+        memory_mb: Ограничение памяти в МБ (0 - без ограничения)
+        cpu_seconds: Процессорное время на один запуск в секундах (0 - без ограничения)
+    """
+    global _cpu_limit
+    if resource is None:
+        return
+    if memory_mb > 0:
+        _, hard = resource.getrlimit(resource.RLIMIT_AS)
+        limit = memory_mb * 1024 * 1024
+        if hard != resource.RLIM_INFINITY:
+            limit = min(limit, hard)
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    _cpu_limit = cpu_seconds
+
+
+def _limit_cpu():
+    """Мягкий RLIMIT_CPU: израсходованное время плюс время на один запуск"""
+    if resource is None or _cpu_limit <= 0:
+        return
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    soft = int(usage.ru_utime + usage.ru_stime) + 1 + _cpu_limit
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    if hard != resource.RLIM_INFINITY:
+        soft = min(soft, hard)
+    resource.setrlimit(resource.RLIMIT_CPU, (soft, hard))
+
+
+def _reset_peak_memory():
+    """Сброс пикового RSS процесса (где это поддерживается)"""
+    try:
+        with open(CLEAR_REFS_PATH, 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+
+def _peak_memory() -> int:
+    """
+    Пиковый RSS процесса в КБ
+
+    Returns:
+        VmHWM из /proc (после _reset_peak_memory - пик с момента сброса);
+        без /proc - ru_maxrss (пик за всё время процесса); 0, если
+        измерение недоступно
+    """
+    try:
+        with open(STATUS_PATH) as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError, IndexError):
+        pass
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS возвращает байты, Linux - килобайты
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def _start_measure():
+    """Начало измерения: сброс пика памяти, отметки времени и CPU"""
+    _reset_peak_memory()
+    return time.perf_counter(), time.process_time()
+
+
+def _finish_measure(started, report: dict):
+    """Запись time, cpu_time и peak_memory в сообщение report"""
+    wall_start, cpu_start = started
+    report['time'] = time.perf_counter() - wall_start
+    report['cpu_time'] = time.process_time() - cpu_start
+    report['peak_memory'] = _peak_memory()
+
+
+def _new_namespace() -> dict:
+    """Пространство имён модуля студента с собственной копией встроенных имён"""
+    return {'__name__': '__main__', '__builtins__': dict(_BUILTINS)}
+
+
+def _capture_state():
+    """
+    Снимок состояния интерпретатора, которое может изменить код студента
+
+    Returns:
+        Кортеж (копия sys.modules, атрибуты загруженных модулей,
+        атрибуты классов, объявленных в этих модулях)
+    """
+    modules = dict(sys.modules)
+    attributes = {}
+    classes = {}
+    for name, module in modules.items():
+        namespace = getattr(module, '__dict__', None)
+        if not isinstance(namespace, dict):
+            continue
+        attributes[name] = dict(namespace)
+        for value in namespace.values():
+            if isinstance(value, type) and value not in classes:
+                classes[value] = dict(value.__dict__)
+    return modules, attributes, classes
+
+
+def _restore_state(state) -> bool:
+    """
+    Возврат состояния интерпретатора к снимку _capture_state
+
+    Модули, импортированные после снимка, выгружаются (следующее задание
+    импортирует их заново), заменённые и удалённые атрибуты модулей и
+    классов восстанавливаются.
+
+    Returns:
+        True, если задание изменило модули или классы, существовавшие до
+        снимка (процесс следует заменить)
+    """
+    modules, attributes, classes = state
+    changed = False
+    for name in list(sys.modules):
+        if name not in modules:
+            del sys.modules[name]
+    for name, module in modules.items():
+        if sys.modules.get(name) is not module:
+            sys.modules[name] = module
+            changed = True
+        saved = attributes.get(name)
+        if saved is not None and _differs(module.__dict__, saved):
+            module.__dict__.clear()
+            module.__dict__.update(saved)
+            changed = True
+    for cls, saved in classes.items():
+        current = cls.__dict__
+        if not _differs(current, saved):
+            continue
+        changed = True
+        try:
+            for key in [key for key in current if key not in saved]:
+                delattr(cls, key)
+            for key, value in saved.items():
+                if current.get(key) is not value:
+                    setattr(cls, key, value)
+        except (AttributeError, TypeError):
+            pass
+    return changed
+
+
+def _differs(current, saved: dict) -> bool:
+    """Словарь атрибутов отличается от снимка (сравниваются сами объекты)"""
+    if len(current) != len(saved):
+        return True
+    for key, value in saved.items():
+        if current.get(key, _MISSING) is not value:
+            return True
+    return False
+
+
+_MISSING = object()
+
+
+def _has_leftovers() -> bool:
+    """
+    Задание оставило работающие потоки или дочерние процессы
+
+    Поток может изменить состояние интерпретатора уже после
+    _restore_state, а дочерний процесс (os.fork) - работать дальше в той
+    же группе процессов, поэтому такой процесс заменяется. Потоки,
+    запущенные в обход threading (_thread), видны только через /proc.
+    """
+    if threading.active_count() > 1:
+        return True
+    try:
+        if len(os.listdir(TASKS_PATH)) > 1:
+            return True
+    except OSError:
+        pass
+    if HAS_WAITPID:
+        try:
+            # Работающий или завершившийся (он будет убран) дочерний процесс
+            os.waitpid(-1, os.WNOHANG)
+            return True
+        except ChildProcessError:
+            pass
+    return False
+
+
+def _format_error(exc_info) -> str:
+    """Текст ошибки в формате stderr интерпретатора без кадров песочницы"""
+    exc_type, exc, tb = exc_info
+    return ''.join(traceback.format_exception(exc_type, exc, tb.tb_next if tb else None)).strip()
+
+
+def _exit_status(e: SystemExit):
+    """
+    Интерпретация exit()/quit() так, как её видит запуск отдельного скрипта
+
+    Returns:
+        Кортеж (успех, текст ошибки)
+    """
+    if e.code in (None, 0):
+        return True, ""
+    return False, "" if isinstance(e.code, int) else str(e.code)
+
+
+def execute(code: str, input_data: str = "") -> dict:
+    """
+    Выполнение кода в чистом пространстве имён
+
+    Стандартные потоки подменяются буферами, поэтому вывод кода не
+    смешивается с протоколом обмена. Поведение повторяет запуск
+    отдельного скрипта: код возврата 0 считается успехом, иначе в
+    поле error возвращается текст ошибки (как stderr интерпретатора).
+
+    Args:
+        code: Исходный код для выполнения
+        input_data: Данные, доступные коду через stdin
+
+    Returns:
+        Словарь с полями ok, stdout, error, time, cpu_time, peak_memory
+    """
+    stdout = io.StringIO()
+    namespace = _new_namespace()
+    result = {'type': 'result', 'ok': True, 'stdout': "", 'error': "",
+              'time': 0.0, 'cpu_time': 0.0, 'peak_memory': 0}
+
+    saved_streams = sys.stdin, sys.stdout, sys.stderr
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(input_data), stdout, io.StringIO()
+    try:
+        compiled = compile(code, '<sandbox>', 'exec')
+        _limit_cpu()
+        started = _start_measure()
+        try:
+            exec(compiled, namespace)
+        finally:
+            _finish_measure(started, result)
+    except SystemExit as e:
+        result['ok'], result['error'] = _exit_status(e)
+    except BaseException:
+        result['ok'], result['error'] = False, _format_error(sys.exc_info())
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+
+    if result['ok']:
+        result['stdout'] = stdout.getvalue().strip()
+    return result
+
+
+def run_batch(code: str, calls: list, case_timeout: float, emit,
+              budget: Optional[float] = None, receive=None):
+    """
+    Компиляция кода один раз и последовательный вызов всех тестов
+
+    Каждый тест выполняет модуль заново в чистом пространстве имён, как
+    при отдельном запуске скрипта на каждый тест: глобальное состояние
+    решения (счётчики, изменяемые значения по умолчанию) не переходит из
+    теста в тест, а вывод модуля (print на верхнем уровне) предшествует
+    выводу каждого теста. Первый тест использует модуль, загруженный при
+    проверке кода. Исключение в тесте не влияет на остальные тесты:
+    оно печатается как "Error: ...", как это делала обёртка теста.
+
+    Args:
+        code: Код студента
+        calls: Выражения вызова функции для каждого теста
+        case_timeout: Время на один тест (и на загрузку модуля) в секундах
+        emit: Функция отправки сообщения родительскому процессу
+        budget: Время на загрузку модуля и все тесты вместе (None - без ограничения);
+                тесты, на которые время не осталось, пропускаются
+        receive: Функция получения ответа родителя после каждого теста для
+                 режима fail-fast (None - выполнять все тесты)
+
+    Returns:
+        Итоговое сообщение {'type': 'done'}
+    """
+    deadline = time.monotonic() + budget if budget is not None else None
+    namespace = _new_namespace()
+    saved_streams = sys.stdin, sys.stdout, sys.stderr
+
+    # Загрузка модуля студента
+    preamble = io.StringIO()
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(), preamble, io.StringIO()
+    load_ok, load_error, load_timeout = True, "", False
+    try:
+        _limit_cpu()
+        _set_alarm(_time_limit(case_timeout, deadline))
+        compiled = compile(code, '<sandbox>', 'exec')
+        exec(compiled, namespace)
+    except CaseTimeout:
+        load_ok, load_timeout = False, True
+    except SystemExit as e:
+        load_ok, load_error = _exit_status(e)
+        if load_ok:
+            # Скрипт завершился до вызова функции: тесты видят только вывод модуля
+            calls = [None] * len(calls)
+    except BaseException:
+        load_ok, load_error = False, _format_error(sys.exc_info())
+    finally:
+        _set_alarm(0)
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+
+    skip_reason = None
+    for index, call in enumerate(calls):
+        case = {'type': 'case', 'index': index, 'ok': load_ok, 'stdout': "",
+                'error': load_error, 'timeout': load_timeout, 'time': 0.0,
+                'cpu_time': 0.0, 'peak_memory': 0}
+
+        if load_ok and skip_reason is None and deadline is not None and time.monotonic() >= deadline:
+            skip_reason = SKIP_BUDGET
+        if load_ok and skip_reason is not None:
+            case.update(ok=False, skipped=skip_reason)
+            emit(case)
+            if receive is not None:
+                receive()
+            continue
+
+        if load_ok:
+            output = io.StringIO()
+            sys.stdin, sys.stdout, sys.stderr = io.StringIO(), output, io.StringIO()
+            try:
+                _limit_cpu()
+                _set_alarm(_time_limit(case_timeout, deadline))
+                if namespace is None:
+                    namespace = _new_namespace()
+                    exec(compiled, namespace)
+                else:
+                    output.write(preamble.getvalue())
+                if call is not None:
+                    try:
+                        started = _start_measure()
+                        try:
+                            result = eval(call, namespace)
+                        finally:
+                            _finish_measure(started, case)
+                        print(result)
+                    except MemoryError as e:
+                        # У MemoryError (ограничение памяти) сообщение обычно пустое
+                        print(f"Error: {str(e) or type(e).__name__}")
+                    except Exception as e:
+                        print(f"Error: {e}")
+            except CaseTimeout:
+                case.update(ok=False, timeout=True)
+            except SystemExit as e:
+                ok, error = _exit_status(e)
+                case.update(ok=ok, error=error)
+            except BaseException:
+                case.update(ok=False, error=_format_error(sys.exc_info()))
+            finally:
+                _set_alarm(0)
+                sys.stdin, sys.stdout, sys.stderr = saved_streams
+                # Следующий тест начинается с чистого модуля
+                namespace = None
+
+            if case['ok']:
+                case['stdout'] = output.getvalue().strip()
+
+        emit(case)
+        if receive is not None:
+            reply = receive()
+            if load_ok and skip_reason is None and not (reply or {}).get('continue'):
+                skip_reason = SKIP_FAIL_FAST
+
+    return {'type': 'done'}
+
+
+class _NullStream(io.TextIOBase):
+    """Поток, отбрасывающий вывод (print в профилируемой функции)"""
+
+    def write(self, text):
+        return len(text)
+
+
+def run_profile(code: str, function: str, inputs: list, budget: float, call_limit: float, emit):
+    """
+    Время вызова функции студента на входах возрастающего размера
+
+    Для каждого входа функция вызывается несколько раз (не меньше
+    PROFILE_MIN_TIME суммарно, не больше PROFILE_MAX_CALLS вызовов) с
+    копией аргумента - функция может изменять список на месте. В
+    результат идёт минимальное время вызова: оно меньше всего зависит от
+    посторонней нагрузки. Измеряется только сам вызов.
+
+    Args:
+        code: Код студента
+        function: Имя профилируемой функции
+        inputs: Литералы аргумента по возрастанию размера
+        budget: Время на загрузку кода и все измерения в секундах
+        call_limit: Вызов дольше этого времени завершает измерение
+        emit: Функция отправки сообщения родительскому процессу
+
+    Returns:
+        Итоговое сообщение {'type': 'done', 'error': ...}
+    """
+    deadline = time.monotonic() + budget
+    namespace = _new_namespace()
+    saved_streams = sys.stdin, sys.stdout, sys.stderr
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(), _NullStream(), _NullStream()
+    error = ""
+    try:
+        _limit_cpu()
+        _set_alarm(_time_limit(budget, deadline))
+        exec(compile(code, '<sandbox>', 'exec'), namespace)
+        target = namespace[function]
+
+        for index, literal in enumerate(inputs):
+            value = ast.literal_eval(literal)
+            best, calls, total = None, 0, 0.0
+            _set_alarm(_time_limit(budget, deadline))
+            try:
+                while calls < PROFILE_MAX_CALLS and (calls == 0 or total < PROFILE_MIN_TIME):
+                    argument = copy.copy(value)
+                    start = time.perf_counter()
+                    target(argument)
+                    elapsed = time.perf_counter() - start
+                    calls += 1
+                    total += elapsed
+                    best = elapsed if best is None else min(best, elapsed)
+            except CaseTimeout:
+                emit({'type': 'point', 'index': index, 'time': best, 'calls': calls, 'stopped': 'timeout'})
+                break
+            except Exception:
+                # Например, RecursionError на большом размере: измеренные точки остаются
+                emit({'type': 'point', 'index': index, 'time': best, 'calls': calls, 'stopped': 'error'})
+                break
+            finally:
+                _set_alarm(0)
+            emit({'type': 'point', 'index': index, 'time': best, 'calls': calls})
+            if best > call_limit:
+                break
+    except CaseTimeout:
+        error = "Превышено время профилирования"
+    except BaseException:
+        error = _format_error(sys.exc_info())
+    finally:
+        _set_alarm(0)
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+
+    return {'type': 'done', 'error': error}
+
+
+def _time_limit(case_timeout: float, deadline: Optional[float]) -> float:
+    """Время на очередной шаг: не больше case_timeout и остатка общего времени"""
+    if deadline is None:
+        return case_timeout
+    # setitimer(0) снимает таймер, поэтому остаток не может быть нулевым
+    return max(min(case_timeout, deadline - time.monotonic()), 0.001)
+
+
+def main(memory_mb: int = 0, cpu_seconds: int = 0):
+    """
+    Цикл обработки заданий до закрытия stdin
+
+    Args:
+        memory_mb: Ограничение памяти процесса в МБ (0 - без ограничения)
+        cpu_seconds: Процессорное время на один запуск в секундах (0 - без ограничения)
+    """
+    # Протокол идёт через исходные дескрипторы, код студента их не видит.
+    # JSON кодируется в ASCII, поэтому кодировка консоли не важна.
+    channel_in = sys.stdin
+    channel_out = sys.stdout
+    owner = os.getpid()
+
+    def check_owner():
+        # Процесс, созданный кодом студента через os.fork: канал принадлежит родителю
+        if os.getpid() != owner:
+            os._exit(0)
+
+    def emit(message: dict):
+        check_owner()
+        channel_out.write(json.dumps(message) + '\n')
+        channel_out.flush()
+
+    def receive() -> Optional[dict]:
+        check_owner()
+        line = channel_in.readline()
+        return json.loads(line) if line.strip() else None
+
+    if HAS_ALARM:
+        signal.signal(signal.SIGALRM, _on_alarm)
+    apply_limits(memory_mb, cpu_seconds)
+    state = _capture_state()
+
+    # readline, а не итерация по файлу: receive читает тот же поток построчно
+    for line in iter(channel_in.readline, ''):
+        if not line.strip():
+            continue
+        try:
+            job = json.loads(line)
+            if job.get('type') == 'batch':
+                result = run_batch(job['code'], job['calls'], job.get('case_timeout', 5), emit,
+                                   job.get('budget'), receive if job.get('stepwise') else None)
+            elif job.get('type') == 'profile':
+                result = run_profile(job['code'], job['function'], job['inputs'], job.get('budget', 2),
+                                     job.get('call_limit', 0.25), emit)
+            else:
+                result = execute(job.get('code', ''), job.get('input', ''))
+        except Exception as e:
+            result = {'type': 'result', 'ok': False, 'stdout': "", 'error': f"Ошибка песочницы: {e}",
+                      'time': 0.0, 'cpu_time': 0.0, 'peak_memory': 0}
+
+        check_owner()
+        # Потоки проверяются до восстановления: завершившийся поток уже сделал все изменения
+        leftovers = _has_leftovers()
+        if _restore_state(state) or leftovers:
+            result['recycle'] = True
+        emit(result)
+
+
+if __name__ == '__main__':
+    main(*(int(arg) for arg in sys.argv[1:3]))
@@ -0,0 +1,334 @@
+"""
+Параллельный перебор гиперпараметров нейронной сети
+
+Спецификация перебора (словарь или JSON-файл):
+
+    {
+        "method": "grid",                     # или "random"
+        "params": {
+            "hidden_size": [4, 8, 16],        # список - перебор значений
+            "learning_rate": [0.01, 0.05],
+            "activation": ["sigmoid", "relu"],
+            "epochs": 2000
+        }
+    }
+
+    {
+        "method": "random",
+        "trials": 20,
+        "seed": 42,
+        "params": {
+            "learning_rate": {"min": 0.001, "max": 0.1, "log": true},
+            "hidden_size": {"min": 4, "max": 32, "int": true},
+            "dropout_rate": [0.0, 0.2, 0.3]
+        }
+    }
+
+Параметры: SWEEP_PARAMS; не указанные берутся из DEFAULT_TRIAL.
+
+Испытания выполняются в пуле процессов (spawn). Выборка передаётся
+рабочим процессам один раз через общую память (SharedMemory), а не
+копируется в каждую задачу.
+
+Ранняя остановка - successive halving: все испытания обучаются
+min_epochs эпох, затем продолжает обучение лучшая 1/eta часть по
+текущей ошибке, бюджет эпох умножается на eta, и так до заданного
+в испытании числа эпох. Остальные испытания помечаются как pruned.
+"""
+
+import contextlib
+import io
+import itertools
+import json
+import math
+import multiprocessing
+import os
+import pickle
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+
+from .dataset import Dataset
+
+
+# Перебираемые параметры
+SWEEP_PARAMS = ('hidden_size', 'learning_rate', 'epochs', 'activation',
+                'dropout_rate', 'hidden_size2', 'batch_size')
+
+# Значения параметров по умолчанию
+DEFAULT_TRIAL = {
+    'hidden_size': 8,
+    'learning_rate': 0.01,
+    'epochs': 2000,
+    'activation': 'sigmoid',
+    'dropout_rate': 0.0,
+    'hidden_size2': None,
+    'batch_size': 1
+}
+
+# Выборка рабочего процесса (заполняется в _init_worker)
+_worker_dataset: Optional[Dataset] = None
+_worker_memory: Optional[shared_memory.SharedMemory] = None
+
+
+def expand_spec(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Список конфигураций испытаний по спецификации
+
+    Args:
+        spec: Спецификация (см. описание модуля)
+
+    Returns:
+        Конфигурации с полным набором SWEEP_PARAMS и полем name
+
+    Raises:
+        ValueError: Неизвестный метод или параметр
+    """
+    method = spec.get('method', 'grid')
+    params = spec.get('params', {})
+    unknown = set(params) - set(SWEEP_PARAMS)
+    if unknown:
+        raise ValueError(f"Неизвестные параметры перебора: {', '.join(sorted(unknown))}")
+
+    if method == 'grid':
+        names = list(params)
+        values = [value if isinstance(value, list) else [value] for value in params.values()]
+        if any(isinstance(value, dict) for value in params.values()):
+            raise ValueError("Диапазоны {min, max} допустимы только для method=random")
+        choices = [dict(zip(names, combination)) for combination in itertools.product(*values)]
+    elif method == 'random':
+        rng = random.Random(spec.get('seed'))
+        choices = [{name: _sample(rng, name, value) for name, value in params.items()}
+                   for _ in range(int(spec.get('trials', 10)))]
+    else:
+        raise ValueError(f"Неизвестный метод перебора: {method}")
+
+    configs = []
+    for choice in choices:
+        config = dict(DEFAULT_TRIAL, **choice)
+        config['name'] = ', '.join(f"{name}={config[name]}" for name in params) or 'default'
+        configs.append(config)
+    return configs
+
+
+def _sample(rng: random.Random, name: str, value: Any) -> Any:
+    """Случайное значение параметра: выбор из списка или из диапазона {min, max}"""
+    if isinstance(value, list):
+        return rng.choice(value)
+    if not isinstance(value, dict):
+        return value
+    low, high = value['min'], value['max']
+    if value.get('log'):
+        sample = math.exp(rng.uniform(math.log(low), math.log(high)))
+    else:
+        sample = rng.uniform(low, high)
+    if value.get('int'):
+        return int(round(sample))
+    return float(f"{sample:.6g}")
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """Чтение спецификации перебора из JSON-файла"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def run_sweep(configs: List[Dict[str, Any]], dataset: Dataset, workers: Optional[int] = None,
+              min_epochs: Optional[int] = None, eta: int = 3, seed: int = 0,
+              log: Callable[[str], None] = print) -> Dict[str, Any]:
+    """
+    Выполнение испытаний в пуле процессов
+
+    Args:
+        configs: Конфигурации (см. expand_spec)
+        dataset: Обучающая выборка
+        workers: Количество процессов (по умолчанию - число CPU)
+        min_epochs: Бюджет первой ступени successive halving (None - без
+                    ранней остановки, каждое испытание обучается полностью)
+        eta: Во сколько раз сокращается число испытаний на каждой ступени
+        seed: Базовое зерно инициализации весов (испытание i - seed + i)
+        log: Функция вывода прогресса
+
+    Returns:
+        Сводные результаты: испытания, лучшее испытание, общее время
+    """
+    if eta < 2:
+        raise ValueError("eta должно быть не меньше 2")
+    workers = workers or os.cpu_count() or 1
+    started = time.time()
+
+    trials = [{
+        'trial_id': index,
+        'config': config,
+        'seed': seed + index,
+        'status': 'pending',
+        'epochs_trained': 0,
+        'wall_time': 0.0,
+        'history': {'epochs': [], 'loss': []},
+        'final_loss': None,
+        'metrics': None,
+        'error': None
+    } for index, config in enumerate(configs)]
+    models: Dict[int, bytes] = {}
+
+    memory = _share_dataset(dataset)
+    try:
+        context = multiprocessing.get_context('spawn')
+        with ProcessPoolExecutor(max_workers=min(workers, max(len(trials), 1)), mp_context=context,
+                                 initializer=_init_worker,
+                                 initargs=(memory.name, dataset.X.shape, dataset.y.shape,
+                                           dataset.X.dtype.str)) as executor:
+            alive = list(trials)
+            budget = min_epochs if min_epochs else max((t['config']['epochs'] for t in trials), default=0)
+            rung = 0
+
+            while alive:
+                futures = {}
+                for trial in alive:
+                    target = min(budget, trial['config']['epochs'])
+                    task = {
+                        'config': trial['config'],
+                        'seed': trial['seed'],
+                        'model': models.get(trial['trial_id']),
+                        'epochs': target - trial['epochs_trained']
+                    }
+                    futures[executor.submit(_run_trial, task)] = trial
+
+                for future in as_completed(futures):
+                    trial = futures[future]
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        trial.update(status='failed', error=f"{type(e).__name__}: {e}")
+                        log(f"❌ [{trial['trial_id']}] {trial['config']['name']}: {trial['error']}")
+                        continue
+                    _merge_result(trial, result)
+                    models[trial['trial_id']] = result['model']
+                    log(f"   [{trial['trial_id']}] {trial['config']['name']}: "
+                        f"эпох {trial['epochs_trained']}, ошибка {trial['final_loss']:.4f}, "
+                        f"{result['wall_time']:.1f} с")
+
+                alive = [t for t in alive if t['status'] != 'failed']
+                for trial in alive:
+                    if trial['epochs_trained'] >= trial['config']['epochs']:
+                        trial['status'] = 'completed'
+                        models.pop(trial['trial_id'], None)
+                alive = [t for t in alive if t['status'] != 'completed']
+
+                if alive and min_epochs:
+                    # Successive halving: продолжают только лучшие 1/eta испытаний
+                    alive.sort(key=lambda t: t['final_loss'])
+                    keep = max(1, len(alive) // eta)
+                    for trial in alive[keep:]:
+                        trial['status'] = 'pruned'
+                        models.pop(trial['trial_id'], None)
+                    log(f"✂️  Ступень {rung}: {keep} из {len(alive)} испытаний продолжают обучение")
+                    alive = alive[:keep]
+                    budget *= eta
+                rung += 1
+    finally:
+        memory.close()
+        memory.unlink()
+
+    finished = [t for t in trials if t['final_loss'] is not None]
+    best = min(finished, key=lambda t: (t['status'] != 'completed', t['final_loss']), default=None)
+    return {
+        'created_at': time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started)),
+        'dataset': {'source': dataset.source, 'digest': dataset.digest, 'examples': len(dataset)},
+        'workers': workers,
+        'halving': {'min_epochs': min_epochs, 'eta': eta} if min_epochs else None,
+        'total_wall_time': time.time() - started,
+        'trial_wall_time': sum(t['wall_time'] for t in trials),
+        'best_trial': best['trial_id'] if best else None,
+        'trials': trials
+    }
+
+
+def save_results(results: Dict[str, Any], path: str):
+    """Сохранение сводных результатов перебора в один JSON-файл"""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+def _share_dataset(dataset: Dataset) -> shared_memory.SharedMemory:
+    """Копирование X и y в один блок общей памяти"""
+    X = np.ascontiguousarray(dataset.X)
+    y = np.ascontiguousarray(dataset.y, dtype=X.dtype)
+    memory = shared_memory.SharedMemory(create=True, size=max(X.nbytes + y.nbytes, 1))
+    buffer = np.ndarray(X.size + y.size, dtype=X.dtype, buffer=memory.buf)
+    buffer[:X.size] = X.ravel()
+    buffer[X.size:] = y.ravel()
+    return memory
+
+
+def _init_worker(name: str, x_shape, y_shape, dtype: str):
+    """Подключение рабочего процесса к общей памяти с выборкой"""
+    global _worker_dataset, _worker_memory
+    # Блок удаляет родительский процесс (run_sweep); при spawn рабочие процессы
+    # используют его трекер ресурсов, поэтому повторная регистрация безвредна
+    _worker_memory = shared_memory.SharedMemory(name=name)
+    x_size = int(np.prod(x_shape))
+    buffer = np.ndarray(x_size + int(np.prod(y_shape)), dtype=np.dtype(dtype), buffer=_worker_memory.buf)
+    _worker_dataset = Dataset(buffer[:x_size].reshape(x_shape), buffer[x_size:].reshape(y_shape),
+                              source='shared_memory', digest='')
+
+
+def _run_trial(task: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Обучение испытания на task['epochs'] эпох (в рабочем процессе)
+
+    Модель передаётся между ступенями в сериализованном виде, поэтому
+    продолжение обучения может выполняться в любом процессе пула.
+    """
+    from .neural_network import SimpleNeuralNetwork
+
+    config = task['config']
+    dataset = _worker_dataset
+    start = time.perf_counter()
+
+    if task['model'] is None:
+        np.random.seed(task['seed'])
+        network = SimpleNeuralNetwork(
+            input_size=dataset.X.shape[1],
+            hidden_size=config['hidden_size'],
+            output_size=dataset.y.shape[1],
+            activation=config['activation'],
+            hidden_size2=config['hidden_size2'],
+            dropout_rate=config['dropout_rate'],
+            load_pretrained=False
+        )
+        network.learning_rate = config['learning_rate']
+    else:
+        network = pickle.loads(task['model'])
+
+    # Печать прогресса train() из нескольких процессов только мешает
+    with contextlib.redirect_stdout(io.StringIO()):
+        history = network.train(dataset, epochs=task['epochs'], batch_size=config['batch_size'])
+
+    predictions = network.predict_batch(dataset.X)
+    errors = dataset.y - predictions
+    mse = float(np.mean(np.square(errors)))
+    return {
+        'model': pickle.dumps(network),
+        'history': {'epochs': history['epochs'], 'loss': history['loss']},
+        'epochs': task['epochs'],
+        'metrics': {'mae': float(np.mean(np.abs(errors))), 'mse': mse, 'rmse': math.sqrt(mse)},
+        'wall_time': time.perf_counter() - start
+    }
+
+
+def _merge_result(trial: Dict[str, Any], result: Dict[str, Any]):
+    """Добавление результатов очередной ступени к испытанию"""
+    offset = trial['epochs_trained']
+    trial['history']['epochs'].extend(epoch + offset for epoch in result['history']['epochs'])
+    trial['history']['loss'].extend(result['history']['loss'])
+    trial['epochs_trained'] += result['epochs']
+    trial['wall_time'] += result['wall_time']
+    trial['final_loss'] = result['history']['loss'][-1]
+    trial['metrics'] = result['metrics']
+    trial['status'] = 'running'
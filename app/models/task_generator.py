@@ -5,7 +5,7 @@
 import random
 import json
 import os
-from typing import Dict, List, Any, Tuple
+from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass
 
 
@@ -21,6 +21,8 @@ class Task:
     expected_output: str
     hints: List[str]
     solution_template: str
+    template: str = ''  # Имя шаблона ('' - задание без шаблона)
+    test_suite_id: Optional[str] = None  # Синтезированный набор тестов (TestSynthesizer)
 
 
 class TaskGenerator:
@@ -44,7 +46,10 @@ class TaskGenerator:
         - data_processing: обработка данных (работа со строками, фильтрация)
         - functions: функциональное программирование (рекурсия, математические функции)
         
-        Каждый шаблон содержит название, описание, тестовые случаи и эталонное решение.
+        Каждый шаблон содержит название, описание, тестовые случаи, эталонное
+        решение и описание входа inputs для синтеза тестов (TestSynthesizer):
+        type - 'list' (список целых), 'str' (строка из слов) или 'int',
+        границы размера (min_size, max_size) или значения (min_value, max_value).
         
         Returns:
             Словарь с категориями и списками шаблонов заданий
@@ -60,7 +65,9 @@ class TaskGenerator:
                         {'input': '[5, 4, 3, 2, 1]', 'expected': '[1, 2, 3, 4, 5]'},
                         {'input': '[1]', 'expected': '[1]'}
                     ],
-                    'solution': 'def sort_list(numbers):\n    return sorted(numbers)'
+                    'solution': 'def sort_list(numbers):\n    return sorted(numbers)',
+                    'inputs': {'type': 'list', 'min_size': 0, 'max_size': 10000,
+                               'min_value': -1000, 'max_value': 1000}
                 },
                 {
                     'template': 'find_max',
@@ -71,7 +78,9 @@ class TaskGenerator:
                         {'input': '[-1, -5, -3]', 'expected': '-1'},
                         {'input': '[42]', 'expected': '42'}
                     ],
-                    'solution': 'def find_max(numbers):\n    return max(numbers)'
+                    'solution': 'def find_max(numbers):\n    return max(numbers)',
+                    'inputs': {'type': 'list', 'min_size': 1, 'max_size': 10000,
+                               'min_value': -10 ** 6, 'max_value': 10 ** 6}
                 }
             ],
             'data_processing': [
@@ -84,7 +93,8 @@ class TaskGenerator:
                         {'input': '"Python programming is fun"', 'expected': '4'},
                         {'input': '""', 'expected': '0'}
                     ],
-                    'solution': 'def count_words(text):\n    return len(text.split())'
+                    'solution': 'def count_words(text):\n    return len(text.split())',
+                    'inputs': {'type': 'str', 'min_size': 0, 'max_size': 10000}
                 },
                 {
                     'template': 'filter_even',
@@ -95,7 +105,9 @@ class TaskGenerator:
                         {'input': '[1, 3, 5]', 'expected': '[]'},
                         {'input': '[2, 4, 6]', 'expected': '[2, 4, 6]'}
                     ],
-                    'solution': 'def filter_even(numbers):\n    return [x for x in numbers if x % 2 == 0]'
+                    'solution': 'def filter_even(numbers):\n    return [x for x in numbers if x % 2 == 0]',
+                    'inputs': {'type': 'list', 'min_size': 0, 'max_size': 10000,
+                               'min_value': -1000, 'max_value': 1000}
                 }
             ],
             'functions': [
@@ -108,7 +120,9 @@ class TaskGenerator:
                         {'input': '0', 'expected': '0'},
                         {'input': '10', 'expected': '55'}
                     ],
-                    'solution': 'def fibonacci(n):\n    if n <= 1:\n        return n\n    return fibonacci(n-1) + fibonacci(n-2)'
+                    'solution': 'def fibonacci(n):\n    if n <= 1:\n        return n\n    return fibonacci(n-1) + fibonacci(n-2)',
+                    # Эталон - наивная рекурсия: большие n он не вычислит за отведённое время
+                    'inputs': {'type': 'int', 'min_value': 0, 'max_value': 24}
                 }
             ]
         }
@@ -145,11 +159,28 @@ class TaskGenerator:
             test_cases=template['test_cases'],
             expected_output='',  # Будет заполнено при проверке
             hints=self._generate_hints(template, difficulty),
-            solution_template=template['solution']
+            solution_template=template['solution'],
+            template=template['template']
         )
         
         return task
     
+    def get_template(self, name: str) -> Optional[Dict[str, Any]]:
+        """
+        Поиск шаблона по имени
+        
+        Args:
+            name: Имя шаблона (поле template)
+            
+        Returns:
+            Шаблон или None
+        """
+        for templates in self.task_templates.values():
+            for template in templates:
+                if template['template'] == name:
+                    return template
+        return None
+    
     def _generate_hints(self, template: Dict, difficulty: str) -> List[str]:
         """
         Генерация подсказок для задания в зависимости от сложности
@@ -231,7 +262,9 @@ class TaskGenerator:
             test_cases=custom_tests if custom_tests else template['test_cases'],
             expected_output='',
             hints=self._generate_hints(template, difficulty),
-            solution_template=template['solution']
+            solution_template=template['solution'],
+            # Синтезированные тесты относятся к заданию только с тестами шаблона
+            template='' if custom_tests else template['template']
         )
         
         return task
@@ -308,7 +341,9 @@ class TaskGenerator:
             'test_cases': task.test_cases,
             'expected_output': task.expected_output,
             'hints': task.hints,
-            'solution_template': task.solution_template
+            'solution_template': task.solution_template,
+            'template': task.template,
+            'test_suite_id': task.test_suite_id
         }
         
         with open(filepath, 'w', encoding='utf-8') as f:
@@ -328,5 +363,7 @@ class TaskGenerator:
             test_cases=task_data['test_cases'],
             expected_output=task_data['expected_output'],
             hints=task_data['hints'],
-            solution_template=task_data['solution_template']
+            solution_template=task_data['solution_template'],
+            template=task_data.get('template', ''),
+            test_suite_id=task_data.get('test_suite_id')
         )
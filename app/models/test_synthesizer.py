@@ -0,0 +1,312 @@
+"""
+Синтез наборов тестов по шаблонам заданий
+
+У шаблонов TaskGenerator по 3-4 коротких теста, написанных вручную, и
+каждое задание получает те же тесты: на них не видно ни граничных
+случаев, ни решений, которые не справляются с большими входами.
+TestSynthesizer строит для шаблона набор из многих тестов:
+
+1. Входы генерируются по описанию inputs шаблона (synthesize_inputs):
+   списки целых, строки из слов или числа - граничные размеры, случайные
+   размеры и несколько входов наибольшего размера. Генератор входов
+   детерминирован: одинаковые шаблон и seed дают одинаковые входы.
+2. Ожидаемый вывод вычисляется один раз: эталонное решение шаблона
+   выполняется на всех входах в песочнице (CodeChecker.run_reference).
+   Входы, на которых эталон завершился ошибкой, в набор не попадают;
+   если эталон не успел выполниться (таймаут, сбой песочницы), набор не
+   сохраняется и синтезируется при следующем запросе.
+3. Набор сохраняется в таблице test_suites под ID, определяемым
+   шаблоном, seed и параметрами синтеза (suite_id), а задание хранит
+   только ссылку на него (test_suite_id). Все задания одного шаблона и
+   seed используют один набор, поэтому новое задание не запускает синтез
+   заново.
+
+Последние загруженные наборы хранятся в памяти процесса.
+
+Пример:
+    suite_id = synthesizer.ensure_suite(task_generator.get_template('sort_list'))
+    test_cases = task['test_cases'] + synthesizer.load(suite_id)
+"""
+
+import hashlib
+import json
+import math
+import random
+import string
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .code_checker import CodeChecker
+
+
+# Версия алгоритма синтеза (входит в ID набора: изменение генератора даёт новые наборы)
+SYNTHESIS_VERSION = 1
+
+# Число входов наибольшего размера в наборе
+LARGE_CASES = 2
+
+# Формы списков: случайный, упорядоченный, обратный, из одинаковых элементов
+LIST_SHAPES = ('random', 'random', 'sorted', 'reversed', 'constant')
+
+# Разделители слов в строках (пробелы чаще остальных)
+WORD_SEPARATORS = (' ', ' ', ' ', ' ', '  ', '\t', '\n')
+MAX_WORD_LENGTH = 8
+
+# Строки без слов
+BLANK_STRINGS = ('', ' ', ' \t\n ')
+
+
+def synthesize_inputs(spec: Dict[str, Any], count: int, rng: random.Random) -> List[str]:
+    """
+    Входы набора тестов по описанию inputs шаблона
+
+    Args:
+        spec: Описание входа: type ('list', 'str', 'int') и границы
+            (min_size, max_size для списков и строк - длина в элементах или
+            словах; min_value, max_value для чисел и элементов списка)
+        count: Число входов (повторяющиеся входы отбрасываются)
+        rng: Генератор случайных чисел
+
+    Returns:
+        Литералы аргумента по возрастанию размера
+
+    Raises:
+        ValueError: Неизвестный тип входа
+    """
+    kind = spec['type']
+    if kind == 'int':
+        low, high = spec['min_value'], spec['max_value']
+        values = {low, high, min(low + 1, high)}
+        values.update(rng.randint(low, high) for _ in range(max(count - len(values), 0)))
+        return [repr(value) for value in sorted(values)][:count]
+
+    if kind == 'list':
+        make = _make_list
+    elif kind == 'str':
+        make = _make_text
+    else:
+        raise ValueError(f"Неизвестный тип входа: {kind}")
+
+    inputs = (repr(make(spec, size, rng)) for size in _sizes(spec, count, rng))
+    return list(dict.fromkeys(inputs))
+
+
+def _sizes(spec: Dict[str, Any], count: int, rng: random.Random) -> List[int]:
+    """Размеры входов: граничные, случайные (равномерно по логарифму) и наибольшие"""
+    low, high = spec['min_size'], spec['max_size']
+    edges = [size for size in range(low, low + 3) if size <= high][:count]
+    large = [high] * min(LARGE_CASES, count - len(edges))
+    random_count = count - len(edges) - len(large)
+    start = math.log(max(low + 3, 1))
+    sizes = [min(int(math.exp(rng.uniform(start, math.log(max(high, 1))))), high)
+             for _ in range(random_count)]
+    return edges + sorted(sizes) + large
+
+
+def _make_list(spec: Dict[str, Any], size: int, rng: random.Random) -> List[int]:
+    low, high = spec['min_value'], spec['max_value']
+    shape = rng.choice(LIST_SHAPES)
+    if shape == 'constant':
+        return [rng.randint(low, high)] * size
+    values = [rng.randint(low, high) for _ in range(size)]
+    if shape == 'sorted':
+        values.sort()
+    elif shape == 'reversed':
+        values.sort(reverse=True)
+    return values
+
+
+def _make_text(spec: Dict[str, Any], size: int, rng: random.Random) -> str:
+    if size == 0:
+        return rng.choice(BLANK_STRINGS)
+    words = [''.join(rng.choice(string.ascii_letters) for _ in range(rng.randint(1, MAX_WORD_LENGTH)))
+             for _ in range(size)]
+    parts = [rng.choice(('', ' ', '\n'))]
+    for word in words:
+        parts.append(word)
+        parts.append(rng.choice(WORD_SEPARATORS))
+    parts[-1] = rng.choice(('', ' ', '\n'))
+    return ''.join(parts)
+
+
+class TestSynthesizer:
+    """Наборы тестов по шаблонам заданий с ожидаемым выводом эталонного решения"""
+
+    # Модуль совпадает с шаблоном имён pytest (test_*.py): класс не тестовый
+    __test__ = False
+
+    def __init__(self, code_checker: CodeChecker, db_manager=None, cases_per_suite: int = 24,
+                 budget: float = 10.0, max_suites: int = 64):
+        """
+        Инициализация синтезатора
+
+        Args:
+            code_checker: Проверщик кода (песочница для эталонного решения)
+            db_manager: Хранилище наборов (DatabaseManager; None - только в памяти процесса)
+            cases_per_suite: Число входов в наборе (0 - новые наборы не синтезируются)
+            budget: Время на выполнение эталона на всех входах набора в секундах
+            max_suites: Сколько наборов хранить в памяти
+        """
+        if cases_per_suite < 0:
+            raise ValueError("cases_per_suite не может быть отрицательным")
+        if budget <= 0:
+            raise ValueError("budget должно быть положительным")
+        if max_suites < 1:
+            raise ValueError("max_suites должно быть не меньше 1")
+
+        self.code_checker = code_checker
+        self.db_manager = db_manager
+        self.cases_per_suite = cases_per_suite
+        self.budget = budget
+        self.max_suites = max_suites
+        self._suites: 'OrderedDict[str, List[Dict[str, Any]]]' = OrderedDict()
+        self._lock = threading.Lock()
+        # Синтез одного набора в нескольких потоках процесса выполняется один раз;
+        # наборы разных шаблонов синтезируются независимо. ID набора -> [блокировка,
+        # число потоков, которые её используют] (запись удаляется вместе с последним)
+        self._synthesis_locks: Dict[str, List[Any]] = {}
+        self.stats = {'hits': 0, 'loads': 0, 'misses': 0, 'synthesized': 0, 'failed': 0,
+                      'rejected_inputs': 0}
+
+    def suite_id(self, template: Dict[str, Any], seed: int = 0) -> str:
+        """
+        ID набора тестов шаблона
+
+        Args:
+            template: Шаблон задания (template, solution, inputs)
+            seed: Начальное значение генератора входов
+
+        Returns:
+            Строка вида '<шаблон>-<seed>-<хеш>'; хеш зависит от эталонного
+            решения, описания входов и параметров синтеза
+        """
+        payload = json.dumps([SYNTHESIS_VERSION, template['solution'], template['inputs'],
+                              seed, self.cases_per_suite], sort_keys=True)
+        digest = hashlib.sha256(payload.encode('utf-8')).hexdigest()[:12]
+        return f"{template['template']}-{seed}-{digest}"
+
+    def ensure_suite(self, template: Dict[str, Any], seed: int = 0) -> Optional[str]:
+        """
+        ID набора тестов шаблона (синтезируется, если его ещё нет)
+
+        Args:
+            template: Шаблон задания (template, solution, inputs)
+            seed: Начальное значение генератора входов
+
+        Returns:
+            ID набора или None, если у шаблона нет описания входов, синтез
+            отключён или эталон не выполнился
+        """
+        if not self.cases_per_suite or 'inputs' not in template:
+            return None
+
+        suite_id = self.suite_id(template, seed)
+        if self.load(suite_id) is not None:
+            return suite_id
+
+        lock = self._acquire_suite_lock(suite_id)
+        try:
+            with lock:
+                if self.load(suite_id) is not None:
+                    return suite_id
+                test_cases = self._synthesize(template, seed)
+                if test_cases is None:
+                    self._count('failed')
+                    return None
+                if self.db_manager is not None and not self.db_manager.save_test_suite(
+                        suite_id, template['template'], seed, test_cases):
+                    self._count('failed')
+                    return None
+                self._remember(suite_id, test_cases)
+                self._count('synthesized')
+        finally:
+            self._release_suite_lock(suite_id)
+
+        print(f"[TESTS] Синтезирован набор {suite_id}: {len(test_cases)} тестов")
+        return suite_id
+
+    def load(self, suite_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Тесты набора
+
+        Args:
+            suite_id: ID набора
+
+        Returns:
+            Список тестов (общий для всех вызовов, не изменяется) или None,
+            если набора нет
+        """
+        with self._lock:
+            test_cases = self._suites.get(suite_id)
+            if test_cases is not None:
+                self._suites.move_to_end(suite_id)
+                self.stats['hits'] += 1
+                return test_cases
+
+        test_cases = self.db_manager.get_test_suite(suite_id) if self.db_manager is not None else None
+        if test_cases is None:
+            self._count('misses')
+            return None
+        self._remember(suite_id, test_cases)
+        self._count('loads')
+        return test_cases
+
+    def _synthesize(self, template: Dict[str, Any], seed: int) -> Optional[List[Dict[str, Any]]]:
+        """Входы набора и ожидаемый вывод эталона (None - эталон не выполнился)"""
+        rng = random.Random(f"{template['template']}:{seed}")
+        inputs = synthesize_inputs(template['inputs'], self.cases_per_suite, rng)
+        try:
+            results = self.code_checker.run_reference(template['solution'], inputs, self.budget)
+        except ValueError as e:
+            print(f"⚠️ Набор тестов {template['template']} не синтезирован: {e}")
+            return None
+        if any(result.transient for result in results):
+            print(f"⚠️ Набор тестов {template['template']} не синтезирован: эталон не уложился во время")
+            return None
+
+        rejected = sum(1 for result in results if not result.passed)
+        if rejected:
+            with self._lock:
+                self.stats['rejected_inputs'] += rejected
+        return [{'input': result.test_case['input'], 'expected': result.actual_output}
+                for result in results if result.passed]
+
+    def _acquire_suite_lock(self, suite_id: str) -> threading.Lock:
+        """Блокировка синтеза набора suite_id (освобождается _release_suite_lock)"""
+        with self._lock:
+            entry = self._synthesis_locks.setdefault(suite_id, [threading.Lock(), 0])
+            entry[1] += 1
+            return entry[0]
+
+    def _release_suite_lock(self, suite_id: str):
+        with self._lock:
+            entry = self._synthesis_locks[suite_id]
+            entry[1] -= 1
+            if not entry[1]:
+                del self._synthesis_locks[suite_id]
+
+    def _remember(self, suite_id: str, test_cases: List[Dict[str, Any]]):
+        with self._lock:
+            self._suites[suite_id] = test_cases
+            self._suites.move_to_end(suite_id)
+            while len(self._suites) > self.max_suites:
+                self._suites.popitem(last=False)
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Статистика синтезатора
+
+        Returns:
+            Счётчики попаданий в память, загрузок из базы, синтезов и
+            отброшенных входов, число наборов в памяти
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['suites'] = len(self._suites)
+        stats['cases_per_suite'] = self.cases_per_suite
+        return stats
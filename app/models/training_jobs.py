@@ -0,0 +1,440 @@
+"""
+Фоновые задания обучения нейронной сети
+
+Обучение на 2000-5000 эпох не помещается в таймаут запроса gunicorn и
+занимает один из немногих рабочих процессов сервера. Поэтому каждое
+задание выполняется в отдельном процессе интерпретатора:
+
+    python -m app.models.training_jobs <каталог задания>
+
+Состояние задания хранится в файлах, поэтому его видят все рабочие
+процессы сервера (а не только тот, что принял запрос):
+
+    data/jobs/<job_id>/
+        job.json        - параметры, статус, итоговые метрики
+        progress.jsonl  - точки истории обучения {"epoch": ..., "loss": ...}
+        cancel          - флаг отмены (создаётся по запросу пользователя)
+        model.nnb       - обученная модель (после завершения, app/models/model_format.py)
+        history.json    - полная история обучения (после завершения)
+
+Статусы: queued -> running -> completed | failed | cancelled
+
+Задания с params['mode'] == 'retrain' дообучают активную модель на
+решениях из базы (app/models/retraining.py).
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import traceback
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
+
+from .dataset import TRAINING_DATA_PATH, Dataset, load_dataset
+
+
+# Каталог заданий по умолчанию
+JOBS_DIR = 'data/jobs'
+
+
+# Статусы, после которых задание больше не меняется
+FINISHED_STATUSES = ('completed', 'failed', 'cancelled')
+
+# Корень проекта: рабочий каталог процесса обучения
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def validate_training_params(data: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], str]:
+    """
+    Проверка и нормализация параметров обучения
+
+    Args:
+        data: Параметры из запроса
+
+    Returns:
+        Кортеж (параметры, текст ошибки); при ошибке параметры равны None
+    """
+    params = {
+        'hidden_size': data.get('hidden_size', 8),
+        'learning_rate': data.get('learning_rate', 0.05),
+        'epochs': data.get('epochs', 2000),
+        'activation': data.get('activation', 'sigmoid'),
+        'dropout_rate': data.get('dropout_rate', 0.0),
+        'batch_size': data.get('batch_size', 1),
+        'shuffle': bool(data.get('shuffle', False)),
+        'seed': data.get('seed')
+    }
+
+    if not (4 <= params['hidden_size'] <= 16):
+        return None, 'Размер скрытого слоя должен быть от 4 до 16'
+
+    if not isinstance(params['batch_size'], int) or params['batch_size'] < 0:
+        return None, 'Размер батча должен быть целым числом не меньше 0'
+
+    # Градиент мини-батча усредняется, поэтому для батчей допустим больший шаг
+    max_learning_rate = 0.1 if params['batch_size'] == 1 else 1.0
+    if not (0.001 <= params['learning_rate'] <= max_learning_rate):
+        return None, f'Learning rate должен быть от 0.001 до {max_learning_rate}'
+
+    if not (100 <= params['epochs'] <= 5000):
+        return None, 'Количество эпох должно быть от 100 до 5000'
+
+    return params, ""
+
+
+def load_training_examples(path: str = TRAINING_DATA_PATH) -> Dataset:
+    """
+    Загрузка обучающей выборки (нормализация как при инференсе, см. app.models.dataset)
+
+    Args:
+        path: Путь к training_data.json
+
+    Returns:
+        Dataset с матрицами X ∈ ℝᴺˣ¹⁰ и y ∈ ℝᴺˣ³
+    """
+    return load_dataset(path)
+
+
+def _write_json(path: str, data: Dict[str, Any]):
+    """Атомарная запись JSON (читатели не видят файл наполовину записанным)"""
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def _read_json(path: str) -> Optional[Dict[str, Any]]:
+    """Чтение JSON-файла (None, если файла нет)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def _pid_alive(pid: Optional[int]) -> bool:
+    """Процесс с указанным PID существует"""
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class TrainingJobManager:
+    """Запуск и отслеживание фоновых заданий обучения"""
+
+    def __init__(self, jobs_dir: str = JOBS_DIR, max_running: int = 1):
+        """
+        Инициализация менеджера заданий
+
+        Args:
+            jobs_dir: Каталог для файлов заданий
+            max_running: Максимальное число одновременно выполняемых заданий
+        """
+        self.jobs_dir = jobs_dir
+        self.max_running = max_running
+        # Процессы, запущенные этим рабочим процессом сервера (для сбора завершившихся)
+        self._processes: Dict[str, subprocess.Popen] = {}
+        self._lock = threading.Lock()
+        os.makedirs(self.jobs_dir, exist_ok=True)
+
+    def _job_dir(self, job_id: str) -> str:
+        """Каталог задания (ID проверяется, чтобы исключить выход за пределы jobs_dir)"""
+        if not job_id or not job_id.isalnum():
+            raise ValueError("Некорректный ID задания")
+        return os.path.join(self.jobs_dir, job_id)
+
+    def submit(self, params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Создание задания и запуск процесса обучения
+
+        Args:
+            params: Проверенные параметры (см. validate_training_params)
+
+        Returns:
+            Состояние созданного задания
+
+        Raises:
+            RuntimeError: Достигнут лимит одновременно выполняемых заданий
+        """
+        with self._lock:
+            running = [job for job in self.list_jobs() if job['status'] in ('queued', 'running')]
+            if len(running) >= self.max_running:
+                raise RuntimeError(
+                    f"Уже выполняется заданий обучения: {len(running)} (максимум {self.max_running})"
+                )
+
+            job_id = uuid.uuid4().hex[:12]
+            job_dir = self._job_dir(job_id)
+            os.makedirs(job_dir)
+
+            job = {
+                'id': job_id,
+                'status': 'queued',
+                'params': params,
+                'created_at': time.time(),
+                'started_at': None,
+                'finished_at': None,
+                'pid': None,
+                'error': None,
+                'result': None
+            }
+            _write_json(os.path.join(job_dir, 'job.json'), job)
+
+            # Вывод процесса (прогресс обучения, трассировки) - в train.log задания
+            with open(os.path.join(job_dir, 'train.log'), 'w', encoding='utf-8') as log:
+                process = subprocess.Popen(
+                    [sys.executable, '-m', 'app.models.training_jobs', os.path.abspath(job_dir)],
+                    cwd=PROJECT_ROOT,
+                    stdin=subprocess.DEVNULL,
+                    stdout=log,
+                    stderr=subprocess.STDOUT
+                )
+            self._processes[job_id] = process
+
+        return job
+
+    def get(self, job_id: str, since: int = 0) -> Optional[Dict[str, Any]]:
+        """
+        Состояние задания и точки прогресса
+
+        Args:
+            job_id: ID задания
+            since: Сколько точек прогресса клиент уже получил
+
+        Returns:
+            Состояние задания с полями progress (новые точки) и
+            progress_count (всего точек) или None, если задания нет
+        """
+        job_dir = self._job_dir(job_id)
+        job = _read_json(os.path.join(job_dir, 'job.json'))
+        if job is None:
+            return None
+
+        job = self._check_alive(job)
+        progress = self._read_progress(job_dir)
+        job['progress'] = progress[since:]
+        job['progress_count'] = len(progress)
+        job['cancel_requested'] = os.path.exists(os.path.join(job_dir, 'cancel'))
+        return job
+
+    def list_jobs(self) -> List[Dict[str, Any]]:
+        """
+        Список всех заданий (без точек прогресса), новые первыми
+
+        Returns:
+            Список состояний заданий
+        """
+        jobs = []
+        for job_id in os.listdir(self.jobs_dir):
+            if not os.path.isdir(os.path.join(self.jobs_dir, job_id)):
+                continue
+            job = _read_json(os.path.join(self.jobs_dir, job_id, 'job.json'))
+            if job is not None:
+                jobs.append(self._check_alive(job))
+        jobs.sort(key=lambda job: job['created_at'], reverse=True)
+        return jobs
+
+    def cancel(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Запрос отмены задания
+
+        Процесс обучения проверяет флаг каждые 10 эпох и завершается
+        со статусом cancelled.
+
+        Args:
+            job_id: ID задания
+
+        Returns:
+            Состояние задания или None, если задания нет
+        """
+        job_dir = self._job_dir(job_id)
+        if not os.path.exists(os.path.join(job_dir, 'job.json')):
+            return None
+        with open(os.path.join(job_dir, 'cancel'), 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
+        return self.get(job_id)
+
+    def model_path(self, job_id: str) -> Optional[str]:
+        """
+        Путь к модели завершённого задания
+
+        Args:
+            job_id: ID задания
+
+        Returns:
+            Путь к model.nnb (model.json для заданий прежних версий)
+            или None, если модели нет
+        """
+        for filename in ('model.nnb', 'model.json'):
+            path = os.path.join(self._job_dir(job_id), filename)
+            if os.path.exists(path):
+                return path
+        return None
+
+    def history_path(self, job_id: str) -> Optional[str]:
+        """Путь к history.json завершённого задания (или None)"""
+        path = os.path.join(self._job_dir(job_id), 'history.json')
+        return path if os.path.exists(path) else None
+
+    def latest_completed(self) -> Optional[Dict[str, Any]]:
+        """Последнее успешно завершённое задание (или None)"""
+        for job in self.list_jobs():
+            if job['status'] == 'completed':
+                return job
+        return None
+
+    def _read_progress(self, job_dir: str) -> List[Dict[str, Any]]:
+        """Чтение точек прогресса (неполная последняя строка пропускается)"""
+        progress = []
+        try:
+            with open(os.path.join(job_dir, 'progress.jsonl'), 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.endswith('\n'):
+                        progress.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        return progress
+
+    def _check_alive(self, job: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Обнаружение заданий, процесс которых завершился без итогового статуса
+
+        Returns:
+            Состояние задания (при аварии - со статусом failed)
+        """
+        if job['status'] in FINISHED_STATUSES:
+            return job
+
+        process = self._processes.get(job['id'])
+        if process is not None:
+            # Собственный дочерний процесс: poll() заодно убирает зомби
+            alive = process.poll() is None
+        elif job['status'] == 'queued':
+            # Процесс ещё не записал свой PID
+            alive = time.time() - job['created_at'] < 60
+        else:
+            alive = _pid_alive(job['pid'])
+
+        if alive:
+            return job
+
+        # Процесс мог записать итоговый статус между чтениями
+        job_path = os.path.join(self.jobs_dir, job['id'], 'job.json')
+        current = _read_json(job_path) or job
+        if current['status'] in FINISHED_STATUSES:
+            return current
+
+        current.update(status='failed', finished_at=time.time(),
+                       error=current.get('error') or 'Процесс обучения завершился аварийно')
+        _write_json(job_path, current)
+        return current
+
+
+def run_job(job_dir: str):
+    """
+    Выполнение задания обучения (в отдельном процессе)
+
+    Args:
+        job_dir: Каталог задания с job.json
+    """
+    from app.models.neural_network import SimpleNeuralNetwork
+
+    job_path = os.path.join(job_dir, 'job.json')
+    cancel_path = os.path.join(job_dir, 'cancel')
+    job = _read_json(job_path)
+    params = job['params']
+
+    job.update(status='running', started_at=time.time(), pid=os.getpid())
+    _write_json(job_path, job)
+
+    try:
+        retrain_info = None
+        if params.get('mode') == 'retrain':
+            from app.models.retraining import prepare_retraining
+            training_data, model, retrain_info = prepare_retraining(params)
+            if training_data is None:
+                # Недостаточно новых решений: модель не изменяется
+                job.update(status='completed', finished_at=time.time(), result=dict(retrain_info, skipped=True))
+                _write_json(job_path, job)
+                return
+        else:
+            training_data = load_training_examples()
+
+            # Обучение с нуля: архитектура из параметров задания, а не из сохранённой модели
+            model = SimpleNeuralNetwork(
+                input_size=10,
+                hidden_size=params['hidden_size'],
+                output_size=3,
+                activation=params['activation'],
+                dropout_rate=params['dropout_rate'],
+                load_pretrained=False
+            )
+        model.learning_rate = params['learning_rate']
+
+        with open(os.path.join(job_dir, 'progress.jsonl'), 'a', encoding='utf-8') as progress:
+            def on_progress(epoch: int, loss: float) -> bool:
+                progress.write(json.dumps({'epoch': epoch, 'loss': loss}) + '\n')
+                progress.flush()
+                return os.path.exists(cancel_path)
+
+            start_time = time.time()
+            if os.path.exists(cancel_path):
+                history = None
+            else:
+                history = model.train(training_data, epochs=params['epochs'],
+                                      batch_size=params['batch_size'], shuffle=params['shuffle'],
+                                      seed=params['seed'], callback=on_progress)
+            training_time = time.time() - start_time
+
+        if os.path.exists(cancel_path):
+            job.update(status='cancelled', finished_at=time.time())
+            _write_json(job_path, job)
+            return
+
+        initial_loss = history['loss'][0]
+        final_loss = history['loss'][-1]
+
+        metadata = {
+            'job_id': job['id'],
+            'final_loss': float(final_loss),
+            'epochs': history['epochs'][-1] + 1,
+            'training_time': float(training_time),
+            'examples': len(training_data)
+        }
+        result = {
+            'initial_loss': float(initial_loss),
+            'final_loss': float(final_loss),
+            'improvement': float((initial_loss - final_loss) / initial_loss * 100),
+            'training_time': float(training_time),
+            'examples': len(training_data)
+        }
+        if retrain_info is not None:
+            metadata.update(retrain_info)
+            result.update(retrain_info)
+
+        model_path = os.path.join(job_dir, 'model.nnb')
+        model.save_model(model_path, metadata=metadata)
+        _write_json(os.path.join(job_dir, 'history.json'), history)
+        if retrain_info is not None:
+            from app.models.retraining import complete_retraining
+            result.update(complete_retraining(params, retrain_info, model_path, job['id']))
+
+        job.update(status='completed', finished_at=time.time(), result=result)
+        _write_json(job_path, job)
+
+    except Exception:
+        job.update(status='failed', finished_at=time.time(), error=traceback.format_exc())
+        _write_json(job_path, job)
+
+
+if __name__ == '__main__':
+    run_job(sys.argv[1])
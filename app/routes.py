@@ -2,19 +2,100 @@
 Маршруты для веб-приложения системы заданий Python
 """
 
-from flask import Blueprint, render_template, request, jsonify, redirect, url_for, make_response
+from flask import Blueprint, render_template, request, jsonify, redirect, url_for, make_response, Response, stream_with_context, session
 import json
-from .models import TaskGenerator, CodeChecker, SimpleNeuralNetwork
-from .utils import DatabaseManager
+import os
+import uuid
+from datetime import datetime, timezone
+from .models import TaskGenerator, CodeChecker
+from .models.training_jobs import TrainingJobManager, validate_training_params, TRAINING_DATA_PATH, FINISHED_STATUSES
+from .models.model_format import (BINARY_MODEL_EXTENSION, ModelFormatError, convert_model, export_model,
+                                  read_model, read_model_info)
+from .models.model_registry import ModelRegistry, MODEL_EXTENSIONS
+from .models.model_server import ModelServer
+from .models.feature_cache import FeatureCache
+from .models.complexity_profiler import ComplexityProfiler, profile_features
+from .models.test_synthesizer import TestSynthesizer
+from .models.retraining import validate_retrain_params
+from .utils import DatabaseManager, ResultCache, GradingScheduler, GradingRejected
 
 # Создание Blueprint
 bp = Blueprint('main', __name__)
 
 # Инициализация компонентов
+# На одноядерной машине пул процессов для признаков не даёт выигрыша
+cpu_count = os.cpu_count() or 1
+sandbox_pool_size = int(os.environ.get('SANDBOX_POOL_SIZE', 2))
 task_generator = TaskGenerator()
-code_checker = CodeChecker()
-neural_network = SimpleNeuralNetwork()
-db_manager = DatabaseManager()
+# Общее время на тесты одного решения (0 - только ограничение каждого теста)
+submission_budget = float(os.environ.get('SUBMISSION_TIME_BUDGET', 6))
+code_checker = CodeChecker(
+    pool_size=sandbox_pool_size,
+    max_jobs_per_worker=int(os.environ.get('SANDBOX_MAX_JOBS', 50)),
+    memory_limit_mb=int(os.environ.get('SANDBOX_MEMORY_MB', 512)),
+    cpu_time_limit=int(os.environ.get('SANDBOX_CPU_SECONDS', 5)),
+    feature_workers=int(os.environ.get('FEATURE_WORKERS', min(cpu_count, 4) if cpu_count > 1 else 0)),
+    feature_cache=FeatureCache(max_entries=int(os.environ.get('FEATURE_CACHE_SIZE', 4096))),
+    submission_budget=submission_budget if submission_budget > 0 else None,
+    fail_fast=os.environ.get('CHECK_FAIL_FAST', '0') == '1'
+)
+db_manager = DatabaseManager(stats_ttl=float(os.environ.get('STATS_CACHE_TTL', 5)))
+result_cache = ResultCache(
+    max_entries=int(os.environ.get('RESULT_CACHE_SIZE', 1024)),
+    db_path=os.environ.get('RESULT_CACHE_DB') or None
+)
+
+# Очередь проверок: ограничивает одновременные запуски песочниц в рабочем процессе
+grading_scheduler = GradingScheduler(
+    max_concurrent=int(os.environ.get('GRADING_CONCURRENCY', sandbox_pool_size or cpu_count)),
+    max_queue=int(os.environ.get('GRADING_QUEUE_SIZE', 32)),
+    max_per_user=int(os.environ.get('GRADING_PER_USER', 2)),
+    max_wait=float(os.environ.get('GRADING_MAX_WAIT', 15))
+)
+
+# Профилирование сложности решений, прошедших тесты (0 - отключено)
+profile_budget = float(os.environ.get('PROFILE_BUDGET', 1))
+complexity_profiler = ComplexityProfiler(code_checker, budget=profile_budget) if profile_budget > 0 else None
+
+# Настройки проверки, от которых зависят сохранённые результаты (входят в ключ кэша)
+checker_fingerprint = code_checker.fingerprint(profile_budget=profile_budget)
+
+# Синтезированные наборы тестов шаблонов (0 тестов - новые наборы не создаются)
+test_synthesizer = TestSynthesizer(
+    code_checker, db_manager,
+    cases_per_suite=int(os.environ.get('TEST_SUITE_SIZE', 24)),
+    budget=float(os.environ.get('TEST_SUITE_BUDGET', 10))
+)
+
+training_jobs = TrainingJobManager(
+    jobs_dir=os.environ.get('TRAINING_JOBS_DIR', 'data/jobs'),
+    max_running=int(os.environ.get('TRAINING_MAX_JOBS', 1))
+)
+
+# Максимальное количество фрагментов кода в одном запросе /api/evaluate-batch
+EVALUATE_BATCH_LIMIT = 1000
+
+# Длина входа и вывода теста в ответе и в сохранённом решении (синтезированные
+# тесты содержат списки и строки до десятков тысяч символов)
+TEST_PREVIEW_LENGTH = 200
+
+# Размер страницы списка заданий по умолчанию (/tasks, /api/tasks)
+TASKS_PAGE_SIZE = 50
+
+# Каталог сохранённых моделей
+MODELS_DIR = 'data/models'
+
+# Модели, которые нельзя удалить (имя без расширения)
+PROTECTED_MODELS = ('neural_network', 'model_final')
+
+# Индекс сохранённых моделей и результатов экспериментов
+model_registry = ModelRegistry(
+    sources={'models': (MODELS_DIR, ''), 'experiments': ('experiments/results', 'model_exp')},
+    refresh_interval=float(os.environ.get('MODEL_REGISTRY_REFRESH', 2))
+)
+
+# Активная модель нейронной сети (общая для рабочих процессов, см. app/models/model_server.py)
+model_server = ModelServer(models_dir=MODELS_DIR)
 
 
 @bp.route('/')
@@ -56,6 +137,12 @@ def api_generate_task():
             # Генерация стандартного задания
             task = task_generator.generate_task(category, difficulty)
         
+        # Синтезированные тесты шаблона: набор общий для заданий шаблона и seed
+        template = task_generator.get_template(task.template) if task.template else None
+        if template is not None:
+            task.test_suite_id = test_synthesizer.ensure_suite(template, int(data.get('test_seed', 0)))
+        test_suite = test_synthesizer.load(task.test_suite_id) if task.test_suite_id else None
+        
         # Сохранение в базу данных
         task_data = {
             'id': task.id,
@@ -65,10 +152,13 @@ def api_generate_task():
             'category': task.category,
             'test_cases': task.test_cases,
             'hints': task.hints,
-            'solution_template': task.solution_template
+            'solution_template': task.solution_template,
+            'test_suite_id': task.test_suite_id
         }
         
         db_manager.save_task(task_data)
+        # Тесты задания могли измениться: сохранённые результаты проверки устарели
+        result_cache.invalidate_task(task.id)
         
         return jsonify({
             'success': True,
@@ -80,7 +170,9 @@ def api_generate_task():
                 'category': task.category,
                 'test_cases': task.test_cases,
                 'hints': task.hints,
-                'solution_template': task.solution_template
+                'solution_template': task.solution_template,
+                'test_suite_id': task.test_suite_id,
+                'test_suite_size': len(test_suite) if test_suite is not None else 0
             }
         })
         
@@ -107,9 +199,37 @@ def solve_task(task_id):
     return response
 
 
+def _client_key() -> str:
+    """
+    Ключ пользователя для очереди проверок
+    
+    Идентификатор клиента хранится в cookie сессии. Пока клиент не вернул
+    cookie (первый запрос или клиент без cookie), используется IP-адрес,
+    поэтому отказ от cookie не обходит лимит на пользователя.
+    """
+    client_id = session.get('client_id')
+    if client_id is None:
+        session['client_id'] = uuid.uuid4().hex
+        return f"addr:{request.remote_addr}"
+    return f"client:{client_id}"
+
+
+def _preview(text: str) -> str:
+    """Начало длинного входа или вывода теста (не длиннее TEST_PREVIEW_LENGTH)"""
+    if len(text) <= TEST_PREVIEW_LENGTH:
+        return text
+    return f"{text[:TEST_PREVIEW_LENGTH]}… ({len(text)} символов)"
+
+
 @bp.route('/api/check-solution', methods=['POST'])
 def api_check_solution():
-    """API для проверки решения"""
+    """
+    API для проверки решения
+    
+    Тесты выполняются через очередь проверок (GradingScheduler): если
+    очередь заполнена или у пользователя уже есть проверки в работе,
+    запрос отклоняется с кодом 429 и заголовком Retry-After.
+    """
     try:
         print("[CHECK] Получен запрос на проверку решения")
         print(f"[CHECK] Метод: {request.method}")
@@ -139,43 +259,121 @@ def api_check_solution():
                 'error': 'Задание не найдено'
             }), 404
         
-        # Проверка синтаксиса
-        syntax_valid, syntax_error = code_checker.check_syntax(student_code)
-        
-        if not syntax_valid:
-            return jsonify({
-                'success': True,
-                'syntax_valid': False,
-                'syntax_error': syntax_error,
-                'test_results': [],
-                'analysis': {},
-                'score': 0
-            })
-        
-        print("[TEST] Начинаем тестирование решения...")
-        
-        # Тестирование решения
-        test_results = code_checker.test_solution(student_code, task['test_cases'])
-        print(f"[TEST] Тестирование завершено: {len(test_results)} тестов")
-        
-        # Анализ кода
-        print("[ANALYZE] Анализируем код...")
-        analysis = code_checker.analyze_code(student_code)
-        print(f"[ANALYZE] Анализ завершен: {analysis.lines_of_code} строк, {analysis.functions_count} функций")
-        
-        # Извлечение признаков для нейронной сети
-        print("[NN] Извлекаем признаки для нейронной сети...")
-        features = code_checker.get_code_features(student_code)
-        print(f"[NN] Признаки извлечены: {len(features)} параметров")
-        
-        # Оценка качества кода нейронной сетью
-        print("[NN] Оцениваем качество кода...")
-        quality_scores = neural_network.evaluate_code_quality(features)
-        print(f"[NN] Оценка завершена: правильность={quality_scores['correctness']:.2f}")
+        # Версия модели фиксируется на весь запрос
+        served_model = model_server.current()
+        
+        # Тесты задания и синтезированный набор, на который оно ссылается
+        test_cases = task['test_cases']
+        if task.get('test_suite_id'):
+            test_suite = test_synthesizer.load(task['test_suite_id'])
+            if test_suite is None:
+                print(f"[WARN] Набор тестов {task['test_suite_id']} не найден, используются тесты задания")
+            else:
+                test_cases = test_cases + test_suite
+        
+        # Повторная отправка того же кода: результаты берутся из кэша
+        cache_key = result_cache.make_key(student_code or '', task_id, test_cases, checker_fingerprint)
+        cached = result_cache.get(cache_key)
+        
+        if cached is None:
+            # Разбор кода один раз для всех этапов проверки
+            submission = code_checker.parse(student_code)
+            
+            # Проверка синтаксиса
+            syntax_valid, syntax_error = code_checker.check_syntax(submission)
+            
+            if not syntax_valid:
+                return jsonify({
+                    'success': True,
+                    'syntax_valid': False,
+                    'syntax_error': syntax_error,
+                    'test_results': [],
+                    'analysis': {},
+                    'score': 0,
+                    'model_version': served_model.version
+                })
+            
+            print("[TEST] Начинаем тестирование решения...")
+            
+            # Тестирование решения (место в очереди проверок)
+            with grading_scheduler.slot(_client_key()):
+                test_results = code_checker.test_solution(submission, test_cases)
+                print(f"[TEST] Тестирование завершено: {len(test_results)} тестов")
+                
+                # Эмпирическая сложность (если функция выполнилась на всех тестах без ошибок)
+                profile = None
+                if complexity_profiler is not None and test_results and not any(result.error_message for result in test_results):
+                    profile = complexity_profiler.profile(submission, task['test_cases'], task.get('solution_template'))
+                    if profile is not None:
+                        print(f"[PROFILE] Рост {profile['growth']}, эталон {profile['reference_growth']}, "
+                              f"эффективность {profile['efficiency']:.2f}")
+            
+            # Анализ кода
+            print("[ANALYZE] Анализируем код...")
+            analysis = code_checker.analyze_code(submission)
+            print(f"[ANALYZE] Анализ завершен: {analysis.lines_of_code} строк, {analysis.functions_count} функций")
+            
+            # Извлечение признаков для нейронной сети
+            print("[NN] Извлекаем признаки для нейронной сети...")
+            features = dict(code_checker.get_code_features(submission), **profile_features(profile))
+            print(f"[NN] Признаки извлечены: {len(features)} параметров")
+            
+            # Подготовка результатов тестирования
+            test_results_data = []
+            for result in test_results:
+                test_results_data.append({
+                    'input': _preview(str(result.test_case.get('input', ''))),
+                    'expected': _preview(result.expected_output),
+                    'actual': _preview(result.actual_output),
+                    'passed': result.passed,
+                    'execution_time': result.execution_time,
+                    'cpu_time': result.cpu_time,
+                    'peak_memory': result.peak_memory,
+                    'error': result.error_message,
+                    'skipped': result.skipped,
+                    'skip_reason': result.skip_reason
+                })
+            
+            cached = {
+                'task_id': task_id,
+                'test_results': test_results_data,
+                'analysis': {
+                    'syntax_valid': analysis.syntax_valid,
+                    'complexity_score': analysis.complexity_score,
+                    'lines_of_code': analysis.lines_of_code,
+                    'functions_count': analysis.functions_count,
+                    'suggestions': analysis.suggestions,
+                    'complexity_profile': profile
+                },
+                'features': features,
+                'quality_scores': None,
+                'model_fingerprint': None
+            }
+            # Таймауты и сбои песочницы зависят от нагрузки - такие результаты не кэшируются
+            cacheable = not any(result.transient for result in test_results)
+            from_cache = False
+        else:
+            print("[CACHE] Результат проверки найден в кэше")
+            cacheable = True
+            from_cache = True
+        
+        # Оценка качества кода нейронной сетью (пересчитывается при смене модели)
+        model_fingerprint = served_model.fingerprint
+        if cached['model_fingerprint'] != model_fingerprint:
+            print("[NN] Оцениваем качество кода...")
+            cached['quality_scores'] = served_model.kernel.evaluate_code_quality(cached['features'])
+            cached['model_fingerprint'] = model_fingerprint
+            print(f"[NN] Оценка завершена: правильность={cached['quality_scores']['correctness']:.2f}")
+            if cacheable:
+                result_cache.put(cache_key, cached)
+        
+        test_results_data = cached['test_results']
+        quality_scores = cached['quality_scores']
+        analysis_data = dict(cached['analysis'], quality_scores=quality_scores)
         
         # Расчет итогового балла
-        passed_tests = sum(1 for result in test_results if result.passed)
-        test_score = (passed_tests / len(test_results)) * 100 if test_results else 0
+        passed_tests = sum(1 for result in test_results_data if result['passed'])
+        test_score = (passed_tests / len(test_results_data)) * 100 if test_results_data else 0
         
         # Усреднение оценок
         avg_quality = (quality_scores['correctness'] + 
@@ -184,33 +382,17 @@ def api_check_solution():
         
         final_score = (test_score * 0.7 + avg_quality * 0.3)
         
-        # Подготовка результатов тестирования
-        test_results_data = []
-        for result in test_results:
-            test_results_data.append({
-                'input': result.test_case.get('input', ''),
-                'expected': result.expected_output,
-                'actual': result.actual_output,
-                'passed': result.passed,
-                'execution_time': result.execution_time,
-                'error': result.error_message
-            })
-        
         # Сохранение решения в базу данных
         solution_data = {
             'task_id': task_id,
             'student_code': student_code,
             'test_results': test_results_data,
-            'analysis_results': {
-                'syntax_valid': analysis.syntax_valid,
-                'complexity_score': analysis.complexity_score,
-                'lines_of_code': analysis.lines_of_code,
-                'functions_count': analysis.functions_count,
-                'suggestions': analysis.suggestions,
-                'quality_scores': quality_scores
-            },
+            'analysis_results': analysis_data,
             'score': final_score,
-            'execution_time': sum(result.execution_time for result in test_results)
+            'execution_time': sum(result['execution_time'] for result in test_results_data),
+            'cpu_time': sum(result.get('cpu_time', 0.0) for result in test_results_data),
+            'peak_memory': max((result.get('peak_memory', 0) for result in test_results_data), default=0),
+            'features': cached['features']
         }
         
         db_manager.save_solution(solution_data)
@@ -219,15 +401,81 @@ def api_check_solution():
             'success': True,
             'syntax_valid': True,
             'test_results': test_results_data,
-            'analysis': {
-                'syntax_valid': analysis.syntax_valid,
-                'complexity_score': analysis.complexity_score,
-                'lines_of_code': analysis.lines_of_code,
-                'functions_count': analysis.functions_count,
-                'suggestions': analysis.suggestions,
-                'quality_scores': quality_scores
-            },
-            'score': round(final_score, 2)
+            'analysis': analysis_data,
+            'score': round(final_score, 2),
+            'cached': from_cache,
+            'model_version': served_model.version
+        })
+        
+    except GradingRejected as e:
+        print(f"[QUEUE] Проверка отклонена ({e.reason}), повтор через {e.retry_after} с")
+        response = jsonify({
+            'success': False,
+            'error': f"{e}. Повторите через {e.retry_after} с.",
+            'reason': e.reason,
+            'retry_after': e.retry_after
+        })
+        response.headers['Retry-After'] = str(e.retry_after)
+        return response, 429
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+@bp.route('/api/evaluate-batch', methods=['POST'])
+def api_evaluate_batch():
+    """
+    API для пакетной оценки качества кода нейронной сетью
+    
+    Код не выполняется: признаки извлекаются статическим анализом
+    (параллельно в пуле процессов), затем все фрагменты оцениваются
+    одним прямым проходом сети.
+    
+    ПАРАМЕТРЫ (JSON):
+        codes: list[str] - фрагменты кода (не более EVALUATE_BATCH_LIMIT)
+    
+    ВОЗВРАЩАЕТ:
+        success: bool
+        count: int - количество оценённых фрагментов
+        results: list - для каждого фрагмента syntax_valid, features, quality_scores
+    """
+    try:
+        data = request.get_json(silent=True) or {}
+        codes = data.get('codes')
+        
+        if not isinstance(codes, list) or not all(isinstance(code, str) for code in codes):
+            return jsonify({
+                'success': False,
+                'error': 'Поле codes должно быть списком строк'
+            }), 400
+        
+        if len(codes) > EVALUATE_BATCH_LIMIT:
+            return jsonify({
+                'success': False,
+                'error': f'Слишком много фрагментов кода (максимум {EVALUATE_BATCH_LIMIT})'
+            }), 400
+        
+        served_model = model_server.current()
+        extracted = code_checker.get_code_features_batch(codes)
+        quality_scores = served_model.network.evaluate_code_quality_batch(
+            [features for _, features in extracted]
+        )
+        
+        results = []
+        for (syntax_valid, features), scores in zip(extracted, quality_scores):
+            results.append({
+                'syntax_valid': syntax_valid,
+                'features': features,
+                'quality_scores': scores
+            })
+        
+        return jsonify({
+            'success': True,
+            'count': len(results),
+            'results': results,
+            'model_version': served_model.version
         })
         
     except Exception as e:
@@ -243,30 +491,138 @@ def list_tasks():
     category = request.args.get('category')
     difficulty = request.args.get('difficulty')
     
-    tasks = db_manager.get_all_tasks(category, difficulty)
+    cursor = request.args.get('cursor')
+    
+    try:
+        page = db_manager.get_tasks_page(category, difficulty, limit=TASKS_PAGE_SIZE, cursor=cursor)
+    except ValueError:
+        page = db_manager.get_tasks_page(category, difficulty, limit=TASKS_PAGE_SIZE)
     categories = task_generator.get_available_categories()
     difficulties = task_generator.get_difficulty_levels()
     
     return render_template('tasks.html', 
-                         tasks=tasks, 
+                         tasks=page['tasks'], 
+                         next_cursor=page['next_cursor'],
                          categories=categories, 
                          difficulties=difficulties,
                          selected_category=category,
                          selected_difficulty=difficulty)
 
 
+def _tasks_last_modified(tasks):
+    """Время последнего изменения среди заданий (для заголовка Last-Modified)"""
+    stamps = [task.get('updated_at') or task.get('created_at') for task in tasks]
+    stamps = [stamp for stamp in stamps if stamp]
+    if not stamps:
+        return None
+    try:
+        # CURRENT_TIMESTAMP в SQLite - время UTC в формате 'YYYY-MM-DD HH:MM:SS'
+        return datetime.strptime(max(stamps)[:19], '%Y-%m-%d %H:%M:%S').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _conditional_json(payload, tasks):
+    """
+    JSON-ответ с валидаторами ETag и Last-Modified
+    
+    Браузер хранит ответ, но перепроверяет его при каждом запросе
+    (Cache-Control: no-cache); при совпадении If-None-Match или
+    If-Modified-Since возвращается пустой ответ 304.
+    """
+    response = jsonify(payload)
+    last_modified = _tasks_last_modified(tasks)
+    if last_modified:
+        response.last_modified = last_modified
+    response.add_etag()
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+
 @bp.route('/api/tasks')
 def api_get_tasks():
-    """API для получения списка заданий"""
+    """
+    API для получения заданий
+    
+    Query-параметры:
+        ids: ID заданий через запятую (id - то же для одного задания);
+            при указании остальные фильтры не используются
+        category, difficulty: фильтры списка
+        limit: размер страницы (по умолчанию TASKS_PAGE_SIZE)
+        cursor: next_cursor предыдущей страницы
+        fields: full (по умолчанию) или summary - без тестов и шаблона
+    """
     category = request.args.get('category')
     difficulty = request.args.get('difficulty')
     
-    tasks = db_manager.get_all_tasks(category, difficulty)
+    fields = request.args.get('fields', 'full')
+    cursor = request.args.get('cursor')
+    ids = request.args.get('ids') or request.args.get('id')
     
-    return jsonify({
+    if ids:
+        task_ids = [task_id.strip() for task_id in ids.split(',') if task_id.strip()]
+        try:
+            tasks = db_manager.get_tasks_by_ids(task_ids, fields=fields)
+        except ValueError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
+        
+        found = {task['id'] for task in tasks}
+        return _conditional_json({
+            'success': True,
+            'tasks': tasks,
+            'missing': [task_id for task_id in dict.fromkeys(task_ids) if task_id not in found]
+        }, tasks)
+    
+    try:
+        limit = int(request.args.get('limit', TASKS_PAGE_SIZE))
+        if limit < 1:
+            raise ValueError
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'error': 'Параметр limit должен быть положительным целым числом'
+        }), 400
+    
+    try:
+        page = db_manager.get_tasks_page(category, difficulty, limit=limit,
+                                         cursor=cursor, fields=fields)
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    return _conditional_json({
         'success': True,
-        'tasks': tasks
-    })
+        'tasks': page['tasks'],
+        'next_cursor': page['next_cursor']
+    }, page['tasks'])
+
+
+@bp.route('/api/tasks/<task_id>')
+def api_get_task(task_id):
+    """API для получения одного задания (fields=full|summary)"""
+    try:
+        tasks = db_manager.get_tasks_by_ids([task_id], fields=request.args.get('fields', 'full'))
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    
+    if not tasks:
+        return jsonify({
+            'success': False,
+            'error': 'Задание не найдено'
+        }), 404
+    
+    return _conditional_json({
+        'success': True,
+        'task': tasks[0]
+    }, tasks)
 
 
 @bp.route('/api/statistics')
@@ -282,15 +638,60 @@ def api_get_statistics():
 
 @bp.route('/train-neural-network', methods=['POST'])
 def train_neural_network():
-    """Обучение нейронной сети"""
+    """
+    Дообучение нейронной сети на сохранённых решениях
+    
+    Новые решения из базы добавляются в хранилище примеров, активная
+    модель дообучается от текущих весов в фоновом задании (см.
+    app/models/retraining.py). Запрос сразу возвращает ID задания, как
+    /api/train-model; модель задания сохраняется через /api/save-model.
+    
+    ПАРАМЕТРЫ (JSON, все необязательные):
+        epochs: int - эпох дообучения (1-500, по умолчанию 50)
+        learning_rate: float - скорость обучения (0.001-1.0, по умолчанию 0.05)
+        batch_size: int - размер мини-батча (по умолчанию 32)
+        replay_ratio: float - прежних примеров на один новый (0-20, по умолчанию 4)
+        min_new_examples: int - минимум новых примеров для дообучения (по умолчанию 1)
+        activate: bool - сделать дообученную модель активной
+        seed: int - зерно выборки и перемешивания
+    
+    ВОЗВРАЩАЕТ (202):
+        success: bool
+        job_id: str - ID задания обучения
+        job: dict - состояние задания
+        status_url: str - адрес для опроса состояния
+        events_url: str - адрес потока событий (Server-Sent Events)
+    """
     try:
-        # Здесь можно добавить логику для обучения нейронной сети
-        # на основе сохраненных решений
+        data = request.get_json(silent=True) or {}
+        
+        params, error = validate_retrain_params(data)
+        if params is None:
+            return jsonify({
+                'success': False,
+                'error': error
+            }), 400
+        
+        params['db_path'] = os.path.abspath(db_manager.db_path)
+        params['models_dir'] = os.path.abspath(MODELS_DIR)
+        
+        try:
+            job = training_jobs.submit(params)
+        except RuntimeError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 429
+        
+        print(f"🔁 Задание дообучения {job['id']} запущено (эпох: {params['epochs']})")
         
         return jsonify({
             'success': True,
-            'message': 'Нейронная сеть успешно обучена'
-        })
+            'job_id': job['id'],
+            'job': job,
+            'status_url': url_for('main.api_train_job_status', job_id=job['id']),
+            'events_url': url_for('main.api_train_job_events', job_id=job['id'])
+        }), 202
         
     except Exception as e:
         return jsonify({
@@ -308,7 +709,11 @@ def train_model_page():
 @bp.route('/api/train-model', methods=['POST'])
 def api_train_model():
     """
-    API для обучения нейронной сети
+    API для запуска обучения нейронной сети
+    
+    Обучение выполняется в отдельном процессе (см. app/models/training_jobs.py),
+    запрос сразу возвращает ID задания. Прогресс доступен через
+    GET /api/train-jobs/<job_id> (опрос) или /api/train-jobs/<job_id>/events (SSE).
     
     ПАРАМЕТРЫ (JSON):
         hidden_size: int - размер скрытого слоя (4-16)
@@ -316,144 +721,52 @@ def api_train_model():
         epochs: int - количество эпох (100-5000)
         activation: str - функция активации ('sigmoid' или 'relu')
         dropout_rate: float - вероятность dropout (0.0-0.5)
+        batch_size: int - размер мини-батча (1 - онлайн обучение, 0 - полный батч)
+        shuffle: bool - перемешивать примеры перед каждой эпохой
+        seed: int - зерно перемешивания (необязательно)
     
-    ВОЗВРАЩАЕТ:
+    ВОЗВРАЩАЕТ (202):
         success: bool
-        final_loss: float - финальная ошибка
-        improvement: float - улучшение в процентах
-        history: dict - история обучения (epochs, loss)
+        job_id: str - ID задания обучения
+        job: dict - состояние задания
+        status_url: str - адрес для опроса состояния
+        events_url: str - адрес потока событий (Server-Sent Events)
     """
     try:
-        import json
-        import os
-        import time
-        
-        data = request.get_json()
-        
-        # Получение параметров
-        hidden_size = data.get('hidden_size', 8)
-        learning_rate = data.get('learning_rate', 0.05)
-        epochs = data.get('epochs', 2000)
-        activation = data.get('activation', 'sigmoid')
-        dropout_rate = data.get('dropout_rate', 0.0)
-        
-        # Валидация параметров
-        if not (4 <= hidden_size <= 16):
-            return jsonify({
-                'success': False,
-                'error': 'Размер скрытого слоя должен быть от 4 до 16'
-            }), 400
+        data = request.get_json(silent=True) or {}
         
-        if not (0.001 <= learning_rate <= 0.1):
+        params, error = validate_training_params(data)
+        if params is None:
             return jsonify({
                 'success': False,
-                'error': 'Learning rate должен быть от 0.001 до 0.1'
+                'error': error
             }), 400
         
-        if not (100 <= epochs <= 5000):
-            return jsonify({
-                'success': False,
-                'error': 'Количество эпох должно быть от 100 до 5000'
-            }), 400
-        
-        # Загрузка обучающих данных
-        training_data_path = 'data/training_data/training_data.json'
-        
-        if not os.path.exists(training_data_path):
+        if not os.path.exists(TRAINING_DATA_PATH):
             return jsonify({
                 'success': False,
                 'error': 'Обучающие данные не найдены'
             }), 404
         
-        with open(training_data_path, 'r', encoding='utf-8') as f:
-            training_data_raw = json.load(f)
-        
-        # Подготовка данных для обучения
-        import numpy as np
-        training_data = []
-        
-        for example in training_data_raw:
-            # Извлекаем признаки
-            features = example['features']
-            feature_vector = np.array([
-                features['lines_of_code'],
-                features['functions_count'],
-                features['complexity'],
-                features['nested_levels'],
-                features['variable_names_length'],
-                features['comments_ratio'],
-                features['imports_count'],
-                features['class_count'],
-                features['error_handling'],
-                features['test_coverage']
-            ]).reshape(1, -1)
-            
-            # Целевые значения
-            target = np.array(example['target']).reshape(1, -1)
-            
-            training_data.append((feature_vector, target))
-        
-        # Создание и обучение модели
-        from app.models.neural_network import SimpleNeuralNetwork
-        
-        model = SimpleNeuralNetwork(
-            input_size=10,
-            hidden_size=hidden_size,
-            output_size=3,
-            activation=activation,
-            dropout_rate=dropout_rate
-        )
-        
-        model.learning_rate = learning_rate
-        
-        print(f"🎓 Начало обучения модели...")
-        print(f"   Архитектура: 10 → {hidden_size} → 3")
-        print(f"   Learning rate: {learning_rate}")
-        print(f"   Epochs: {epochs}")
-        print(f"   Activation: {activation}")
-        print(f"   Примеров: {len(training_data)}")
-        
-        start_time = time.time()
-        
-        # Обучение
-        history = model.train(training_data, epochs=epochs)
-        
-        training_time = time.time() - start_time
-        
-        # Результаты
-        initial_loss = history['loss'][0]
-        final_loss = history['loss'][-1]
-        improvement = ((initial_loss - final_loss) / initial_loss) * 100
-        
-        print(f"[TRAIN] Обучение завершено за {training_time:.2f} сек")
-        print(f"   Начальная ошибка: {initial_loss:.6f}")
-        print(f"   Финальная ошибка: {final_loss:.6f}")
-        print(f"   Улучшение: {improvement:.2f}%")
+        try:
+            job = training_jobs.submit(params)
+        except RuntimeError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 429
         
-        # Сохранение обученной модели во временную переменную
-        # (будет сохранена при нажатии кнопки "Сохранить")
-        global trained_model, trained_history
-        trained_model = model
-        trained_history = history
+        print(f"🎓 Задание обучения {job['id']} запущено")
+        print(f"   Архитектура: 10 → {params['hidden_size']} → 3")
+        print(f"   Learning rate: {params['learning_rate']}, эпох: {params['epochs']}")
         
         return jsonify({
             'success': True,
-            'final_loss': float(final_loss),
-            'initial_loss': float(initial_loss),
-            'improvement': float(improvement),
-            'training_time': float(training_time),
-            'history': {
-                'epochs': history['epochs'],
-                'loss': [float(l) for l in history['loss']]
-            },
-            'parameters': {
-                'hidden_size': hidden_size,
-                'learning_rate': learning_rate,
-                'epochs': epochs,
-                'activation': activation,
-                'dropout_rate': dropout_rate
-            }
-        })
+            'job_id': job['id'],
+            'job': job,
+            'status_url': url_for('main.api_train_job_status', job_id=job['id']),
+            'events_url': url_for('main.api_train_job_events', job_id=job['id'])
+        }), 202
         
     except Exception as e:
         import traceback
@@ -464,43 +777,161 @@ def api_train_model():
         }), 500
 
 
+@bp.route('/api/train-jobs', methods=['GET'])
+def api_train_jobs():
+    """
+    API для получения списка заданий обучения (новые первыми)
+    
+    ВОЗВРАЩАЕТ:
+        success: bool
+        jobs: list - состояния заданий
+    """
+    return jsonify({
+        'success': True,
+        'jobs': training_jobs.list_jobs()
+    })
+
+
+@bp.route('/api/train-jobs/<job_id>', methods=['GET'])
+def api_train_job_status(job_id):
+    """
+    API для опроса состояния задания обучения
+    
+    ПАРАМЕТРЫ (query):
+        since: int - сколько точек прогресса клиент уже получил (по умолчанию 0)
+    
+    ВОЗВРАЩАЕТ:
+        success: bool
+        job: dict - статус, параметры, результат и новые точки progress [{epoch, loss}]
+    """
+    try:
+        job = training_jobs.get(job_id, since=request.args.get('since', 0, type=int))
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if job is None:
+        return jsonify({'success': False, 'error': 'Задание не найдено'}), 404
+    
+    return jsonify({'success': True, 'job': job})
+
+
+@bp.route('/api/train-jobs/<job_id>/events', methods=['GET'])
+def api_train_job_events(job_id):
+    """
+    Поток прогресса задания обучения (Server-Sent Events)
+    
+    События:
+        progress - точка истории обучения {epoch, loss}
+        status - изменение статуса задания
+        done - задание завершено (данные - итоговое состояние), поток закрывается
+    """
+    try:
+        job = training_jobs.get(job_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if job is None:
+        return jsonify({'success': False, 'error': 'Задание не найдено'}), 404
+    
+    def generate():
+        import time
+        
+        sent = 0
+        status = None
+        while True:
+            job = training_jobs.get(job_id, since=sent)
+            for point in job['progress']:
+                yield f"event: progress\ndata: {json.dumps(point)}\n\n"
+            sent = job['progress_count']
+            
+            if job['status'] != status:
+                status = job['status']
+                yield f"event: status\ndata: {json.dumps({'status': status})}\n\n"
+            
+            if status in FINISHED_STATUSES:
+                job.pop('progress')
+                yield f"event: done\ndata: {json.dumps(job, ensure_ascii=False)}\n\n"
+                return
+            
+            time.sleep(0.5)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@bp.route('/api/train-jobs/<job_id>/cancel', methods=['POST'])
+def api_train_job_cancel(job_id):
+    """
+    API для отмены задания обучения
+    
+    ВОЗВРАЩАЕТ:
+        success: bool
+        job: dict - состояние задания (cancel_requested = true)
+    """
+    try:
+        job = training_jobs.cancel(job_id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    if job is None:
+        return jsonify({'success': False, 'error': 'Задание не найдено'}), 404
+    
+    return jsonify({'success': True, 'job': job})
+
+
 @bp.route('/api/save-model', methods=['POST'])
 def api_save_model():
     """
     API для сохранения обученной модели
     
-    Сохраняет последнюю обученную модель в data/models/neural_network.json
+    Копирует модель завершённого задания обучения в data/models/neural_network.nnb
+    
+    ПАРАМЕТРЫ (JSON, необязательно):
+        job_id: str - ID задания (по умолчанию последнее успешно завершённое)
     """
     try:
-        import os
+        import shutil
+        
+        data = request.get_json(silent=True) or {}
+        job_id = data.get('job_id')
         
-        global trained_model, trained_history
+        if not job_id:
+            latest = training_jobs.latest_completed()
+            job_id = latest['id'] if latest else None
+        
+        try:
+            source_model = training_jobs.model_path(job_id) if job_id else None
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
         
-        if trained_model is None:
+        if source_model is None:
             return jsonify({
                 'success': False,
                 'error': 'Нет обученной модели для сохранения'
             }), 400
         
         # Создание директории если не существует
-        model_dir = 'data/models'
+        model_dir = MODELS_DIR
         os.makedirs(model_dir, exist_ok=True)
         
-        # Сохранение модели
-        model_path = os.path.join(model_dir, 'neural_network.json')
-        trained_model.save_model(model_path)
+        # Сохранение модели (задания прежних версий хранят модель в JSON)
+        model_path = os.path.join(model_dir, 'neural_network' + BINARY_MODEL_EXTENSION)
+        convert_model(source_model, model_path, metadata={'job_id': job_id})
         
         # Сохранение истории обучения
         history_path = os.path.join(model_dir, 'training_history.json')
-        with open(history_path, 'w', encoding='utf-8') as f:
-            json.dump(trained_history, f, ensure_ascii=False, indent=2)
+        shutil.copyfile(training_jobs.history_path(job_id), history_path)
+        model_registry.invalidate()
         
-        print(f"[SAVE] Модель сохранена: {model_path}")
+        print(f"[SAVE] Модель задания {job_id} сохранена: {model_path}")
         print(f"[SAVE] История сохранена: {history_path}")
         
         return jsonify({
             'success': True,
             'message': 'Модель успешно сохранена',
+            'job_id': job_id,
             'model_path': model_path,
             'history_path': history_path
         })
@@ -514,6 +945,14 @@ def api_save_model():
         }), 500
 
 
+def _model_parameters(record):
+    """Параметры архитектуры записи реестра для ответов API (None - файл не модель)"""
+    if record.architecture is None:
+        return None
+    return {key: record.architecture[key] for key in
+            ('input_size', 'hidden_size', 'output_size', 'learning_rate', 'activation', 'dropout_rate')}
+
+
 @bp.route('/api/list-models', methods=['GET'])
 def api_list_models():
     """
@@ -526,63 +965,33 @@ def api_list_models():
             - path: str - полный путь
             - size: int - размер файла в байтах
             - modified: str - дата последнего изменения
+            - format: str - 'nnb' или 'json'
             - parameters: dict - параметры модели (если доступны)
+            - metadata: dict - метаданные модели (.nnb)
+            - created_at: str - время создания модели
+            - checksum: str - SHA-256 файла
+            - final_loss: float - итоговая ошибка обучения (если известна)
+    
+    Данные берутся из реестра моделей (app/models/model_registry.py),
+    файлы заново читаются только после изменения.
     """
     try:
-        import os
         from datetime import datetime
         
-        model_dir = 'data/models'
-        
-        if not os.path.exists(model_dir):
-            return jsonify({
-                'success': True,
-                'models': []
-            })
-        
         models = []
-        
-        # Перебираем все JSON файлы в директории моделей
-        for filename in os.listdir(model_dir):
-            if filename.endswith('.json') and not filename.startswith('training_history'):
-                filepath = os.path.join(model_dir, filename)
-                
-                try:
-                    # Получаем информацию о файле
-                    file_stat = os.stat(filepath)
-                    file_size = file_stat.st_size
-                    modified_time = datetime.fromtimestamp(file_stat.st_mtime).strftime('%Y-%m-%d %H:%M:%S')
-                    
-                    # Пытаемся прочитать параметры модели
-                    model_info = {
-                        'name': filename,
-                        'path': filepath,
-                        'size': file_size,
-                        'modified': modified_time
-                    }
-                    
-                    try:
-                        with open(filepath, 'r', encoding='utf-8') as f:
-                            model_data = json.load(f)
-                            model_info['parameters'] = {
-                                'input_size': model_data.get('input_size', 10),
-                                'hidden_size': model_data.get('hidden_size', 8),
-                                'output_size': model_data.get('output_size', 3),
-                                'learning_rate': model_data.get('learning_rate', 0.01),
-                                'activation': model_data.get('activation', 'sigmoid'),
-                                'dropout_rate': model_data.get('dropout_rate', 0.0)
-                            }
-                    except:
-                        model_info['parameters'] = None
-                    
-                    models.append(model_info)
-                    
-                except Exception as e:
-                    print(f"Ошибка чтения модели {filename}: {e}")
-                    continue
-        
-        # Сортируем по дате изменения (новые первые)
-        models.sort(key=lambda x: x['modified'], reverse=True)
+        for record in model_registry.list('models'):
+            models.append({
+                'name': record.name,
+                'path': record.path,
+                'size': record.size,
+                'modified': datetime.fromtimestamp(record.mtime).strftime('%Y-%m-%d %H:%M:%S'),
+                'format': record.format,
+                'parameters': _model_parameters(record),
+                'metadata': record.metadata,
+                'created_at': record.created_at,
+                'checksum': record.checksum,
+                'final_loss': record.final_loss
+            })
         
         return jsonify({
             'success': True,
@@ -611,6 +1020,10 @@ def api_load_model():
         success: bool
         message: str
         parameters: dict - параметры загруженной модели
+        model: dict - активная версия модели (version, name, checksum, activated_at)
+    
+    Модель активируется во всех рабочих процессах (app/models/model_server.py):
+    каждый из них переключается на новую версию при следующем запросе.
     """
     try:
         data = request.get_json()
@@ -622,47 +1035,37 @@ def api_load_model():
                 'error': 'Не указано имя модели'
             }), 400
         
-        model_path = os.path.join('data/models', model_name)
+        record = model_registry.get(model_name)
         
-        if not os.path.exists(model_path):
+        if record is None:
             return jsonify({
                 'success': False,
                 'error': 'Модель не найдена'
             }), 404
         
-        # Загружаем модель
-        from app.models.neural_network import SimpleNeuralNetwork
-        
-        # Читаем параметры модели
-        with open(model_path, 'r', encoding='utf-8') as f:
-            model_data = json.load(f)
-        
-        # Создаем новую модель с теми же параметрами
-        global neural_network
-        neural_network = SimpleNeuralNetwork(
-            input_size=model_data.get('input_size', 10),
-            hidden_size=model_data.get('hidden_size', 8),
-            output_size=model_data.get('output_size', 3),
-            activation=model_data.get('activation', 'sigmoid'),
-            dropout_rate=model_data.get('dropout_rate', 0.0)
-        )
-        
-        # Загружаем веса
-        neural_network.load_model(model_path)
+        try:
+            served_model = model_server.activate(record.path, name=record.name)
+        except ModelFormatError as e:
+            return jsonify({
+                'success': False,
+                'error': str(e)
+            }), 400
         
-        print(f"[LOAD] Модель загружена: {model_name}")
+        network = served_model.network
+        print(f"[LOAD] Модель загружена: {model_name} (версия {served_model.version})")
         
         return jsonify({
             'success': True,
             'message': f'Модель {model_name} успешно загружена',
             'parameters': {
-                'input_size': neural_network.input_size,
-                'hidden_size': neural_network.hidden_size,
-                'output_size': neural_network.output_size,
-                'learning_rate': neural_network.learning_rate,
-                'activation': neural_network.activation,
-                'dropout_rate': neural_network.dropout_rate
-            }
+                'input_size': network.input_size,
+                'hidden_size': network.hidden_size,
+                'output_size': network.output_size,
+                'learning_rate': network.learning_rate,
+                'activation': network.activation,
+                'dropout_rate': network.dropout_rate
+            },
+            'model': served_model.info()
         })
         
     except Exception as e:
@@ -696,29 +1099,30 @@ def api_delete_model():
                 'error': 'Не указано имя модели'
             }), 400
         
+        model_stem = os.path.splitext(model_name)[0]
+        
         # Защита от удаления критических моделей
-        if model_name in ['neural_network.json', 'model_final.json']:
+        if model_stem in PROTECTED_MODELS:
             return jsonify({
                 'success': False,
                 'error': 'Нельзя удалить основную модель'
             }), 403
         
-        model_path = os.path.join('data/models', model_name)
+        record = model_registry.get(model_name)
         
-        if not os.path.exists(model_path):
+        if record is None:
             return jsonify({
                 'success': False,
                 'error': 'Модель не найдена'
             }), 404
         
         # Удаляем файл модели
-        os.remove(model_path)
+        os.remove(record.path)
         
-        # Удаляем соответствующий файл истории, если есть
-        history_name = model_name.replace('.json', '_history.json')
-        history_path = os.path.join('data/models', history_name)
-        if os.path.exists(history_path):
-            os.remove(history_path)
+        # Удаляем собственный файл истории (общие истории основных моделей не трогаем)
+        if record.history_path and os.path.basename(record.history_path) == model_stem + '_history.json':
+            os.remove(record.history_path)
+        model_registry.invalidate()
         
         print(f"🗑️  Модель удалена: {model_name}")
         
@@ -743,15 +1147,24 @@ def api_export_model():
     
     ПАРАМЕТРЫ (JSON):
         model_name: str - имя файла модели для экспорта
+        format: str (optional) - 'nnb' или 'json' (по умолчанию формат файла)
     
     ВОЗВРАЩАЕТ:
         Файл модели для скачивания
     """
     try:
+        import io
         from flask import send_file
         
         data = request.get_json()
         model_name = data.get('model_name')
+        target_format = data.get('format')
+        
+        if target_format not in (None, 'nnb', 'json'):
+            return jsonify({
+                'success': False,
+                'error': "format должен быть 'nnb' или 'json'"
+            }), 400
         
         if not model_name:
             return jsonify({
@@ -759,19 +1172,34 @@ def api_export_model():
                 'error': 'Не указано имя модели'
             }), 400
         
-        model_path = os.path.join('data/models', model_name)
+        record = model_registry.get(model_name)
         
-        if not os.path.exists(model_path):
+        if record is None or record.format is None:
             return jsonify({
                 'success': False,
                 'error': 'Модель не найдена'
             }), 404
         
+        model_path = record.path
+        source_format = record.format
+        target_format = target_format or source_format
+        mimetype = 'application/octet-stream' if target_format == 'nnb' else 'application/json'
+        
+        if target_format == source_format:
+            return send_file(
+                model_path,
+                as_attachment=True,
+                download_name=model_name,
+                mimetype=mimetype
+            )
+        
+        # Конвертация при скачивании (файл на диске не меняется)
+        extension = BINARY_MODEL_EXTENSION if target_format == 'nnb' else '.json'
         return send_file(
-            model_path,
+            io.BytesIO(export_model(model_path, target_format)),
             as_attachment=True,
-            download_name=model_name,
-            mimetype='application/json'
+            download_name=os.path.splitext(model_name)[0] + extension,
+            mimetype=mimetype
         )
         
     except Exception as e:
@@ -789,7 +1217,7 @@ def api_import_model():
     API для импорта модели (загрузка файла)
     
     ПАРАМЕТРЫ (multipart/form-data):
-        model_file: file - JSON файл с моделью
+        model_file: file - файл модели (.nnb или .json)
         model_name: str (optional) - имя для сохранения (по умолчанию - имя файла)
     
     ВОЗВРАЩАЕТ:
@@ -817,50 +1245,42 @@ def api_import_model():
             }), 400
         
         # Проверяем расширение
-        if not file.filename.endswith('.json'):
+        extension = os.path.splitext(file.filename)[1]
+        if extension not in MODEL_EXTENSIONS:
             return jsonify({
                 'success': False,
-                'error': 'Файл должен быть в формате JSON'
+                'error': 'Файл должен быть в формате .nnb или JSON'
             }), 400
         
-        # Получаем имя для сохранения
+        # Получаем имя для сохранения (расширение - как у загруженного файла)
         custom_name = request.form.get('model_name')
         if custom_name:
-            filename = secure_filename(custom_name)
-            if not filename.endswith('.json'):
-                filename += '.json'
+            filename = os.path.splitext(secure_filename(custom_name))[0] + extension
         else:
             filename = secure_filename(file.filename)
         
         # Создаем директорию если не существует
-        model_dir = 'data/models'
+        model_dir = MODELS_DIR
         os.makedirs(model_dir, exist_ok=True)
         
         # Сохраняем файл
         model_path = os.path.join(model_dir, filename)
         file.save(model_path)
         
-        # Проверяем валидность JSON
+        # Проверяем, что файл - модель в формате своего расширения
         try:
-            with open(model_path, 'r', encoding='utf-8') as f:
-                model_data = json.load(f)
-                
-            # Проверяем наличие необходимых полей
-            required_fields = ['input_size', 'hidden_size', 'output_size']
-            if not all(field in model_data for field in required_fields):
-                os.remove(model_path)
-                return jsonify({
-                    'success': False,
-                    'error': 'Неверный формат модели: отсутствуют обязательные поля'
-                }), 400
-                
-        except json.JSONDecodeError:
+            info = read_model_info(model_path)
+            if info['format'] != extension.lstrip('.'):
+                raise ModelFormatError('содержимое не соответствует расширению файла')
+            read_model(model_path, mmap=False)
+        except ModelFormatError as e:
             os.remove(model_path)
             return jsonify({
                 'success': False,
-                'error': 'Неверный формат JSON'
+                'error': f'Неверный формат модели: {e}'
             }), 400
         
+        model_registry.invalidate()
         print(f"[IMPORT] Модель импортирована: {filename}")
         
         return jsonify({
@@ -902,103 +1322,34 @@ def api_compare_models():
             - avg_loss: float - средняя ошибка
     """
     try:
-        import os
-        
         data = request.get_json()
         models_param = data.get('models', [])
         include_experiments = data.get('include_experiments', False)
         
-        models_to_compare = []
-        
-        # Получаем список моделей для сравнения
+        # Записи реестра моделей
         if models_param == 'all':
-            # Загружаем все модели
-            model_dir = 'data/models'
-            if os.path.exists(model_dir):
-                for filename in os.listdir(model_dir):
-                    if filename.endswith('.json') and not filename.startswith('training_history'):
-                        models_to_compare.append(filename)
+            records = [record for record in model_registry.list('models') if record.format]
         else:
-            models_to_compare = models_param
+            records = [record for record in map(model_registry.get, models_param)
+                       if record is not None and record.format]
         
         # Добавляем результаты экспериментов если запрошено
         if include_experiments:
-            experiments_dir = 'experiments/results'
-            if os.path.exists(experiments_dir):
-                for filename in os.listdir(experiments_dir):
-                    if filename.startswith('model_exp') and filename.endswith('.json'):
-                        models_to_compare.append(os.path.join('..', experiments_dir, filename))
+            records.extend(record for record in model_registry.list('experiments') if record.format)
         
-        if not models_to_compare:
+        if not records:
             return jsonify({
                 'success': False,
                 'error': 'Нет моделей для сравнения'
             }), 400
         
-        # Собираем данные о моделях
+        # Итоговая ошибка - из метаданных .nnb или истории обучения (см. ModelRegistry)
         comparison_data = []
-        
-        for model_file in models_to_compare:
-            try:
-                # Определяем полный путь
-                if model_file.startswith('..'):
-                    model_path = model_file
-                else:
-                    model_path = os.path.join('data/models', model_file)
-                
-                # Читаем модель
-                with open(model_path, 'r', encoding='utf-8') as f:
-                    model_data = json.load(f)
-                
-                # Пытаемся найти историю обучения
-                history_path = model_path.replace('.json', '_history.json')
-                if not os.path.exists(history_path):
-                    history_path = model_path.replace('model_', 'history_')
-                
-                final_loss = None
-                if os.path.exists(history_path):
-                    try:
-                        with open(history_path, 'r', encoding='utf-8') as f:
-                            history_data = json.load(f)
-                            if 'loss' in history_data and history_data['loss']:
-                                final_loss = history_data['loss'][-1]
-                    except:
-                        pass
-                
-                # Если не нашли историю, пытаемся найти в основных файлах истории
-                if final_loss is None:
-                    # Проверяем training_history_final.json
-                    if 'final' in model_file.lower():
-                        history_path = 'data/models/training_history_final.json'
-                    else:
-                        history_path = 'data/models/training_history.json'
-                    
-                    if os.path.exists(history_path):
-                        try:
-                            with open(history_path, 'r', encoding='utf-8') as f:
-                                history_data = json.load(f)
-                                if 'loss' in history_data and history_data['loss']:
-                                    final_loss = history_data['loss'][-1]
-                        except:
-                            pass
-                
-                # Добавляем данные модели
-                model_info = {
-                    'name': os.path.basename(model_file),
-                    'input_size': model_data.get('input_size', 10),
-                    'hidden_size': model_data.get('hidden_size', 8),
-                    'output_size': model_data.get('output_size', 3),
-                    'learning_rate': model_data.get('learning_rate'),
-                    'activation': model_data.get('activation', 'sigmoid'),
-                    'dropout_rate': model_data.get('dropout_rate', 0.0),
-                    'final_loss': final_loss if final_loss is not None else 0.01  # Fallback
-                }
-                
-                comparison_data.append(model_info)
-                
-            except Exception as e:
-                print(f"Ошибка чтения модели {model_file}: {e}")
-                continue
+        for record in records:
+            model_info = {'name': record.name, 'format': record.format}
+            model_info.update(_model_parameters(record))
+            model_info['final_loss'] = record.final_loss if record.final_loss is not None else 0.01  # Fallback
+            comparison_data.append(model_info)
         
         if not comparison_data:
             return jsonify({
@@ -1035,11 +1386,6 @@ def api_compare_models():
         }), 500
 
 
-# Глобальные переменные для хранения обученной модели
-trained_model = None
-trained_history = None
-
-
 @bp.route('/health')
 def health_check():
     """Проверка состояния системы"""
@@ -1050,5 +1396,11 @@ def health_check():
             'code_checker': 'ok',
             'neural_network': 'ok',
             'database': 'ok'
-        }
+        },
+        'model': model_server.current().info(),
+        'result_cache': result_cache.get_stats(),
+        'feature_cache': code_checker.feature_cache.get_stats(),
+        'grading': grading_scheduler.get_stats(),
+        'complexity_profiler': complexity_profiler.get_stats() if complexity_profiler is not None else None,
+        'test_synthesizer': test_synthesizer.get_stats()
     })
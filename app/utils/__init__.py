@@ -4,5 +4,9 @@
 
 from .database import DatabaseManager
 from .code_analyzer import CodeAnalyzer
+from .result_cache import ResultCache
+from .sqlite_pool import SQLiteConnectionManager
+from .grading_scheduler import GradingScheduler, GradingRejected
 
-__all__ = ['DatabaseManager', 'CodeAnalyzer']
+__all__ = ['DatabaseManager', 'CodeAnalyzer', 'ResultCache', 'SQLiteConnectionManager',
+           'GradingScheduler', 'GradingRejected']
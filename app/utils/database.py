@@ -2,28 +2,247 @@
 Менеджер базы данных для системы заданий Python
 """
 
+import base64
+import binascii
+import copy
 import sqlite3
 import json
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from typing import Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
 
+from .sqlite_pool import SQLiteConnectionManager
+
+
+# Пересчёт агрегатов статистики по таблицам (начальное заполнение в миграции 2
+# и DatabaseManager.rebuild_statistics)
+STATS_BACKFILL = [
+    """
+    INSERT OR REPLACE INTO stats_counters (id, total_tasks, total_solutions, score_sum)
+    SELECT 1,
+           (SELECT COUNT(*) FROM tasks),
+           (SELECT COUNT(*) FROM solutions),
+           (SELECT COALESCE(SUM(score), 0) FROM solutions)
+    """,
+    "DELETE FROM stats_task_groups",
+    """
+    INSERT INTO stats_task_groups (dimension, value, count)
+    SELECT 'category', category, COUNT(*) FROM tasks GROUP BY category
+    """,
+    """
+    INSERT INTO stats_task_groups (dimension, value, count)
+    SELECT 'difficulty', difficulty, COUNT(*) FROM tasks GROUP BY difficulty
+    """,
+]
+
+# Миграции схемы: номер версии (PRAGMA user_version) -> список выражений.
+# Новые миграции добавляются в конец, уже применённые не изменяются.
+MIGRATIONS = [
+    # 1: индексы для фильтрации и сортировки списков (keyset-пагинация)
+    [
+        "CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_category_difficulty_created "
+        "ON tasks (category, difficulty, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_category_created ON tasks (category, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_tasks_difficulty_created ON tasks (difficulty, created_at, id)",
+        "CREATE INDEX IF NOT EXISTS idx_solutions_task_submitted ON solutions (task_id, submitted_at)",
+        "CREATE INDEX IF NOT EXISTS idx_solutions_submitted ON solutions (submitted_at)",
+    ],
+    # 2: агрегаты статистики, поддерживаемые триггерами, и их начальное заполнение
+    [
+        """
+        CREATE TABLE IF NOT EXISTS stats_counters (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            total_tasks INTEGER NOT NULL DEFAULT 0,
+            total_solutions INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0
+        )
+        """,
+        """
+        CREATE TABLE IF NOT EXISTS stats_task_groups (
+            dimension TEXT NOT NULL,
+            value TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (dimension, value)
+        )
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stats_task_insert AFTER INSERT ON tasks
+        BEGIN
+            UPDATE stats_counters SET total_tasks = total_tasks + 1 WHERE id = 1;
+            INSERT INTO stats_task_groups (dimension, value, count) VALUES ('category', NEW.category, 1)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+            INSERT INTO stats_task_groups (dimension, value, count) VALUES ('difficulty', NEW.difficulty, 1)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stats_task_delete AFTER DELETE ON tasks
+        BEGIN
+            UPDATE stats_counters SET total_tasks = total_tasks - 1 WHERE id = 1;
+            UPDATE stats_task_groups SET count = count - 1
+                WHERE dimension = 'category' AND value = OLD.category;
+            UPDATE stats_task_groups SET count = count - 1
+                WHERE dimension = 'difficulty' AND value = OLD.difficulty;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stats_task_update AFTER UPDATE OF category, difficulty ON tasks
+        BEGIN
+            UPDATE stats_task_groups SET count = count - 1
+                WHERE dimension = 'category' AND value = OLD.category;
+            UPDATE stats_task_groups SET count = count - 1
+                WHERE dimension = 'difficulty' AND value = OLD.difficulty;
+            INSERT INTO stats_task_groups (dimension, value, count) VALUES ('category', NEW.category, 1)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+            INSERT INTO stats_task_groups (dimension, value, count) VALUES ('difficulty', NEW.difficulty, 1)
+                ON CONFLICT (dimension, value) DO UPDATE SET count = count + 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stats_solution_insert AFTER INSERT ON solutions
+        BEGIN
+            UPDATE stats_counters
+                SET total_solutions = total_solutions + 1, score_sum = score_sum + NEW.score
+                WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stats_solution_delete AFTER DELETE ON solutions
+        BEGIN
+            UPDATE stats_counters
+                SET total_solutions = total_solutions - 1, score_sum = score_sum - OLD.score
+                WHERE id = 1;
+        END
+        """,
+        """
+        CREATE TRIGGER IF NOT EXISTS trg_stats_solution_update AFTER UPDATE OF score ON solutions
+        BEGIN
+            UPDATE stats_counters SET score_sum = score_sum - OLD.score + NEW.score WHERE id = 1;
+        END
+        """,
+        # Заполнение по уже существующим данным (в одной транзакции с триггерами)
+        *STATS_BACKFILL,
+    ],
+    # 3: время последнего изменения задания (для Last-Modified и ETag в API)
+    [
+        "ALTER TABLE tasks ADD COLUMN updated_at TIMESTAMP",
+        "UPDATE tasks SET updated_at = created_at",
+    ],
+    # 4: признаки кода для нейронной сети рядом с решением (JSON, NULL - не извлекались)
+    [
+        "ALTER TABLE solutions ADD COLUMN features TEXT",
+    ],
+    # 5: ресурсы, измеренные в песочнице: процессорное время (с) и пиковый RSS (КБ);
+    # NULL - решения, проверенные до появления измерений
+    [
+        "ALTER TABLE solutions ADD COLUMN cpu_time REAL",
+        "ALTER TABLE solutions ADD COLUMN peak_memory INTEGER",
+    ],
+    # 6: синтезированные наборы тестов (общие для заданий одного шаблона) и ссылка
+    # задания на набор; NULL - только тесты, хранящиеся в задании
+    [
+        """
+        CREATE TABLE IF NOT EXISTS test_suites (
+            id TEXT PRIMARY KEY,
+            template TEXT NOT NULL,
+            seed INTEGER NOT NULL,
+            test_cases TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+        """,
+        "ALTER TABLE tasks ADD COLUMN test_suite_id TEXT",
+    ],
+]
+
+# Максимальный размер страницы списков
+MAX_PAGE_SIZE = 200
+
+# Проекции списка заданий: summary не загружает тесты, подсказки и шаблон
+TASK_SUMMARY_COLUMNS = """
+    id, title, description, difficulty, category, created_at, updated_at,
+    json_array_length(test_cases) AS test_cases_count,
+    json_array_length(hints) AS hints_count
+"""
+TASK_FULL_COLUMNS = """
+    id, title, description, difficulty, category, created_at, updated_at,
+    test_cases, expected_output, hints, solution_template, test_suite_id
+"""
+
+
+def encode_cursor(created_at: str, row_id: Any) -> str:
+    """
+    Курсор keyset-пагинации: позиция последней выданной строки
+
+    Args:
+        created_at: Время создания последней строки
+        row_id: ID последней строки
+
+    Returns:
+        Непрозрачная строка (base64url)
+    """
+    raw = json.dumps([created_at, row_id], ensure_ascii=False)
+    return base64.urlsafe_b64encode(raw.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, Any]:
+    """
+    Разбор курсора keyset-пагинации
+
+    Args:
+        cursor: Строка, полученная из encode_cursor
+
+    Returns:
+        Кортеж (created_at, id)
+
+    Raises:
+        ValueError: Если курсор повреждён
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (binascii.Error, UnicodeError, TypeError, ValueError):
+        raise ValueError("Некорректный курсор пагинации")
+    if not isinstance(created_at, str):
+        raise ValueError("Некорректный курсор пагинации")
+    return created_at, row_id
+
 
 class DatabaseManager:
     """Менеджер базы данных SQLite"""
     
-    def __init__(self, db_path: str = "tasks.db"):
+    def __init__(self, db_path: str = "tasks.db", busy_timeout: int = 5000, synchronous: str = 'NORMAL',
+                 stats_ttl: float = 5.0):
         """
         Инициализация менеджера базы данных
         
         Args:
             db_path: Путь к файлу базы данных
+            busy_timeout: Время ожидания блокировки записи в миллисекундах
+            synchronous: Уровень PRAGMA synchronous (см. SQLiteConnectionManager)
+            stats_ttl: Время жизни закэшированной статистики в секундах (0 - без кэша)
         """
         self.db_path = db_path
+        self.stats_ttl = stats_ttl
+        self._stats_lock = threading.Lock()
+        self._stats_cache: Optional[Tuple[float, Dict[str, Any]]] = None
+        self.connections = SQLiteConnectionManager(db_path, busy_timeout=busy_timeout,
+                                                   synchronous=synchronous)
         self.init_database()
     
+    def _connection(self) -> sqlite3.Connection:
+        """
+        Соединение текущего потока (WAL, повторное использование между запросами)
+        
+        Используется как контекстный менеджер: with self._connection() as conn
+        фиксирует транзакцию или откатывает её при исключении.
+        """
+        return self.connections.connection()
+    
     def init_database(self):
         """Инициализация структуры базы данных"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connection() as conn:
             cursor = conn.cursor()
             
             # Таблица заданий
@@ -68,6 +287,30 @@ class DatabaseManager:
             """)
             
             conn.commit()
+        
+        self._migrate()
+    
+    def _migrate(self):
+        """Применение недостающих миграций схемы (версия хранится в PRAGMA user_version)"""
+        with self._connection() as conn:
+            version = conn.execute("PRAGMA user_version").fetchone()[0]
+            while version < len(MIGRATIONS):
+                # Каждая миграция - одна транзакция; BEGIN IMMEDIATE не даёт
+                # параллельному процессу применить её повторно
+                conn.execute("BEGIN IMMEDIATE")
+                version = conn.execute("PRAGMA user_version").fetchone()[0]
+                if version < len(MIGRATIONS):
+                    for statement in MIGRATIONS[version]:
+                        conn.execute(statement)
+                    version += 1
+                    conn.execute(f"PRAGMA user_version = {version}")
+                conn.commit()
+    
+    @property
+    def schema_version(self) -> int:
+        """Текущая версия схемы базы"""
+        with self._connection() as conn:
+            return conn.execute("PRAGMA user_version").fetchone()[0]
     
     def save_task(self, task_data: Dict[str, Any]) -> bool:
         """
@@ -80,14 +323,27 @@ class DatabaseManager:
             True если успешно сохранено
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
+                # UPSERT вместо INSERT OR REPLACE: замена строки не вызывает
+                # триггеры удаления, и счётчики статистики разошлись бы с таблицей
                 cursor.execute("""
-                    INSERT OR REPLACE INTO tasks 
+                    INSERT INTO tasks 
                     (id, title, description, difficulty, category, test_cases, 
-                     expected_output, hints, solution_template)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                     expected_output, hints, solution_template, test_suite_id, updated_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+                    ON CONFLICT (id) DO UPDATE SET
+                        updated_at = CURRENT_TIMESTAMP,
+                        title = excluded.title,
+                        description = excluded.description,
+                        difficulty = excluded.difficulty,
+                        category = excluded.category,
+                        test_cases = excluded.test_cases,
+                        expected_output = excluded.expected_output,
+                        hints = excluded.hints,
+                        solution_template = excluded.solution_template,
+                        test_suite_id = excluded.test_suite_id
                 """, (
                     task_data['id'],
                     task_data['title'],
@@ -97,10 +353,12 @@ class DatabaseManager:
                     json.dumps(task_data['test_cases']),
                     task_data.get('expected_output', ''),
                     json.dumps(task_data['hints']),
-                    task_data['solution_template']
+                    task_data['solution_template'],
+                    task_data.get('test_suite_id')
                 ))
                 
                 conn.commit()
+                self._stats_cache = None
                 return True
         except Exception as e:
             print(f"Ошибка сохранения задания: {e}")
@@ -117,12 +375,13 @@ class DatabaseManager:
             Данные задания или None
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
                     SELECT id, title, description, difficulty, category, 
-                           test_cases, expected_output, hints, solution_template, created_at
+                           test_cases, expected_output, hints, solution_template, created_at,
+                           test_suite_id
                     FROM tasks WHERE id = ?
                 """, (task_id,))
                 
@@ -138,7 +397,8 @@ class DatabaseManager:
                         'expected_output': row[6],
                         'hints': json.loads(row[7]),
                         'solution_template': row[8],
-                        'created_at': row[9]
+                        'created_at': row[9],
+                        'test_suite_id': row[10]
                     }
                 return None
         except Exception as e:
@@ -157,7 +417,7 @@ class DatabaseManager:
             Список заданий
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
                 query = """
@@ -202,35 +462,153 @@ class DatabaseManager:
             print(f"Ошибка получения заданий: {e}")
             return []
     
+    def get_tasks_page(self, category: str = None, difficulty: str = None, limit: int = 50,
+                       cursor: str = None, fields: str = 'summary') -> Dict[str, Any]:
+        """
+        Страница заданий (новые первыми) с keyset-пагинацией
+        
+        Вместо OFFSET используется позиция последней строки (created_at, id),
+        поэтому стоимость запроса не растёт с номером страницы.
+        
+        Args:
+            category: Фильтр по категории
+            difficulty: Фильтр по сложности
+            limit: Размер страницы (1..MAX_PAGE_SIZE)
+            cursor: Курсор из next_cursor предыдущей страницы
+            fields: 'summary' - без тестов и шаблона (с test_cases_count и
+                hints_count), 'full' - все поля как в get_task
+            
+        Returns:
+            Словарь {'tasks': [...], 'next_cursor': str или None}
+            
+        Raises:
+            ValueError: Некорректные fields или cursor
+        """
+        if fields not in ('summary', 'full'):
+            raise ValueError(f"Неизвестная проекция: {fields}")
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        
+        columns = TASK_SUMMARY_COLUMNS if fields == 'summary' else TASK_FULL_COLUMNS
+        conditions = []
+        params: List[Any] = []
+        if category:
+            conditions.append("category = ?")
+            params.append(category)
+        if difficulty:
+            conditions.append("difficulty = ?")
+            params.append(difficulty)
+        if cursor:
+            conditions.append("(created_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        
+        query = f"SELECT {columns} FROM tasks"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        with self._connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        tasks = [self._task_from_row(row, fields) for row in rows[:limit]]
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = tasks[-1]
+            next_cursor = encode_cursor(last['created_at'], last['id'])
+        
+        return {'tasks': tasks, 'next_cursor': next_cursor}
+    
+    def get_tasks_by_ids(self, task_ids: List[str], fields: str = 'full') -> List[Dict[str, Any]]:
+        """
+        Получение нескольких заданий по ID одним запросом
+        
+        Args:
+            task_ids: Список ID (не более MAX_PAGE_SIZE, повторы игнорируются)
+            fields: Проекция, как в get_tasks_page
+            
+        Returns:
+            Найденные задания в порядке task_ids (отсутствующие пропускаются)
+            
+        Raises:
+            ValueError: Некорректные fields или слишком много ID
+        """
+        if fields not in ('summary', 'full'):
+            raise ValueError(f"Неизвестная проекция: {fields}")
+        task_ids = list(dict.fromkeys(task_ids))
+        if len(task_ids) > MAX_PAGE_SIZE:
+            raise ValueError(f"Можно запросить не более {MAX_PAGE_SIZE} заданий")
+        if not task_ids:
+            return []
+        
+        columns = TASK_SUMMARY_COLUMNS if fields == 'summary' else TASK_FULL_COLUMNS
+        placeholders = ", ".join("?" * len(task_ids))
+        with self._connection() as conn:
+            rows = conn.execute(f"SELECT {columns} FROM tasks WHERE id IN ({placeholders})",
+                                task_ids).fetchall()
+        
+        found = {row[0]: self._task_from_row(row, fields) for row in rows}
+        return [found[task_id] for task_id in task_ids if task_id in found]
+    
+    @staticmethod
+    def _task_from_row(row: tuple, fields: str) -> Dict[str, Any]:
+        """Словарь задания из строки TASK_SUMMARY_COLUMNS или TASK_FULL_COLUMNS"""
+        task = {
+            'id': row[0],
+            'title': row[1],
+            'description': row[2],
+            'difficulty': row[3],
+            'category': row[4],
+            'created_at': row[5],
+            'updated_at': row[6]
+        }
+        if fields == 'summary':
+            task['test_cases_count'] = row[7]
+            task['hints_count'] = row[8]
+        else:
+            task['test_cases'] = json.loads(row[7])
+            task['expected_output'] = row[8]
+            task['hints'] = json.loads(row[9])
+            task['solution_template'] = row[10]
+            task['test_suite_id'] = row[11]
+        return task
+    
     def save_solution(self, solution_data: Dict[str, Any]) -> bool:
         """
         Сохранение решения в базу данных
         
         Args:
-            solution_data: Данные решения
+            solution_data: Данные решения (features - признаки кода для
+                           нейронной сети, cpu_time и peak_memory - ресурсы,
+                           измеренные в песочнице; необязательно)
             
         Returns:
             True если успешно сохранено
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
+                features = solution_data.get('features')
                 cursor.execute("""
                     INSERT INTO solutions 
                     (task_id, student_code, test_results, analysis_results, 
-                     score, execution_time)
-                    VALUES (?, ?, ?, ?, ?, ?)
+                     score, execution_time, features, cpu_time, peak_memory)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     solution_data['task_id'],
                     solution_data['student_code'],
                     json.dumps(solution_data['test_results']),
                     json.dumps(solution_data['analysis_results']),
                     solution_data['score'],
-                    solution_data['execution_time']
+                    solution_data['execution_time'],
+                    json.dumps(features) if features is not None else None,
+                    solution_data.get('cpu_time'),
+                    solution_data.get('peak_memory')
                 ))
                 
                 conn.commit()
+                self._stats_cache = None
                 return True
         except Exception as e:
             print(f"Ошибка сохранения решения: {e}")
@@ -247,12 +625,13 @@ class DatabaseManager:
             Список решений
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
                 query = """
                     SELECT id, task_id, student_code, test_results, 
-                           analysis_results, score, execution_time, submitted_at
+                           analysis_results, score, execution_time, submitted_at, features,
+                           cpu_time, peak_memory
                     FROM solutions
                 """
                 params = []
@@ -275,7 +654,10 @@ class DatabaseManager:
                         'analysis_results': json.loads(row[4]),
                         'score': row[5],
                         'execution_time': row[6],
-                        'submitted_at': row[7]
+                        'submitted_at': row[7],
+                        'features': json.loads(row[8]) if row[8] is not None else None,
+                        'cpu_time': row[9],
+                        'peak_memory': row[10]
                     })
                 
                 return solutions
@@ -283,55 +665,261 @@ class DatabaseManager:
             print(f"Ошибка получения решений: {e}")
             return []
     
+    def get_solutions_page(self, task_id: str = None, limit: int = 50, cursor: str = None,
+                           include_code: bool = False) -> Dict[str, Any]:
+        """
+        Страница решений (новые первыми) с keyset-пагинацией
+        
+        Args:
+            task_id: Фильтр по ID задания
+            limit: Размер страницы (1..MAX_PAGE_SIZE)
+            cursor: Курсор из next_cursor предыдущей страницы
+            include_code: Загружать код решения, результаты тестов и признаки кода
+            
+        Returns:
+            Словарь {'solutions': [...], 'next_cursor': str или None}
+            
+        Raises:
+            ValueError: Некорректный cursor
+        """
+        limit = max(1, min(int(limit), MAX_PAGE_SIZE))
+        
+        columns = "id, task_id, score, execution_time, submitted_at, cpu_time, peak_memory"
+        if include_code:
+            columns += ", student_code, test_results, analysis_results, features"
+        conditions = []
+        params: List[Any] = []
+        if task_id:
+            conditions.append("task_id = ?")
+            params.append(task_id)
+        if cursor:
+            conditions.append("(submitted_at, id) < (?, ?)")
+            params.extend(decode_cursor(cursor))
+        
+        query = f"SELECT {columns} FROM solutions"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY submitted_at DESC, id DESC LIMIT ?"
+        params.append(limit + 1)
+        
+        with self._connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        solutions = []
+        for row in rows[:limit]:
+            solution = {
+                'id': row[0],
+                'task_id': row[1],
+                'score': row[2],
+                'execution_time': row[3],
+                'submitted_at': row[4],
+                'cpu_time': row[5],
+                'peak_memory': row[6]
+            }
+            if include_code:
+                solution['student_code'] = row[7]
+                solution['test_results'] = json.loads(row[8])
+                solution['analysis_results'] = json.loads(row[9])
+                solution['features'] = json.loads(row[10]) if row[10] is not None else None
+            solutions.append(solution)
+        
+        next_cursor = None
+        if len(rows) > limit:
+            last = solutions[-1]
+            next_cursor = encode_cursor(last['submitted_at'], last['id'])
+        
+        return {'solutions': solutions, 'next_cursor': next_cursor}
+    
+    def get_solution_features(self, task_id: str = None, after_id: int = 0, limit: int = None,
+                              include_results: bool = False) -> List[Dict[str, Any]]:
+        """
+        Сохранённые признаки кода решений (без разбора кода)
+        
+        Решения без признаков (сохранённые до их появления) пропускаются,
+        см. backfill_solution_features.
+        
+        Args:
+            task_id: Фильтр по ID задания
+            after_id: Только решения с id больше этого (инкрементальное чтение)
+            limit: Максимальное количество решений (None - все)
+            include_results: Загружать результаты тестов и анализа
+            
+        Returns:
+            Список словарей id, task_id, score, features (и test_results,
+            analysis_results) по возрастанию id
+        """
+        columns = "id, task_id, score, features"
+        if include_results:
+            columns += ", test_results, analysis_results"
+        query = f"SELECT {columns} FROM solutions WHERE id > ? AND features IS NOT NULL"
+        params: List[Any] = [after_id]
+        if task_id:
+            query += " AND task_id = ?"
+            params.append(task_id)
+        query += " ORDER BY id"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+        
+        with self._connection() as conn:
+            rows = conn.execute(query, params).fetchall()
+        
+        solutions = []
+        for row in rows:
+            solution = {'id': row[0], 'task_id': row[1], 'score': row[2], 'features': json.loads(row[3])}
+            if include_results:
+                solution['test_results'] = json.loads(row[4])
+                solution['analysis_results'] = json.loads(row[5])
+            solutions.append(solution)
+        return solutions
+    
+    def backfill_solution_features(self, extract: Callable[[List[str]], List[Dict[str, float]]],
+                                   batch_size: int = 200) -> int:
+        """
+        Извлечение и сохранение признаков для решений, у которых их нет
+        
+        Args:
+            extract: Функция: список фрагментов кода -> список признаков в
+                     том же порядке (например, на основе
+                     CodeChecker.get_code_features_batch)
+            batch_size: Количество решений, обрабатываемых за один вызов extract
+            
+        Returns:
+            Количество обновлённых решений
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            with self._connection() as conn:
+                rows = conn.execute(
+                    "SELECT id, student_code FROM solutions WHERE id > ? AND features IS NULL ORDER BY id LIMIT ?",
+                    (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return updated
+            
+            features_list = extract([row[1] for row in rows])
+            with self._connection() as conn:
+                conn.executemany(
+                    "UPDATE solutions SET features = ? WHERE id = ? AND features IS NULL",
+                    [(json.dumps(features), row[0]) for row, features in zip(rows, features_list)]
+                )
+                conn.commit()
+            updated += len(rows)
+            last_id = rows[-1][0]
+    
     def get_statistics(self) -> Dict[str, Any]:
         """
         Получение статистики по базе данных
         
+        Значения читаются из агрегатов stats_counters и stats_task_groups,
+        которые триггеры обновляют в одной транзакции с изменением заданий
+        и решений, поэтому стоимость запроса не зависит от размера таблиц.
+        Результат дополнительно кэшируется в процессе на stats_ttl секунд
+        (записи через этот менеджер сбрасывают кэш сразу).
+        
         Returns:
             Словарь со статистикой
         """
+        if self.stats_ttl > 0:
+            with self._stats_lock:
+                cached = self._stats_cache
+                if cached is not None and time.monotonic() - cached[0] < self.stats_ttl:
+                    return copy.deepcopy(cached[1])
+        
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
-                # Количество заданий
-                cursor.execute("SELECT COUNT(*) FROM tasks")
-                total_tasks = cursor.fetchone()[0]
-                
-                # Количество решений
-                cursor.execute("SELECT COUNT(*) FROM solutions")
-                total_solutions = cursor.fetchone()[0]
-                
-                # Средняя оценка
-                cursor.execute("SELECT AVG(score) FROM solutions")
-                avg_score = cursor.fetchone()[0] or 0
-                
-                # Задания по категориям
                 cursor.execute("""
-                    SELECT category, COUNT(*) 
-                    FROM tasks 
-                    GROUP BY category
+                    SELECT total_tasks, total_solutions, score_sum
+                    FROM stats_counters WHERE id = 1
                 """)
-                tasks_by_category = dict(cursor.fetchall())
+                total_tasks, total_solutions, score_sum = cursor.fetchone() or (0, 0, 0.0)
                 
-                # Задания по сложности
                 cursor.execute("""
-                    SELECT difficulty, COUNT(*) 
-                    FROM tasks 
-                    GROUP BY difficulty
+                    SELECT dimension, value, count
+                    FROM stats_task_groups
+                    WHERE count > 0
                 """)
-                tasks_by_difficulty = dict(cursor.fetchall())
+                groups = {'category': {}, 'difficulty': {}}
+                for dimension, value, count in cursor.fetchall():
+                    groups[dimension][value] = count
                 
-                return {
+                avg_score = score_sum / total_solutions if total_solutions else 0
+                stats = {
                     'total_tasks': total_tasks,
                     'total_solutions': total_solutions,
                     'average_score': round(avg_score, 2),
-                    'tasks_by_category': tasks_by_category,
-                    'tasks_by_difficulty': tasks_by_difficulty
+                    'tasks_by_category': groups['category'],
+                    'tasks_by_difficulty': groups['difficulty']
                 }
         except Exception as e:
             print(f"Ошибка получения статистики: {e}")
             return {}
+        
+        if self.stats_ttl > 0:
+            with self._stats_lock:
+                self._stats_cache = (time.monotonic(), copy.deepcopy(stats))
+        return stats
+    
+    def rebuild_statistics(self):
+        """
+        Пересчёт агрегатов статистики по таблицам
+        
+        Нужен только если данные изменялись в обход триггеров
+        (например, после ручного восстановления таблиц).
+        """
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            for statement in STATS_BACKFILL:
+                conn.execute(statement)
+            conn.commit()
+        self._stats_cache = None
+    
+    def save_test_suite(self, suite_id: str, template: str, seed: int,
+                        test_cases: List[Dict[str, Any]]) -> bool:
+        """
+        Сохранение синтезированного набора тестов
+        
+        Набор с тем же ID не перезаписывается: ID определяет содержимое
+        (см. TestSynthesizer.suite_id), поэтому одновременный синтез в
+        нескольких процессах сохраняет одну запись.
+        
+        Args:
+            suite_id: ID набора
+            template: Имя шаблона задания
+            seed: Начальное значение генератора входов
+            test_cases: Тесты набора
+            
+        Returns:
+            True если успешно сохранено
+        """
+        try:
+            with self._connection() as conn:
+                conn.execute("""
+                    INSERT OR IGNORE INTO test_suites (id, template, seed, test_cases)
+                    VALUES (?, ?, ?, ?)
+                """, (suite_id, template, seed, json.dumps(test_cases, ensure_ascii=False)))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Ошибка сохранения набора тестов: {e}")
+            return False
+    
+    def get_test_suite(self, suite_id: str) -> Optional[List[Dict[str, Any]]]:
+        """
+        Тесты синтезированного набора
+        
+        Args:
+            suite_id: ID набора
+            
+        Returns:
+            Список тестов или None, если набора нет
+        """
+        with self._connection() as conn:
+            row = conn.execute("SELECT test_cases FROM test_suites WHERE id = ?", (suite_id,)).fetchone()
+        return json.loads(row[0]) if row else None
     
     def delete_task(self, task_id: str) -> bool:
         """
@@ -344,7 +932,7 @@ class DatabaseManager:
             True если успешно удалено
         """
         try:
-            with sqlite3.connect(self.db_path) as conn:
+            with self._connection() as conn:
                 cursor = conn.cursor()
                 
                 # Удаляем связанные решения
@@ -354,6 +942,7 @@ class DatabaseManager:
                 cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
                 
                 conn.commit()
+                self._stats_cache = None
                 return cursor.rowcount > 0
         except Exception as e:
             print(f"Ошибка удаления задания: {e}")
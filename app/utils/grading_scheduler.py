@@ -0,0 +1,239 @@
+"""
+Планировщик проверки решений: ограничение одновременных запусков песочниц
+
+Во время экзаменов сотни студентов одновременно отправляют решения, и
+каждый запрос сразу запускает процессы-песочницы. Без ограничения
+процессы конкурируют за процессор и замедляются все проверки сразу.
+GradingScheduler стоит между маршрутом и CodeChecker:
+
+- одновременно выполняется не больше max_concurrent проверок (в пределах
+  рабочего процесса сервера; на сервер в целом - max_concurrent на
+  каждый процесс gunicorn);
+- остальные ждут в очереди длиной не больше max_queue; при заполненной
+  очереди запрос сразу отклоняется (GradingRejected -> HTTP 429 с
+  заголовком Retry-After), а не ждёт таймаута;
+- один пользователь может иметь не больше max_per_user проверок в работе
+  и в очереди, а освободившееся место достаётся пользователям по кругу
+  (а не в порядке поступления), поэтому один студент не вытесняет
+  остальных;
+- глубина очереди, время ожидания и отказы доступны через get_stats().
+
+Пример:
+    with scheduler.slot(user_key):
+        results = code_checker.test_solution(submission, test_cases)
+"""
+
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Deque, Dict, Optional
+
+
+# Количество последних ожиданий для перцентилей времени ожидания
+WAIT_SAMPLES = 1000
+
+# Коэффициент сглаживания среднего времени проверки (EWMA)
+SERVICE_TIME_SMOOTHING = 0.2
+
+# Границы подсказки Retry-After (секунды)
+MIN_RETRY_AFTER = 1
+MAX_RETRY_AFTER = 60
+
+
+class GradingRejected(Exception):
+    """
+    Проверка не принята: очередь заполнена, превышен лимит пользователя
+    или истекло время ожидания
+
+    Attributes:
+        reason: 'queue_full', 'user_limit' или 'timeout'
+        retry_after: Рекомендуемая пауза перед повтором (секунды)
+    """
+
+    def __init__(self, message: str, reason: str, retry_after: int):
+        super().__init__(message)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """Запрос в очереди планировщика"""
+
+    __slots__ = ('user', 'event', 'granted', 'enqueued_at')
+
+    def __init__(self, user: str):
+        self.user = user
+        self.event = threading.Event()
+        self.granted = False
+        self.enqueued_at = time.monotonic()
+
+
+class GradingScheduler:
+    """Ограничение одновременных проверок с очередью и справедливостью по пользователям"""
+
+    def __init__(self, max_concurrent: int = 2, max_queue: int = 32, max_per_user: int = 2,
+                 max_wait: float = 20.0):
+        """
+        Инициализация планировщика
+
+        Args:
+            max_concurrent: Максимальное число одновременных проверок
+            max_queue: Максимальное число ожидающих проверок
+            max_per_user: Максимальное число проверок пользователя в работе и в очереди
+            max_wait: Максимальное время ожидания в очереди (секунды)
+        """
+        if max_concurrent < 1:
+            raise ValueError("max_concurrent должно быть не меньше 1")
+        if max_queue < 0:
+            raise ValueError("max_queue не может быть отрицательным")
+        if max_per_user < 1:
+            raise ValueError("max_per_user должно быть не меньше 1")
+
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_per_user = max_per_user
+        self.max_wait = max_wait
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._waiting = 0
+        # Очереди пользователей в порядке обхода по кругу
+        self._queues: 'OrderedDict[str, Deque[_Waiter]]' = OrderedDict()
+        self._pending: Dict[str, int] = {}
+        self._wait_times: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self._service_time: Optional[float] = None
+        self.stats = {'admitted': 0, 'queued': 0, 'completed': 0, 'max_queue_depth': 0,
+                      'rejected_queue_full': 0, 'rejected_user_limit': 0, 'rejected_timeout': 0}
+
+    @contextmanager
+    def slot(self, user: str):
+        """
+        Место для одной проверки (ожидание в очереди при необходимости)
+
+        Args:
+            user: Ключ пользователя (для лимита и справедливой очереди)
+
+        Raises:
+            GradingRejected: Проверка не принята
+        """
+        self._acquire(user)
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(user, time.monotonic() - started)
+
+    def _acquire(self, user: str):
+        """Получение места или ожидание в очереди"""
+        with self._lock:
+            if self._pending.get(user, 0) >= self.max_per_user:
+                self.stats['rejected_user_limit'] += 1
+                raise GradingRejected(
+                    f"Слишком много проверок одновременно (не больше {self.max_per_user})",
+                    'user_limit', self._retry_after()
+                )
+            if self._running < self.max_concurrent and not self._waiting:
+                self._admit(user, 0.0)
+                return
+            if self._waiting >= self.max_queue:
+                self.stats['rejected_queue_full'] += 1
+                raise GradingRejected("Сервер проверки перегружен, очередь заполнена",
+                                      'queue_full', self._retry_after())
+
+            waiter = _Waiter(user)
+            self._queues.setdefault(user, deque()).append(waiter)
+            self._pending[user] = self._pending.get(user, 0) + 1
+            self._waiting += 1
+            self.stats['queued'] += 1
+            self.stats['max_queue_depth'] = max(self.stats['max_queue_depth'], self._waiting)
+
+        waiter.event.wait(self.max_wait)
+
+        with self._lock:
+            if waiter.granted:
+                return
+            # Время ожидания истекло: запрос убирается из очереди
+            queue = self._queues[user]
+            queue.remove(waiter)
+            if not queue:
+                del self._queues[user]
+            self._waiting -= 1
+            self._decrement_pending(user)
+            self.stats['rejected_timeout'] += 1
+            raise GradingRejected("Истекло время ожидания проверки", 'timeout', self._retry_after())
+
+    def _release(self, user: str, service_time: float):
+        """Освобождение места и передача его следующему пользователю по кругу"""
+        with self._lock:
+            self._running -= 1
+            self._decrement_pending(user)
+            self.stats['completed'] += 1
+            if self._service_time is None:
+                self._service_time = service_time
+            else:
+                self._service_time += SERVICE_TIME_SMOOTHING * (service_time - self._service_time)
+
+            while self._running < self.max_concurrent and self._queues:
+                next_user, queue = next(iter(self._queues.items()))
+                waiter = queue.popleft()
+                # Пользователь переходит в конец круга (или выбывает, если его очередь пуста)
+                del self._queues[next_user]
+                if queue:
+                    self._queues[next_user] = queue
+                self._waiting -= 1
+                waiter.granted = True
+                self._running += 1
+                self.stats['admitted'] += 1
+                self._wait_times.append(time.monotonic() - waiter.enqueued_at)
+                waiter.event.set()
+
+    def _admit(self, user: str, wait_time: float):
+        """Немедленный допуск (вызывается под блокировкой)"""
+        self._running += 1
+        self._pending[user] = self._pending.get(user, 0) + 1
+        self.stats['admitted'] += 1
+        self._wait_times.append(wait_time)
+
+    def _decrement_pending(self, user: str):
+        """Уменьшение счётчика проверок пользователя (вызывается под блокировкой)"""
+        count = self._pending.get(user, 0) - 1
+        if count > 0:
+            self._pending[user] = count
+        else:
+            self._pending.pop(user, None)
+
+    def _retry_after(self) -> int:
+        """Оценка времени до освобождения места (вызывается под блокировкой)"""
+        service_time = self._service_time if self._service_time is not None else 1.0
+        estimate = service_time * (self._waiting + 1) / self.max_concurrent
+        return int(min(max(math.ceil(estimate), MIN_RETRY_AFTER), MAX_RETRY_AFTER))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Метрики планировщика
+
+        Returns:
+            Счётчики допусков и отказов, текущая глубина очереди, число
+            выполняемых проверок и время ожидания (среднее, p50, p95, max)
+            по последним WAIT_SAMPLES допускам
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['running'] = self._running
+            stats['queue_depth'] = self._waiting
+            stats['users_waiting'] = len(self._queues)
+            waits = sorted(self._wait_times)
+            service_time = self._service_time
+        stats['max_concurrent'] = self.max_concurrent
+        stats['max_queue'] = self.max_queue
+        stats['max_per_user'] = self.max_per_user
+        stats['avg_service_time'] = round(service_time, 4) if service_time is not None else None
+        stats['wait_time'] = {
+            'avg': round(sum(waits) / len(waits), 4) if waits else 0.0,
+            'p50': round(waits[len(waits) // 2], 4) if waits else 0.0,
+            'p95': round(waits[min(len(waits) - 1, int(len(waits) * 0.95))], 4) if waits else 0.0,
+            'max': round(waits[-1], 4) if waits else 0.0
+        }
+        return stats
@@ -0,0 +1,260 @@
+"""
+Кэш результатов проверки решений
+
+Студенты часто отправляют один и тот же код повторно (как и автоматические
+повторы запросов), а каждая проверка запускает песочницу и нейронную сеть.
+Кэш хранит результаты тестов, анализ кода, признаки и оценку качества по
+ключу, вычисленному из содержимого:
+
+    sha256(нормализованный код + ID задания + хеш набора тестов
+           + отпечаток настроек проверки)
+
+Изменение тестов задания или настроек проверки (CodeChecker.fingerprint:
+таймауты, fail-fast, ограничения песочницы) меняет ключ, поэтому
+устаревшие записи не используются и со временем вытесняются. Оценка качества зависит от модели
+и хранится вместе с отпечатком модели (SimpleNeuralNetwork.fingerprint):
+при смене модели она пересчитывается по сохранённым признакам без
+повторного запуска тестов.
+
+Уровни хранения:
+- память: LRU с ограничением по количеству записей;
+- SQLite (необязательно): переживает перезапуск приложения.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from .sqlite_pool import SQLiteConnectionManager
+
+
+def normalize_code(code: str) -> str:
+    """
+    Нормализация кода перед хешированием
+
+    Приводит переводы строк к виду \\n и убирает пробельные символы в
+    конце файла - такие различия не влияют на выполнение кода.
+
+    Args:
+        code: Исходный код решения
+
+    Returns:
+        Нормализованный код
+    """
+    return code.replace('\r\n', '\n').replace('\r', '\n').rstrip() + '\n'
+
+
+def hash_test_cases(test_cases: List[Dict[str, Any]]) -> str:
+    """
+    Хеш набора тестов задания
+
+    Args:
+        test_cases: Список тестовых случаев
+
+    Returns:
+        Шестнадцатеричный SHA-256 канонического JSON-представления
+    """
+    canonical = json.dumps(test_cases, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+
+class ResultCache:
+    """LRU-кэш результатов проверки с необязательным хранилищем SQLite"""
+
+    def __init__(self, max_entries: int = 1024, db_path: Optional[str] = None):
+        """
+        Инициализация кэша
+
+        Args:
+            max_entries: Максимальное количество записей в памяти
+            db_path: Путь к базе SQLite для постоянного хранения (None - только память)
+        """
+        if max_entries < 1:
+            raise ValueError("Размер кэша должен быть не меньше 1")
+
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'misses': 0, 'memory_hits': 0, 'disk_hits': 0,
+                      'evictions': 0, 'invalidations': 0}
+
+        self._connections = SQLiteConnectionManager(db_path) if db_path else None
+        if self.db_path:
+            self._init_database()
+
+    def _init_database(self):
+        """Создание таблицы постоянного кэша"""
+        with self._connections.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS result_cache (
+                    key TEXT PRIMARY KEY,
+                    task_id TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_result_cache_task ON result_cache (task_id)")
+            conn.commit()
+
+    @staticmethod
+    def make_key(code: str, task_id: str, test_cases: List[Dict[str, Any]],
+                 checker_fingerprint: str = '') -> str:
+        """
+        Ключ записи кэша
+
+        Args:
+            code: Код решения
+            task_id: ID задания
+            test_cases: Тесты задания
+            checker_fingerprint: Отпечаток настроек проверки (CodeChecker.fingerprint)
+
+        Returns:
+            Шестнадцатеричный SHA-256
+        """
+        digest = hashlib.sha256()
+        for part in (normalize_code(code), str(task_id), hash_test_cases(test_cases), checker_fingerprint):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Поиск записи сначала в памяти, затем в SQLite
+
+        Найденная в SQLite запись переносится в память.
+
+        Args:
+            key: Ключ (см. make_key)
+
+        Returns:
+            Копия сохранённой записи или None
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.stats['hits'] += 1
+                self.stats['memory_hits'] += 1
+                return json.loads(entry[1])
+
+        row = self._load(key)
+        if row is None:
+            with self._lock:
+                self.stats['misses'] += 1
+            return None
+
+        task_id, payload = row
+        with self._lock:
+            self._store(key, task_id, payload)
+            self.stats['hits'] += 1
+            self.stats['disk_hits'] += 1
+        return json.loads(payload)
+
+    def put(self, key: str, entry: Dict[str, Any]):
+        """
+        Сохранение записи
+
+        Запись хранится в сериализованном виде, поэтому изменение
+        переданного словаря после вызова не влияет на кэш.
+
+        Args:
+            key: Ключ (см. make_key)
+            entry: Данные записи (JSON-сериализуемые, с полем task_id)
+        """
+        task_id = str(entry.get('task_id', ''))
+        payload = json.dumps(entry, ensure_ascii=False)
+        with self._lock:
+            self._store(key, task_id, payload)
+
+        if self.db_path:
+            try:
+                with self._connections.connection() as conn:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO result_cache (key, task_id, payload) VALUES (?, ?, ?)",
+                        (key, task_id, payload)
+                    )
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f"Ошибка сохранения в кэш результатов: {e}")
+
+    def _store(self, key: str, task_id: str, payload: str):
+        """Добавление записи в память с вытеснением самой старой (вызывается под блокировкой)"""
+        self._entries[key] = (task_id, payload)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def _load(self, key: str) -> Optional[Tuple[str, str]]:
+        """Чтение записи (task_id, payload) из SQLite"""
+        if not self.db_path:
+            return None
+        try:
+            with self._connections.connection() as conn:
+                row = conn.execute("SELECT task_id, payload FROM result_cache WHERE key = ?", (key,)).fetchone()
+                return tuple(row) if row else None
+        except sqlite3.Error as e:
+            print(f"Ошибка чтения кэша результатов: {e}")
+            return None
+
+    def invalidate_task(self, task_id: str) -> int:
+        """
+        Удаление всех записей задания (например, после изменения его тестов)
+
+        Args:
+            task_id: ID задания
+
+        Returns:
+            Количество удалённых записей в памяти
+        """
+        task_id = str(task_id)
+        with self._lock:
+            stale = [key for key, (entry_task_id, _) in self._entries.items()
+                     if entry_task_id == task_id]
+            for key in stale:
+                del self._entries[key]
+            self.stats['invalidations'] += len(stale)
+
+        if self.db_path:
+            try:
+                with self._connections.connection() as conn:
+                    conn.execute("DELETE FROM result_cache WHERE task_id = ?", (task_id,))
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f"Ошибка очистки кэша результатов: {e}")
+
+        return len(stale)
+
+    def clear(self):
+        """Полная очистка кэша (память и SQLite)"""
+        with self._lock:
+            self.stats['invalidations'] += len(self._entries)
+            self._entries.clear()
+
+        if self.db_path:
+            try:
+                with self._connections.connection() as conn:
+                    conn.execute("DELETE FROM result_cache")
+                    conn.commit()
+            except sqlite3.Error as e:
+                print(f"Ошибка очистки кэша результатов: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Статистика кэша
+
+        Returns:
+            Счётчики попаданий и промахов, размер и доля попаданий
+        """
+        with self._lock:
+            stats = dict(self.stats)
+            stats['size'] = len(self._entries)
+        stats['max_entries'] = self.max_entries
+        stats['persistent'] = bool(self.db_path)
+        total = stats['hits'] + stats['misses']
+        stats['hit_rate'] = round(stats['hits'] / total, 4) if total else 0.0
+        return stats
@@ -0,0 +1,95 @@
+"""
+Повторно используемые соединения SQLite
+
+Открытие соединения на каждый запрос и журнал отката по умолчанию
+приводят к тому, что параллельные рабочие процессы gunicorn выстраиваются
+в очередь на запись и получают "database is locked". Менеджер соединений:
+
+- держит одно соединение на поток (и пересоздаёт его после fork);
+- включает журнал WAL: читатели не блокируют писателя и наоборот;
+- использует synchronous=NORMAL (в режиме WAL надёжно при сбое процесса,
+  fsync выполняется только при контрольной точке);
+- ждёт освобождения блокировки busy_timeout миллисекунд вместо ошибки;
+- кэширует подготовленные выражения (cached_statements).
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Optional
+
+
+class SQLiteConnectionManager:
+    """Соединения SQLite по одному на поток"""
+
+    def __init__(self, db_path: str, busy_timeout: int = 5000, synchronous: str = 'NORMAL',
+                 cached_statements: int = 256):
+        """
+        Инициализация менеджера соединений
+
+        Args:
+            db_path: Путь к файлу базы данных
+            busy_timeout: Время ожидания блокировки в миллисекундах
+            synchronous: Уровень PRAGMA synchronous (OFF, NORMAL, FULL)
+            cached_statements: Размер кэша подготовленных выражений на соединение
+        """
+        if synchronous.upper() not in ('OFF', 'NORMAL', 'FULL', 'EXTRA'):
+            raise ValueError(f"Недопустимый уровень synchronous: {synchronous}")
+
+        self.db_path = db_path
+        self.busy_timeout = busy_timeout
+        self.synchronous = synchronous
+        self.cached_statements = cached_statements
+        self._local = threading.local()
+        self._journal_lock = threading.Lock()
+        self._journal_mode: Optional[str] = None
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Соединение текущего потока (создаётся при первом обращении)
+
+        Соединение можно использовать как контекстный менеджер
+        (with manager.connection() as conn): транзакция фиксируется при
+        успешном выходе и откатывается при исключении, соединение при
+        этом остаётся открытым для следующих запросов.
+
+        Returns:
+            Соединение SQLite
+        """
+        conn = getattr(self._local, 'conn', None)
+        # После fork соединение родителя использовать нельзя
+        if conn is None or self._local.pid != os.getpid():
+            conn = self._open()
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def _open(self) -> sqlite3.Connection:
+        """Открытие и настройка нового соединения"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.busy_timeout / 1000,
+            cached_statements=self.cached_statements
+        )
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout)}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+
+        # Режим WAL сохраняется в файле базы, достаточно включить его один раз
+        if self._journal_mode is None:
+            with self._journal_lock:
+                if self._journal_mode is None:
+                    self._journal_mode = conn.execute("PRAGMA journal_mode = WAL").fetchone()[0]
+        return conn
+
+    @property
+    def journal_mode(self) -> Optional[str]:
+        """Режим журнала базы (wal; для :memory: - memory)"""
+        return self._journal_mode
+
+    def close(self):
+        """Закрытие соединения текущего потока"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            if self._local.pid == os.getpid():
+                conn.close()
+            self._local.conn = None
@@ -0,0 +1,139 @@
+"""
+Микробенчмарк анализа кода: однопроходный посетитель против ~10 обходов ast.walk
+
+Для каждого примера из data/training_data/training_data.json код
+разбирается один раз, после чего сравниваются:
+- прежняя реализация analyze_code (отдельный ast.walk на каждую метрику,
+  рекурсивный расчёт вложенности) - воспроизведена ниже как эталон;
+- CodeMetricsVisitor (один итеративный обход).
+
+Скрипт проверяет, что результаты совпадают, и печатает ускорение.
+
+Запуск (из корня проекта):
+    python benchmarks/bench_code_metrics.py
+"""
+
+import ast
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.code_metrics import CodeMetricsVisitor
+
+
+def legacy_nesting_level(tree):
+    """Прежний рекурсивный расчёт максимальной вложенности"""
+    def get_nesting_level(node, current_level=0):
+        max_level = current_level
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.If, ast.For, ast.While, ast.Try, ast.With)):
+                max_level = max(max_level, get_nesting_level(child, current_level + 1))
+            else:
+                max_level = max(max_level, get_nesting_level(child, current_level))
+        return max_level
+
+    return get_nesting_level(tree)
+
+
+def legacy_complexity(tree):
+    """Прежний расчёт циклометрической сложности (два обхода)"""
+    complexity = 0
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.If, ast.For, ast.While, ast.ExceptHandler)):
+            complexity += 1
+        elif isinstance(node, (ast.And, ast.Or)):
+            complexity += 1
+    lines = len([node for node in ast.walk(tree) if hasattr(node, 'lineno')])
+    return complexity / max(lines, 1) if lines > 0 else 0
+
+
+def legacy_suggestions(tree):
+    """Прежняя генерация рекомендаций (три обхода + расчёт сложности)"""
+    suggestions = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            if len(node.body) > 20:
+                suggestions.append(f"Функция '{node.name}' слишком длинная. Рассмотрите разбиение на более мелкие функции.")
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            if len(node.id) < 3:
+                suggestions.append(f"Переменная '{node.id}' имеет слишком короткое имя.")
+    if legacy_complexity(tree) > 0.5:
+        suggestions.append("Код имеет высокую сложность. Добавьте комментарии для улучшения читаемости.")
+    if not any(isinstance(node, (ast.Try, ast.ExceptHandler)) for node in ast.walk(tree)):
+        suggestions.append("Рассмотрите добавление обработки ошибок.")
+    return suggestions
+
+
+def legacy_metrics(tree):
+    """Метрики дерева в порядке полей CodeAnalysis (прежняя реализация)"""
+    variable_names = [node.id for node in ast.walk(tree) if isinstance(node, ast.Name)]
+    return (
+        legacy_complexity(tree),
+        len([node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]),
+        len([node for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]),
+        len([node for node in ast.walk(tree) if isinstance(node, (ast.Import, ast.ImportFrom))]),
+        sum(len(name) for name in variable_names) / len(variable_names) if variable_names else 0.0,
+        legacy_nesting_level(tree),
+        any(isinstance(node, (ast.Try, ast.ExceptHandler)) for node in ast.walk(tree)),
+        legacy_suggestions(tree)
+    )
+
+
+def visitor_metrics(tree):
+    """Те же метрики за один обход CodeMetricsVisitor"""
+    visitor = CodeMetricsVisitor()
+    visitor.visit(tree)
+    return (
+        visitor.complexity_score,
+        visitor.functions_count,
+        visitor.classes_count,
+        visitor.imports_count,
+        visitor.variable_names_length,
+        visitor.nested_levels,
+        visitor.error_handling,
+        visitor.suggestions()
+    )
+
+
+def measure(function, trees, repeats):
+    """Лучшее время (в секундах) обработки всех деревьев из repeats попыток"""
+    best = float('inf')
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for tree in trees:
+            function(tree)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    with open('data/training_data/training_data.json', 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    trees = [ast.parse(item['code']) for item in data]
+    print(f"📊 Примеров кода: {len(trees)}")
+
+    # Проверка идентичности результатов
+    mismatches = sum(1 for tree in trees if legacy_metrics(tree) != visitor_metrics(tree))
+    if mismatches:
+        print(f"❌ Результаты различаются для {mismatches} примеров")
+        sys.exit(1)
+    print("✅ Результаты совпадают для всех примеров")
+
+    repeats = 20
+    legacy_time = measure(legacy_metrics, trees, repeats)
+    visitor_time = measure(visitor_metrics, trees, repeats)
+
+    print(f"\n⏱️  Прежняя реализация (ast.walk ×10): {legacy_time * 1000:8.2f} мс на датасет "
+          f"({legacy_time / len(trees) * 1e6:.1f} мкс на пример)")
+    print(f"⏱️  CodeMetricsVisitor (1 обход):      {visitor_time * 1000:8.2f} мс на датасет "
+          f"({visitor_time / len(trees) * 1e6:.1f} мкс на пример)")
+    print(f"\n🚀 Ускорение: {legacy_time / visitor_time:.2f}×")
+
+
+if __name__ == '__main__':
+    main()
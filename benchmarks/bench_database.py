@@ -0,0 +1,164 @@
+"""
+Нагрузочный бенчмарк DatabaseManager: save_solution и get_task из нескольких потоков
+
+Сравниваются:
+- прежний доступ: новое соединение sqlite3.connect на каждый вызов,
+  журнал отката (rollback journal) - воспроизведён ниже как эталон;
+- DatabaseManager: соединение на поток, WAL, synchronous=NORMAL,
+  busy_timeout и кэш подготовленных выражений.
+
+Каждый поток чередует запись решения и чтение задания. Базы создаются
+во временном каталоге, рабочая база tasks.db не затрагивается.
+
+Запуск (из корня проекта):
+    python benchmarks/bench_database.py [--threads 8] [--operations 300]
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.database import DatabaseManager
+
+
+TASK = {
+    'id': 'bench_task',
+    'title': 'Сортировка списка',
+    'description': 'Напишите функцию для сортировки списка чисел',
+    'difficulty': 'easy',
+    'category': 'algorithms',
+    'test_cases': [{'input': '[3, 1, 2]', 'expected': '[1, 2, 3]'}] * 5,
+    'hints': ['Используйте sorted()'],
+    'solution_template': 'def sort_list(lst):\n    pass\n'
+}
+
+SOLUTION = {
+    'task_id': 'bench_task',
+    'student_code': 'def sort_list(lst):\n    return sorted(lst)\n' * 5,
+    'test_results': [{'input': '[3, 1, 2]', 'expected': '[1, 2, 3]', 'actual': '[1, 2, 3]',
+                      'passed': True, 'execution_time': 0.001, 'error': ''}] * 5,
+    'analysis_results': {'syntax_valid': True, 'complexity_score': 0.1, 'lines_of_code': 2,
+                         'functions_count': 1, 'suggestions': []},
+    'score': 95.0,
+    'execution_time': 0.005
+}
+
+
+class LegacyDatabase:
+    """Прежняя схема доступа: соединение на каждый вызов, журнал отката"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+
+    def save_solution(self, solution_data):
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO solutions
+                    (task_id, student_code, test_results, analysis_results,
+                     score, execution_time)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (
+                    solution_data['task_id'],
+                    solution_data['student_code'],
+                    json.dumps(solution_data['test_results']),
+                    json.dumps(solution_data['analysis_results']),
+                    solution_data['score'],
+                    solution_data['execution_time']
+                ))
+                conn.commit()
+                return True
+        except Exception as e:
+            print(f"Ошибка сохранения решения: {e}")
+            return False
+
+    def get_task(self, task_id):
+        try:
+            with sqlite3.connect(self.db_path) as conn:
+                cursor = conn.cursor()
+                cursor.execute("""
+                    SELECT id, title, description, difficulty, category,
+                           test_cases, expected_output, hints, solution_template, created_at
+                    FROM tasks WHERE id = ?
+                """, (task_id,))
+                row = cursor.fetchone()
+                return {'id': row[0], 'test_cases': json.loads(row[5])} if row else None
+        except Exception as e:
+            print(f"Ошибка получения задания: {e}")
+            return None
+
+
+def run_load(db, threads: int, operations: int):
+    """
+    Параллельная нагрузка: каждый поток выполняет operations пар запись + чтение
+
+    Returns:
+        Кортеж (время в секундах, количество неудачных операций)
+    """
+    failures = []
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        failed = 0
+        barrier.wait()
+        for _ in range(operations):
+            if not db.save_solution(SOLUTION):
+                failed += 1
+            if db.get_task(TASK['id']) is None:
+                failed += 1
+        failures.append(failed)
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start, sum(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--operations', type=int, default=300, help='пар запись + чтение на поток')
+    args = parser.parse_args()
+
+    total = args.threads * args.operations * 2
+    print(f"🧵 Потоков: {args.threads}, операций на поток: {args.operations * 2} (всего {total})")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        # Схема создаётся DatabaseManager; для эталона журнал возвращается в режим отката
+        legacy_path = os.path.join(temp_dir, 'legacy.db')
+        schema = DatabaseManager(legacy_path)
+        schema.save_task(TASK)
+        schema.connections.close()
+        with sqlite3.connect(legacy_path) as conn:
+            conn.execute("PRAGMA journal_mode = DELETE")
+
+        pooled_path = os.path.join(temp_dir, 'pooled.db')
+        pooled = DatabaseManager(pooled_path)
+        pooled.save_task(TASK)
+
+        results = {}
+        for name, db in (('Прежний доступ (connect на вызов)', LegacyDatabase(legacy_path)),
+                         ('DatabaseManager (WAL, соединение на поток)', pooled)):
+            elapsed, failed = run_load(db, args.threads, args.operations)
+            results[name] = elapsed
+            print(f"\n⏱️  {name}")
+            print(f"   Время: {elapsed:.3f} с, {total / elapsed:,.0f} операций/с, ошибок: {failed}")
+
+        legacy_time, pooled_time = results.values()
+        print(f"\n🚀 Ускорение: {legacy_time / pooled_time:.2f}×")
+
+
+if __name__ == '__main__':
+    main()
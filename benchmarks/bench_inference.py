@@ -0,0 +1,82 @@
+"""
+Бенчмарк инференса: задержка оценки одного фрагмента кода
+
+Сравниваются:
+- SimpleNeuralNetwork.predict и evaluate_code_quality: forward() с
+  созданием промежуточных массивов на каждом слое;
+- InferenceKernel (app/models/inference.py): непрерывные веса и заранее
+  выделенные буферы, операции с out=.
+
+Скрипт проверяет, что оценки совпадают, и печатает среднее время вызова
+для каждой архитектуры.
+
+Запуск (из корня проекта):
+    python benchmarks/bench_inference.py [--calls 20000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.inference import InferenceKernel
+from app.models.neural_network import FEATURE_SCALES, SimpleNeuralNetwork, normalize_features
+
+
+ARCHITECTURES = [
+    ('10→8→3, sigmoid', {'activation': 'sigmoid'}),
+    ('10→8→3, relu', {'activation': 'relu'}),
+    ('10→8→6→3, relu', {'activation': 'relu', 'hidden_size2': 6})
+]
+
+
+def random_features(rng, count):
+    """Случайные словари признаков в диапазонах FEATURE_SCALES"""
+    return [{name: float(rng.uniform(0, scale)) for name, scale in FEATURE_SCALES} for _ in range(count)]
+
+
+def measure(function, samples, calls):
+    """Среднее время вызова в микросекундах"""
+    start = time.perf_counter()
+    for index in range(calls):
+        function(samples[index % len(samples)])
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--calls', type=int, default=20000)
+    args = parser.parse_args()
+
+    rng = np.random.RandomState(0)
+    samples = random_features(rng, 1000)
+    vectors = [normalize_features([features]) for features in samples]
+
+    for title, params in ARCHITECTURES:
+        np.random.seed(0)
+        network = SimpleNeuralNetwork(load_pretrained=False, **params)
+        kernel = InferenceKernel(network)
+
+        for features in samples:
+            if network.evaluate_code_quality(features) != kernel.evaluate_code_quality(features):
+                print(f"❌ Оценки различаются ({title})")
+                sys.exit(1)
+
+        predict_time = measure(network.predict, vectors, args.calls)
+        kernel_predict_time = measure(kernel.predict, vectors, args.calls)
+        evaluate_time = measure(network.evaluate_code_quality, samples, args.calls)
+        kernel_evaluate_time = measure(kernel.evaluate_code_quality, samples, args.calls)
+
+        print(f"\n🧠 {title}")
+        print(f"⏱️  predict:                {predict_time:7.2f} мкс → InferenceKernel.predict:                {kernel_predict_time:7.2f} мкс "
+              f"({predict_time / kernel_predict_time:.1f}×)")
+        print(f"⏱️  evaluate_code_quality:  {evaluate_time:7.2f} мкс → InferenceKernel.evaluate_code_quality:  {kernel_evaluate_time:7.2f} мкс "
+              f"({evaluate_time / kernel_evaluate_time:.1f}×)")
+
+
+if __name__ == '__main__':
+    main()
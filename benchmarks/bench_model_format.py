@@ -0,0 +1,85 @@
+"""
+Бенчмарк форматов моделей: список и загрузка моделей JSON против .nnb
+
+Сравниваются:
+- JSON (прежний формат save_model): для списка моделей каждый файл
+  разбирается целиком ради нескольких параметров архитектуры;
+- .nnb (app/models/model_format.py): read_model_info читает только
+  заголовок, load_model отображает веса в память.
+
+Скрипт сохраняет одни и те же модели в обоих форматах, проверяет, что
+загруженные модели дают одинаковые предсказания, и печатает время
+построения списка и загрузки. Файлы создаются во временном каталоге.
+
+Запуск (из корня проекта):
+    python benchmarks/bench_model_format.py [--models 300] [--hidden-size 64]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.models.model_format import read_model_info
+from app.models.neural_network import SimpleNeuralNetwork
+
+
+def measure(function, paths):
+    """Время обработки всех файлов в секундах"""
+    start = time.perf_counter()
+    for path in paths:
+        function(path)
+    return time.perf_counter() - start
+
+
+def load(path):
+    """Загрузка модели из файла"""
+    model = SimpleNeuralNetwork(load_pretrained=False)
+    model.load_model(path)
+    return model
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--models', type=int, default=300)
+    parser.add_argument('--hidden-size', type=int, default=64)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        json_paths, binary_paths = [], []
+        for index in range(args.models):
+            np.random.seed(index)
+            model = SimpleNeuralNetwork(hidden_size=args.hidden_size, activation='relu', load_pretrained=False)
+            for paths, extension in ((json_paths, '.json'), (binary_paths, '.nnb')):
+                path = os.path.join(temp_dir, f'model_{index}{extension}')
+                model.save_model(path, metadata={'final_loss': 0.01})
+                paths.append(path)
+
+        json_size = sum(os.path.getsize(path) for path in json_paths)
+        binary_size = sum(os.path.getsize(path) for path in binary_paths)
+        print(f"📦 Моделей: {args.models}, архитектура 10→{args.hidden_size}→3")
+        print(f"   JSON: {json_size / 1024:,.0f} КБ, .nnb: {binary_size / 1024:,.0f} КБ")
+
+        features = np.random.RandomState(0).rand(32, 10)
+        for json_path, binary_path in zip(json_paths[:10], binary_paths[:10]):
+            if not np.array_equal(load(json_path).forward(features)[-1], load(binary_path).forward(features)[-1]):
+                print(f"❌ Предсказания различаются: {json_path}")
+                sys.exit(1)
+
+        for title, function in (('Список моделей (архитектура и метаданные)', read_model_info),
+                                ('Загрузка модели (load_model)', load)):
+            json_time = measure(function, json_paths)
+            binary_time = measure(function, binary_paths)
+            print(f"\n⏱️  {title}")
+            print(f"   JSON: {json_time * 1000:9.1f} мс")
+            print(f"   .nnb: {binary_time * 1000:9.1f} мс")
+            print(f"🚀 Ускорение: {json_time / binary_time:.0f}×")
+
+
+if __name__ == '__main__':
+    main()
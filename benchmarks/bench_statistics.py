@@ -0,0 +1,104 @@
+"""
+Бенчмарк /api/statistics: агрегаты на триггерах против пяти запросов по таблицам
+
+Сравниваются:
+- прежний get_statistics: COUNT(*), AVG(score) и два GROUP BY при каждом
+  вызове - воспроизведён ниже как эталон;
+- DatabaseManager.get_statistics: чтение stats_counters и stats_task_groups
+  (кэш в процессе отключён, stats_ttl=0, измеряется только запрос к базе).
+
+Скрипт проверяет, что результаты совпадают, и печатает время для
+нескольких размеров таблицы решений. Базы создаются во временном каталоге.
+
+Запуск (из корня проекта):
+    python benchmarks/bench_statistics.py [--solutions 10000 100000 500000]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.database import DatabaseManager
+
+
+CATEGORIES = ['algorithms', 'data_structures', 'strings', 'math']
+DIFFICULTIES = ['easy', 'medium', 'hard']
+
+
+def legacy_statistics(conn):
+    """Прежний расчёт статистики (пять запросов по таблицам)"""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM tasks")
+    total_tasks = cursor.fetchone()[0]
+    cursor.execute("SELECT COUNT(*) FROM solutions")
+    total_solutions = cursor.fetchone()[0]
+    cursor.execute("SELECT AVG(score) FROM solutions")
+    avg_score = cursor.fetchone()[0] or 0
+    cursor.execute("SELECT category, COUNT(*) FROM tasks GROUP BY category")
+    tasks_by_category = dict(cursor.fetchall())
+    cursor.execute("SELECT difficulty, COUNT(*) FROM tasks GROUP BY difficulty")
+    tasks_by_difficulty = dict(cursor.fetchall())
+    return {
+        'total_tasks': total_tasks,
+        'total_solutions': total_solutions,
+        'average_score': round(avg_score, 2),
+        'tasks_by_category': tasks_by_category,
+        'tasks_by_difficulty': tasks_by_difficulty
+    }
+
+
+def fill(db, tasks, solutions):
+    """Заполнение базы заданиями и решениями (через триггеры статистики)"""
+    with db._connection() as conn:
+        conn.executemany(
+            "INSERT INTO tasks (id, title, description, difficulty, category, test_cases, hints, solution_template) "
+            "VALUES (?, 'Задание', 'Описание', ?, ?, '[]', '[]', '')",
+            [(f'task_{i}', DIFFICULTIES[i % 3], CATEGORIES[i % 4]) for i in range(tasks)]
+        )
+        conn.executemany(
+            "INSERT INTO solutions (task_id, student_code, test_results, analysis_results, score, execution_time) "
+            "VALUES (?, 'pass', '[]', '{}', ?, 0.01)",
+            ((f'task_{i % tasks}', float(i % 101)) for i in range(solutions))
+        )
+        conn.commit()
+
+
+def measure(function, repeats):
+    """Среднее время вызова в секундах"""
+    start = time.perf_counter()
+    for _ in range(repeats):
+        function()
+    return (time.perf_counter() - start) / repeats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--tasks', type=int, default=2000)
+    parser.add_argument('--solutions', type=int, nargs='+', default=[10000, 100000, 500000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for count in args.solutions:
+            db = DatabaseManager(os.path.join(temp_dir, f'stats_{count}.db'), stats_ttl=0)
+            fill(db, args.tasks, count)
+            conn = db._connection()
+
+            if legacy_statistics(conn) != db.get_statistics():
+                print(f"❌ Результаты различаются ({count} решений)")
+                sys.exit(1)
+
+            legacy_time = measure(lambda: legacy_statistics(conn), 20)
+            counters_time = measure(db.get_statistics, 200)
+            print(f"\n📊 Решений: {count:,}, заданий: {args.tasks:,}")
+            print(f"⏱️  Пять запросов по таблицам: {legacy_time * 1000:9.3f} мс")
+            print(f"⏱️  Агрегаты на триггерах:     {counters_time * 1000:9.3f} мс")
+            print(f"🚀 Ускорение: {legacy_time / counters_time:.0f}×")
+            db.connections.close()
+
+
+if __name__ == '__main__':
+    main()
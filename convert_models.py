@@ -0,0 +1,40 @@
+"""
+Конвертация моделей нейронной сети между форматами JSON и .nnb
+
+Файл назначения создаётся рядом с исходным (то же имя, другое
+расширение), исходный файл не изменяется. Формат .nnb описан в
+app/models/model_format.py.
+
+Запуск (из корня проекта):
+    python convert_models.py data/models/*.json
+    python convert_models.py --to json data/models/neural_network.nnb
+"""
+
+import argparse
+import os
+
+from app.models.model_format import BINARY_MODEL_EXTENSION, ModelFormatError, convert_model
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Конвертация моделей между форматами JSON и .nnb')
+    parser.add_argument('paths', nargs='+', help='файлы моделей')
+    parser.add_argument('--to', choices=('nnb', 'json'), default='nnb', help='целевой формат')
+    args = parser.parse_args()
+
+    extension = BINARY_MODEL_EXTENSION if args.to == 'nnb' else '.json'
+    for path in args.paths:
+        destination = os.path.splitext(path)[0] + extension
+        if os.path.abspath(destination) == os.path.abspath(path):
+            print(f"⏭️  {path}: уже в формате {args.to}")
+            continue
+        try:
+            convert_model(path, destination)
+        except (OSError, ModelFormatError) as e:
+            print(f"❌ {path}: {e}")
+            continue
+        print(f"✅ {path} → {destination} ({os.path.getsize(path)} → {os.path.getsize(destination)} байт)")
+
+
+if __name__ == '__main__':
+    main()
@@ -6,42 +6,17 @@
 import sys
 import os
 import json
-import numpy as np
 
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models.neural_network import SimpleNeuralNetwork
+from app.models.dataset import load_dataset
 
 
 def load_and_prepare_data():
-    """Загрузка и подготовка данных"""
-    with open('data/training_data/training_data.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    X = []
-    y = []
-    
-    for item in data:
-        features = item['features']
-        target = item['target']
-        
-        feature_vector = [
-            features['lines_of_code'] / 100.0,
-            features['functions_count'] / 10.0,
-            features['complexity'],
-            features['nested_levels'] / 5.0,
-            features['variable_names_length'] / 20.0,
-            features['comments_ratio'],
-            features['imports_count'] / 10.0,
-            features['class_count'] / 5.0,
-            features['error_handling'],
-            features['test_coverage']
-        ]
-        
-        X.append(feature_vector)
-        y.append(target)
-    
-    return np.array(X), np.array(y), len(data)
+    """Загрузка и подготовка данных (app.models.dataset, нормализация как при инференсе)"""
+    dataset = load_dataset()
+    return dataset.X, dataset.y, len(dataset)
 
 
 def main():
@@ -56,7 +31,8 @@ def main():
     network = SimpleNeuralNetwork(
         input_size=10,
         hidden_size=16,
-        output_size=3
+        output_size=3,
+        load_pretrained=False
     )
     network.learning_rate = 0.01
     
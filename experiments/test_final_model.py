@@ -16,37 +16,13 @@ import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from app.models.neural_network import SimpleNeuralNetwork
+from app.models.dataset import load_dataset
 
 
 def load_data():
-    """Загрузка данных"""
-    with open('data/training_data/training_data.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    X = []
-    y = []
-    
-    for item in data:
-        features = item['features']
-        target = item['target']
-        
-        feature_vector = [
-            features['lines_of_code'] / 100.0,
-            features['functions_count'] / 10.0,
-            features['complexity'],
-            features['nested_levels'] / 5.0,
-            features['variable_names_length'] / 20.0,
-            features['comments_ratio'],
-            features['imports_count'] / 10.0,
-            features['class_count'] / 5.0,
-            features['error_handling'],
-            features['test_coverage']
-        ]
-        
-        X.append(feature_vector)
-        y.append(target)
-    
-    return np.array(X), np.array(y)
+    """Загрузка данных (app.models.dataset, нормализация как при инференсе)"""
+    dataset = load_dataset()
+    return dataset.X, dataset.y
 
 
 def split_data(X, y, test_ratio=0.2, seed=42):
@@ -104,26 +80,16 @@ def main():
     
     # Загружаем финальную модель
     print("\n🧠 Загрузка финальной модели...")
-    network = SimpleNeuralNetwork()
+    network = SimpleNeuralNetwork(load_pretrained=True)
     
     # Тестирование на тестовой выборке
     print("\n🧪 Тестирование на тестовой выборке...")
     print("-" * 50)
     
-    predictions = []
-    targets = []
-    errors = []
-    
-    for i, (x, y_true) in enumerate(zip(X_test, y_test)):
-        y_pred = network.predict(x).flatten()
-        predictions.append(y_pred)
-        targets.append(y_true)
-        
-        error = np.mean(np.abs(y_true - y_pred))
-        errors.append(error)
-    
-    predictions = np.array(predictions)
-    targets = np.array(targets)
+    # Вся тестовая выборка за один прямой проход
+    predictions = network.predict_batch(X_test)
+    targets = y_test
+    errors = np.mean(np.abs(targets - predictions), axis=1)
     
     # Общие метрики
     print("\n📊 ОБЩИЕ МЕТРИКИ")
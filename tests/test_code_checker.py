@@ -0,0 +1,73 @@
+"""
+Тесты пакетного тестирования решений
+"""
+
+import pytest
+
+from app.models.code_checker import CodeChecker, SKIP_FAIL_FAST
+
+
+TESTS = [
+    {'input': '1', 'expected': '2'},
+    {'input': '2', 'expected': 'secret-expected-output'},
+    {'input': '3', 'expected': '4'},
+]
+SOLUTION = 'def inc(x):\n    return x + 1'
+
+
+@pytest.mark.parametrize('pool_size', [0, 1])
+def test_fail_fast_skips_cases_after_first_failure(pool_size):
+    checker = CodeChecker(pool_size=pool_size, fail_fast=True)
+
+    results = checker.test_solution(SOLUTION, TESTS)
+
+    assert [result.passed for result in results] == [True, False, False]
+    assert not results[1].skipped
+    assert results[2].skipped and results[2].skip_reason == SKIP_FAIL_FAST
+
+
+def test_fail_fast_does_not_send_expected_output_to_sandbox():
+    checker = CodeChecker(pool_size=1, fail_fast=True)
+    pool = checker._get_pool()
+    jobs = []
+    execute = pool.execute
+
+    def recording_execute(job, timeout, on_message=None):
+        jobs.append(job)
+        return execute(job, timeout, on_message)
+
+    pool.execute = recording_execute
+    checker.test_solution(SOLUTION, TESTS)
+
+    assert jobs and all('secret-expected-output' not in repr(job) for job in jobs)
+
+
+def test_without_fail_fast_all_cases_run():
+    results = CodeChecker(pool_size=1).test_solution(SOLUTION, TESTS)
+
+    assert [result.passed for result in results] == [True, False, True]
+    assert not any(result.skipped for result in results)
+
+
+@pytest.mark.parametrize('solution', [
+    'seen = []\ndef inc(x):\n    seen.append(x)\n    return len(seen)',
+    'def inc(x, seen=[]):\n    seen.append(x)\n    return len(seen)',
+])
+@pytest.mark.parametrize('pool_size', [0, 1])
+def test_module_state_does_not_carry_over_between_cases(pool_size, solution):
+    tests = [{'input': str(value), 'expected': '1'} for value in range(3)]
+
+    results = CodeChecker(pool_size=pool_size).test_solution('print("loaded")\n' + solution, tests)
+
+    assert [result.actual_output for result in results] == ['loaded\n1'] * 3
+
+
+@pytest.mark.parametrize('body, output', [
+    ('raise ValueError()', 'Error: '),
+    ('raise ValueError("bad value")', 'Error: bad value'),
+    ('raise MemoryError()', 'Error: MemoryError'),
+])
+def test_exception_output_format(body, output):
+    result = CodeChecker(pool_size=1).test_solution(f'def inc(x):\n    {body}', TESTS[:1])[0]
+
+    assert (result.actual_output or result.error_message) == output.strip()
@@ -0,0 +1,31 @@
+"""
+Тесты создания нейронной сети
+"""
+
+import os
+
+import pytest
+
+from app.models.model_format import read_model_info
+from app.models.neural_network import SimpleNeuralNetwork
+
+FINAL_MODEL = 'data/models/model_final.json'
+
+
+def test_constructor_keeps_requested_architecture():
+    network = SimpleNeuralNetwork(hidden_size=4, activation='relu', dropout_rate=0.3)
+
+    assert network.hidden_size == 4
+    assert network.activation == 'relu'
+    assert network.dropout_rate == 0.3
+    assert network.weights_input_hidden.shape == (10, 4)
+
+
+@pytest.mark.skipif(not os.path.exists(FINAL_MODEL), reason="нет сохранённой модели")
+def test_load_pretrained_uses_saved_architecture():
+    architecture = read_model_info(FINAL_MODEL)['architecture']
+
+    network = SimpleNeuralNetwork(hidden_size=4, load_pretrained=True)
+
+    assert network.hidden_size == architecture['hidden_size']
+    assert network.activation == architecture['activation']
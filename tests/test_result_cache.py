@@ -0,0 +1,34 @@
+"""
+Тесты ключа кэша результатов проверки
+"""
+
+from app.models.code_checker import CodeChecker
+from app.utils.result_cache import ResultCache
+
+
+CODE = 'def f(x):\n    return x'
+TESTS = [{'input': '1', 'expected': '1'}]
+
+
+def _key(checker: CodeChecker) -> str:
+    return ResultCache.make_key(CODE, 'task', TESTS, checker.fingerprint())
+
+
+def test_key_is_stable_for_same_settings():
+    assert _key(CodeChecker(submission_budget=6)) == _key(CodeChecker(submission_budget=6))
+
+
+def test_key_changes_with_checker_settings():
+    base = _key(CodeChecker())
+    variants = [
+        CodeChecker(fail_fast=True),
+        CodeChecker(submission_budget=6),
+        CodeChecker(memory_limit_mb=256),
+        CodeChecker(cpu_time_limit=2),
+        CodeChecker(timeout=2),
+    ]
+
+    keys = {_key(checker) for checker in variants}
+
+    assert base not in keys
+    assert len(keys) == len(variants)
@@ -0,0 +1,99 @@
+"""
+Тесты изоляции заданий в процессах-песочницах пула
+"""
+
+import os
+import time
+
+import pytest
+
+from app.models import sandbox
+from app.models.code_checker import CodeChecker
+from app.models.sandbox import SandboxCrash, SandboxPool
+
+
+SORT_TESTS = [{'input': '[3, 1, 2]', 'expected': '[1, 2, 3]'}]
+SORT_SOLUTION = 'def sort_list(numbers):\n    return sorted(numbers)'
+
+
+@pytest.fixture
+def checker():
+    """Проверщик с одним процессом-песочницей: все задания выполняются в нём"""
+    code_checker = CodeChecker(pool_size=1)
+    yield code_checker
+    code_checker._pool.shutdown()
+
+
+@pytest.mark.parametrize('tampering, solution', [
+    ('import builtins\nbuiltins.sorted = lambda x, **k: [42]', SORT_SOLUTION),
+    ('import functools\nfunctools.reduce = lambda *args: [42]',
+     'import functools\ndef sort_list(numbers):\n    return functools.reduce(lambda acc, x: acc + [x], sorted(numbers), [])'),
+    ('import collections\ncollections.Counter.elements = lambda self: iter([42])',
+     'from collections import Counter\ndef sort_list(numbers):\n    return sorted(Counter(numbers).elements())'),
+    ('import sys\nsys.modules["math"] = None',
+     'import math\ndef sort_list(numbers):\n    return sorted(numbers, key=math.fabs)'),
+])
+def test_job_changes_do_not_reach_next_job(checker, tampering, solution):
+    checker.test_solution(f"{tampering}\ndef sort_list(numbers):\n    return []", SORT_TESTS)
+
+    result = checker.test_solution(solution, SORT_TESTS)[0]
+
+    assert result.passed, result.actual_output or result.error_message
+
+
+def test_builtins_are_restored_in_same_worker(checker):
+    checker.test_solution('import builtins\nbuiltins.len = lambda x: -1\ndef sort_list(numbers):\n    return []',
+                          SORT_TESTS)
+    run = checker._run_script('import builtins\nprint(len([1, 2]), builtins.len([1]))', '', 5)
+
+    assert run['stdout'] == '2 1'
+
+
+def test_clean_jobs_keep_worker(checker):
+    for _ in range(3):
+        checker.test_solution('import heapq\n' + SORT_SOLUTION, SORT_TESTS)
+
+    assert checker._pool.stats['recycled'] == 0
+
+
+def test_thread_started_by_job_does_not_reach_next_job(checker):
+    checker.test_solution('import math, threading, time\n'
+                          'def tamper():\n    time.sleep(0.3)\n    math.pi = 3\n'
+                          'threading.Thread(target=tamper, daemon=True).start()\n' + SORT_SOLUTION, SORT_TESTS)
+    time.sleep(0.6)
+    run = checker._run_script('import math\nprint(math.pi)', '', 5)
+
+    assert run['stdout'] == '3.141592653589793'
+    assert checker._pool.stats['recycled'] == 1
+
+
+@pytest.mark.skipif(not hasattr(os, 'fork'), reason="нет os.fork")
+def test_forked_process_does_not_answer_for_worker(checker):
+    # os запрещён проверкой безопасности решений, поэтому код идёт в песочницу напрямую
+    checker._run_script('import os, time\nif os.fork() == 0:\n    time.sleep(30)\nprint("forked")', '', 5)
+    run = checker._run_script('print("ok")', '', 5)
+
+    assert run['stdout'] == 'ok'
+    assert checker._pool.stats['recycled'] == 1
+
+
+def test_pool_keeps_slot_when_worker_cannot_start(monkeypatch):
+    pool = SandboxPool(size=1, max_jobs_per_worker=1)
+    job = {'type': 'run', 'code': 'print(1)', 'input': ''}
+    try:
+        spawn = sandbox.SandboxWorker
+
+        def fail(limits=None):
+            raise OSError(11, "Resource temporarily unavailable")
+
+        monkeypatch.setattr(sandbox, 'SandboxWorker', fail)
+        # Замена процесса после задания не удалась, но результат задания возвращается
+        assert pool.execute(job, 5)['stdout'] == '1'
+        with pytest.raises(SandboxCrash):
+            pool.execute(job, 5)
+
+        monkeypatch.setattr(sandbox, 'SandboxWorker', spawn)
+        assert pool.execute(job, 5)['stdout'] == '1'
+        assert pool.stats['spawn_failures'] == 2
+    finally:
+        pool.shutdown()
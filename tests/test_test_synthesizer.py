@@ -0,0 +1,55 @@
+"""
+Тесты синтеза наборов тестов
+"""
+
+import threading
+
+from app.models import code_checker
+from app.models.test_synthesizer import TestSynthesizer
+
+
+INPUTS = {'type': 'int', 'min_value': 1, 'max_value': 9}
+
+
+def template(name):
+    return {'template': name, 'solution': 'def f(x):\n    return x', 'inputs': INPUTS}
+
+
+class BlockingChecker:
+    """Эталон шаблона 'slow' выполняется, пока не установлено событие release"""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.runs = []
+
+    def run_reference(self, code, inputs, budget):
+        name = threading.current_thread().name
+        self.runs.append(name)
+        if name.startswith('slow'):
+            self.started.set()
+            self.release.wait(5)
+        return [code_checker.TestResult({'input': value}, True, value, "", 0.0) for value in inputs]
+
+
+def test_synthesis_of_other_template_does_not_wait():
+    checker = BlockingChecker()
+    synthesizer = TestSynthesizer(checker, cases_per_suite=4)
+    slow = [threading.Thread(target=synthesizer.ensure_suite, args=(template('a'),), name=f'slow-{i}')
+            for i in range(2)]
+    for thread in slow:
+        thread.start()
+    assert checker.started.wait(5)
+
+    try:
+        assert synthesizer.ensure_suite(template('b')) is not None
+        assert not checker.release.is_set()
+    finally:
+        checker.release.set()
+        for thread in slow:
+            thread.join(5)
+
+    # Один и тот же набор синтезируется один раз
+    assert checker.runs.count('slow-0') + checker.runs.count('slow-1') == 1
+    assert synthesizer.get_stats()['synthesized'] == 2
+    assert synthesizer._synthesis_locks == {}
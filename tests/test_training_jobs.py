@@ -0,0 +1,34 @@
+"""
+Тесты фоновых заданий обучения
+"""
+
+import time
+
+from app.models.model_format import read_model_info
+from app.models.training_jobs import FINISHED_STATUSES, TrainingJobManager, validate_training_params
+
+
+def _wait(manager: TrainingJobManager, job_id: str, timeout: float = 60.0) -> dict:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job['status'] in FINISHED_STATUSES:
+            return job
+        time.sleep(0.2)
+    raise AssertionError(f"Задание {job_id} не завершилось за {timeout} с")
+
+
+def test_job_trains_requested_architecture(tmp_path):
+    params, error = validate_training_params({'hidden_size': 4, 'activation': 'relu', 'dropout_rate': 0.3,
+                                              'epochs': 100, 'batch_size': 0, 'learning_rate': 0.05,
+                                              'seed': 1})
+    assert not error
+    manager = TrainingJobManager(jobs_dir=str(tmp_path))
+
+    job = _wait(manager, manager.submit(params)['id'])
+
+    assert job['status'] == 'completed', job['error']
+    architecture = read_model_info(manager.model_path(job['id']))['architecture']
+    assert architecture['hidden_size'] == 4
+    assert architecture['activation'] == 'relu'
+    assert architecture['dropout_rate'] == 0.3
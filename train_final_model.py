@@ -11,45 +11,21 @@
 import json
 import numpy as np
 from app.models.neural_network import SimpleNeuralNetwork
+from app.models.dataset import load_dataset
 
 def load_training_data():
     """
     Загрузка и подготовка обучающих данных
     
-    Читает JSON-файл с обучающими данными и преобразует их
-    в numpy массивы для обучения. Применяет нормализацию
-    к каждому признаку согласно его характерному диапазону значений.
+    Данные загружаются через app.models.dataset: признаки нормализуются
+    так же, как при инференсе (FEATURE_SCALES), разобранная выборка
+    кэшируется в data/training_data/.cache/.
     
     Returns:
         tuple: (X, y) где X - массив признаков (N×10), y - массив целевых значений (N×3)
     """
-    with open('data/training_data/training_data.json', 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    X = []
-    y = []
-    
-    for item in data:
-        features = item['features']
-        target = item['target']
-        
-        feature_vector = [
-            features['lines_of_code'] / 100.0,
-            features['functions_count'] / 10.0,
-            features['complexity'],
-            features['nested_levels'] / 5.0,
-            features['variable_names_length'] / 20.0,
-            features['comments_ratio'],
-            features['imports_count'] / 10.0,
-            features['class_count'] / 5.0,
-            features['error_handling'],
-            features['test_coverage']
-        ]
-        
-        X.append(feature_vector)
-        y.append(target)
-    
-    return np.array(X), np.array(y)
+    dataset = load_dataset()
+    return dataset.X, dataset.y
 
 
 def main():
@@ -97,7 +73,8 @@ def main():
         input_size=10,
         hidden_size=8,
         output_size=3,
-        activation='relu'
+        activation='relu',
+        load_pretrained=False
     )
     
     # Устанавливаем оптимальные параметры
@@ -11,24 +11,21 @@ import numpy as np
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from app.models.neural_network import SimpleNeuralNetwork
+from app.models.dataset import load_dataset
 from app.utils.code_analyzer import CodeAnalyzer
 
 def load_training_data():
     """
     Загрузка обучающих данных из JSON-файла
     
-    Читает файл training_data.json с примерами кода Python,
-    содержащими извлеченные признаки и целевые значения качества.
+    Читает файл training_data.json через app.models.dataset: примеры
+    проверяются по схеме, разобранная выборка кэшируется.
     
     Returns:
-        list: Список примеров обучающих данных или None при ошибке
-        
-    Raises:
-        FileNotFoundError: Если файл с данными не существует
+        Dataset: Обучающая выборка или None при ошибке
     """
     try:
-        with open('data/training_data/training_data.json', 'r', encoding='utf-8') as f:
-            data = json.load(f)
+        data = load_dataset()
         print(f"✅ Загружено {len(data)} примеров обучающих данных")
         return data
     except FileNotFoundError:
@@ -40,44 +37,17 @@ def prepare_training_data(data):
     """
     Подготовка данных для обучения нейронной сети
     
-    Преобразует загруженные данные в формат numpy массивов.
-    Нормализует признаки путем деления на характерные значения:
-    - lines_of_code делится на 100 (ожидаемый размер 0-100 строк)
-    - functions_count делится на 10 (обычно 0-10 функций)
-    - nested_levels делится на 5 (глубина вложенности 0-5)
-    И т.д. для всех 10 признаков.
+    Признаки уже нормализованы при загрузке так же, как при инференсе
+    (FEATURE_SCALES): lines_of_code / 100, functions_count / 10,
+    complexity / 10, nested_levels / 5 и т.д. для всех 10 признаков.
     
     Args:
-        data: Список словарей с полями 'features' и 'target'
+        data: Dataset из load_training_data
         
     Returns:
         tuple: (X, y) где X - массив признаков (N×10), y - массив целевых значений (N×3)
     """
-    X = []  # Входные данные (признаки)
-    y = []  # Целевые значения
-    
-    for item in data:
-        features = item['features']
-        target = item['target']
-        
-        # Преобразуем признаки в вектор
-        feature_vector = [
-            features['lines_of_code'] / 100.0,
-            features['functions_count'] / 10.0,
-            features['complexity'],
-            features['nested_levels'] / 5.0,
-            features['variable_names_length'] / 20.0,
-            features['comments_ratio'],
-            features['imports_count'] / 10.0,
-            features['class_count'] / 5.0,
-            features['error_handling'],
-            features['test_coverage']
-        ]
-        
-        X.append(feature_vector)
-        y.append(target)
-    
-    return np.array(X), np.array(y)
+    return data.X, data.y
 
 def train_network():
     """
@@ -113,7 +83,8 @@ def train_network():
     network = SimpleNeuralNetwork(
         input_size=X.shape[1],
         hidden_size=8,  # Увеличиваем скрытый слой
-        output_size=y.shape[1]
+        output_size=y.shape[1],
+        load_pretrained=False
     )
     
     print(f"🔧 Архитектура сети:")